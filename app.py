@@ -1,18 +1,47 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Request, render_template, request, jsonify, Response, send_file, stream_with_context
 from flask_cors import CORS
-from services.translator import GroqTranslator
+from werkzeug.exceptions import RequestEntityTooLarge
+from services.translator import GroqTranslator, AUDIO_MODES
+from services.audio_blob_store import AudioBlobStore, DEFAULT_AUDIO_BLOB_PATH, safe_audio_type
+from services.audio_upload import DEFAULT_SPOOL_MEMORY, spooled_buffer
+from services.audio_preprocess import MAX_DURATION, AudioTooLong
+from services.speech_service import SpeechService
+from services.whisper_backend import get_local_whisper
+import io
 import os
 import logging
 import requests
 import json
-from werkzeug.utils import secure_filename
-import tempfile
-from services.learning_service import LearningService
-from youtube_transcript_api import YouTubeTranscriptApi
+from typing import Any, Dict, Optional
+from services.learning_service import LearningService, LESSON_PROMPT_VERSION, lesson_cache
+from services.lesson_store import LessonStore, DEFAULT_LESSON_STORE_PATH
+from services.progress_store import get_progress_store, DEFAULT_PROGRESS_STORE_PATH, DEFAULT_USER_ID
+from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound, TranscriptsDisabled, VideoUnavailable
 from services.practice_service import PracticeService
-from services.chatbot_service import ChatbotService
+from services.exercise_pool import ExercisePool
+from services.chatbot_service import ChatbotService, OPTIONS_MODES
+from services.course_summary_service import CourseSummaryService, format_course_summary, format_timestamp
+from services.course_artifact import CourseArtifact, DEFAULT_ARTIFACT_PATH
+from services.caption_index import CaptionIndex
+from services.caption_cache import CaptionCache, DEFAULT_CAPTION_CACHE_PATH
+from services.chat_history import ChatHistoryManager, LLMSummarizer
+from services.chat_session_store import ChatSessionStore, DEFAULT_CHAT_SESSION_PATH, SessionNotFound, parse_chat_request, record_exchange
+from services.translation_cache import TranslationCache, DEFAULT_CACHE_PATH
+from services.http_client import GroqHttpClient, set_http_client
+from services.rate_limiter import TokenBucketRateLimiter, DEFAULT_STATE_PATH
+
+AUDIO_SPOOL_MEMORY = int(os.getenv("AUDIO_SPOOL_MEMORY", str(DEFAULT_SPOOL_MEMORY)))
+
+class SpooledUploadRequest(Request):
+    """Buffers file uploads in memory up to AUDIO_SPOOL_MEMORY bytes, then in an unnamed temp file."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return spooled_buffer(AUDIO_SPOOL_MEMORY)
 
 app = Flask(__name__)
+app.request_class = SpooledUploadRequest
+# Larger request bodies are refused with a 413 before they are spooled
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
 # Update CORS configuration to be more permissive for development
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
@@ -22,10 +51,115 @@ logger = logging.getLogger(__name__)
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "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")
 GROQ_API_ENDPOINT = "https://api.groq.com/v1/completions"
-translator = GroqTranslator(GROQ_API_KEY)
-learning_service = LearningService(GROQ_API_KEY)
-practice_service = PracticeService(GROQ_API_KEY)
-chatbot_service = ChatbotService(GROQ_API_KEY)
+
+# One pooled keep-alive client shared by every service and inline API call
+http_client = GroqHttpClient(
+    pool_connections=int(os.getenv("GROQ_POOL_CONNECTIONS", "4")),
+    pool_maxsize=int(os.getenv("GROQ_POOL_MAXSIZE", "32")),
+    timeouts={
+        "/chat/completions": float(os.getenv("GROQ_CHAT_TIMEOUT", "30")),
+        "/audio/transcriptions": float(os.getenv("GROQ_AUDIO_TIMEOUT", "60")),
+        "/audio/translations": float(os.getenv("GROQ_AUDIO_TIMEOUT", "60")),
+    },
+    # Process-wide quota shared by all workers on this host
+    rate_limiter=TokenBucketRateLimiter(
+        requests_per_minute=float(os.getenv("GROQ_RPM", "30")),
+        tokens_per_minute=float(os.getenv("GROQ_TPM", "30000")) or None,
+        state_path=os.getenv("GROQ_RATE_LIMIT_STATE", DEFAULT_STATE_PATH)
+    )
+)
+set_http_client(http_client)
+
+translation_cache = TranslationCache(
+    db_path=os.getenv("TRANSLATION_CACHE_PATH", DEFAULT_CACHE_PATH),
+    max_entries=int(os.getenv("TRANSLATION_CACHE_SIZE", "2048")),
+    memory_ttl=float(os.getenv("TRANSLATION_CACHE_TTL", "3600"))
+)
+# Recordings handed back by URL instead of being echoed as base64
+audio_blobs = AudioBlobStore(
+    db_path=os.getenv("AUDIO_BLOB_PATH", DEFAULT_AUDIO_BLOB_PATH),
+    max_bytes=int(os.getenv("AUDIO_BLOB_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.getenv("AUDIO_BLOB_TTL", "300"))
+)
+VOICE_AUDIO_MODE = os.getenv("VOICE_AUDIO_MODE", "inline")
+if VOICE_AUDIO_MODE not in AUDIO_MODES:
+    raise ValueError(f"VOICE_AUDIO_MODE must be one of {', '.join(AUDIO_MODES)}, got {VOICE_AUDIO_MODE!r}")
+# Codec recordings are re-encoded to before transcription; "none" uploads them as recorded
+AUDIO_CODEC = os.getenv("AUDIO_CODEC", "flac")
+AUDIO_CODEC = None if AUDIO_CODEC == "none" else AUDIO_CODEC
+speech_service = SpeechService(
+    GROQ_API_KEY,
+    http_client=http_client,
+    codec=AUDIO_CODEC,
+    chunk_seconds=float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "60")),
+    max_workers=int(os.getenv("TRANSCRIBE_CONCURRENCY", "4")),
+    max_duration=float(os.getenv("MAX_AUDIO_SECONDS", str(MAX_DURATION))),
+    backend=os.getenv("TRANSCRIBE_BACKEND", "groq"),
+    # Opt-in: the model is loaded lazily, on the first request that asks for local transcription
+    local_backend=get_local_whisper(
+        os.getenv("WHISPER_MODEL", "base"),
+        device=os.getenv("WHISPER_DEVICE", "cpu"),
+        max_batch=int(os.getenv("WHISPER_MAX_BATCH", "8")),
+        max_queue=int(os.getenv("WHISPER_MAX_QUEUE", "64")),
+        timeout=float(os.getenv("WHISPER_TIMEOUT", "120"))
+    ) if os.getenv("ENABLE_LOCAL_WHISPER", "0") == "1" else None
+)
+translator = GroqTranslator(GROQ_API_KEY, cache=translation_cache, http_client=http_client,
+                            audio_store=audio_blobs, speech_service=speech_service)
+lesson_store = LessonStore(os.getenv("LESSON_STORE_PATH", DEFAULT_LESSON_STORE_PATH))
+# Lessons generated by older prompts can never be served again
+purged = lesson_store.purge_other_versions(LESSON_PROMPT_VERSION)
+if purged:
+    logger.info(f"Removed {purged} lessons generated by outdated prompts")
+learning_service = LearningService(
+    GROQ_API_KEY,
+    http_client=http_client,
+    store=lesson_store,
+    variants=int(os.getenv("LESSON_VARIANTS", "1")),
+    memory=lesson_cache(
+        max_bytes=int(os.getenv("LESSON_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        ttl=float(os.getenv("LESSON_CACHE_TTL", str(24 * 3600)))
+    )
+)
+progress_store = get_progress_store(
+    os.getenv("PROGRESS_STORE_PATH", DEFAULT_PROGRESS_STORE_PATH),
+    flush_interval=float(os.getenv("PROGRESS_FLUSH_INTERVAL", "1.0"))
+)
+practice_service = PracticeService(GROQ_API_KEY, http_client=http_client)
+practice_pool = ExercisePool(
+    practice_service,
+    target_size=int(os.getenv("PRACTICE_POOL_SIZE", "5")),
+    low_water=int(os.getenv("PRACTICE_POOL_LOW_WATER", "2")),
+    max_uses=int(os.getenv("PRACTICE_POOL_MAX_USES", "3"))
+)
+course_summary_service = CourseSummaryService(
+    GROQ_API_KEY,
+    http_client=http_client,
+    chunk_tokens=int(os.getenv("COURSE_SUMMARY_CHUNK_TOKENS", "1500")),
+    max_concurrency=int(os.getenv("COURSE_SUMMARY_CONCURRENCY", "4"))
+)
+caption_cache = CaptionCache(
+    db_path=os.getenv("CAPTION_CACHE_PATH", DEFAULT_CAPTION_CACHE_PATH),
+    ttl=float(os.getenv("CAPTION_CACHE_TTL", str(7 * 24 * 3600))),
+    negative_ttl=float(os.getenv("CAPTION_NEGATIVE_TTL", "3600"))
+)
+# Captions and summaries of the curated lesson videos, built offline
+course_artifact = CourseArtifact.load(os.getenv("COURSE_ARTIFACT_PATH", DEFAULT_ARTIFACT_PATH))
+chat_sessions = ChatSessionStore(
+    db_path=os.getenv("CHAT_SESSION_PATH", DEFAULT_CHAT_SESSION_PATH),
+    max_sessions=int(os.getenv("CHAT_SESSION_LIMIT", "1000"))
+)
+chat_history = ChatHistoryManager(
+    token_budget=int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "2000")),
+    summary_tokens=int(os.getenv("CHAT_SUMMARY_TOKENS", "300")),
+    summarizer=LLMSummarizer(GROQ_API_KEY, http_client=http_client)
+)
+chatbot_service = ChatbotService(
+    GROQ_API_KEY,
+    http_client=http_client,
+    options_mode=os.getenv("CHATBOT_OPTIONS_MODE", "parallel"),
+    history=chat_history
+)
 
 CHATBOT_RESPONSES = {
     'Basic Phrases': {
@@ -133,30 +267,42 @@ def translate_voice():
         if not target_lang:
             return jsonify({'error': 'Target language is required'}), 400
 
-        # Create a temporary directory if it doesn't exist
-        temp_dir = os.path.join(os.path.dirname(__file__), 'temp')
-        os.makedirs(temp_dir, exist_ok=True)
+        audio_mode = request.form.get('audioMode', VOICE_AUDIO_MODE)
+        if audio_mode not in AUDIO_MODES:
+            return jsonify({'error': f"audioMode must be one of {', '.join(AUDIO_MODES)}"}), 400
 
-        # Save the audio file temporarily
-        temp_path = os.path.join(temp_dir, secure_filename(audio_file.filename))
-        audio_file.save(temp_path)
+        transcriber = request.form.get('transcriber') or None
+        if transcriber is not None and transcriber not in speech_service.backends:
+            return jsonify({'error': f"transcriber must be one of {', '.join(speech_service.backends)}"}), 400
 
+        # The upload is streamed from its spooled buffer into the transcription request
         try:
-            with open(temp_path, 'rb') as f:
-                audio_data = f.read()
-            
-            # Process the translation
-            result = translator.translate_voice(audio_data, source_lang, target_lang)
+            result = translator.translate_voice(audio_file.stream, source_lang, target_lang,
+                                                audio_mode=audio_mode,
+                                                audio_type=safe_audio_type(audio_file.mimetype),
+                                                backend=transcriber)
             return jsonify(result)
         finally:
-            # Clean up the temporary file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            audio_file.close()
 
+    except (AudioTooLong, RequestEntityTooLarge) as e:
+        return jsonify({'error': str(e)}), 413
     except Exception as e:
         logger.exception("Voice translation error occurred")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/audio/<blob_id>', methods=['GET'])
+def get_audio(blob_id):
+    """A recording stored by a voice translation; supports Range requests for seeking."""
+    blob = audio_blobs.get(blob_id)
+    if blob is None:
+        return jsonify({'error': 'Audio not found or expired'}), 404
+    data, content_type = blob
+    response = send_file(io.BytesIO(data), mimetype=safe_audio_type(content_type), conditional=True, max_age=0)
+    response.headers['Cache-Control'] = 'private, no-store'
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
+
 @app.route('/api/translate/examples', methods=['POST'])
 def generate_examples():
     try:
@@ -197,6 +343,10 @@ def get_lesson():
         logger.exception("Failed to generate lesson")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/learning/cache-stats', methods=['GET'])
+def get_lesson_cache_stats():
+    return jsonify(learning_service.memory.stats())
+
 @app.route('/api/lessons', methods=['GET'])
 def get_lessons():
     # TODO: Implement lessons retrieval
@@ -214,30 +364,35 @@ def chat():
         if not data:
             return jsonify({'error': 'No data provided'}), 400
 
-        messages = data.get('messages', [])
         language = data.get('language', 'en')
+        options_mode = data.get('optionsMode')
         
         # Validate language parameter
         if language not in ['en', 'es', 'fr', 'de']:
             language = 'en'
-            
-        logger.debug(f"Chat request - Language: {language}, Messages: {messages}")
+        if options_mode not in OPTIONS_MODES:
+            options_mode = None
 
         # Ensure messages are properly formatted
-        formatted_messages = []
-        for msg in messages:
-            if isinstance(msg, dict) and 'content' in msg and 'role' in msg:
-                formatted_messages.append(msg)
+        try:
+            session_id, new_message, formatted_messages = parse_chat_request(data, chat_sessions)
+        except SessionNotFound:
+            return jsonify({'error': 'Unknown chat session'}), 404
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        logger.debug(f"Chat request - Language: {language}, Messages: {len(formatted_messages)}")
 
-        if not formatted_messages:
-            return jsonify({'error': 'Invalid message format'}), 400
+        result = chatbot_service.generate_response(formatted_messages, language, options_mode=options_mode)
 
-        result = chatbot_service.generate_response(formatted_messages, language)
+        if session_id:
+            record_exchange(chat_sessions, session_id, new_message, result['response'])
         
         return jsonify({
             'response': result['response'],
             'options': result['options'],
-            'language': language
+            'language': language,
+            'sessionId': session_id
         })
 
     except Exception as e:
@@ -248,15 +403,188 @@ def chat():
             'details': 'Please try again'
         }), 500
 
+def _sse(event: str, data: dict) -> str:
+    """Encode one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route('/api/chatbot/stream', methods=['POST'])
+def chat_stream():
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+
+    language = data.get('language', 'en')
+    options_mode = data.get('optionsMode')
+    if language not in ['en', 'es', 'fr', 'de']:
+        language = 'en'
+    if options_mode not in OPTIONS_MODES:
+        options_mode = None
+
+    try:
+        session_id, new_message, formatted_messages = parse_chat_request(data, chat_sessions)
+    except SessionNotFound:
+        return jsonify({'error': 'Unknown chat session'}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def events():
+        try:
+            for event, payload in chatbot_service.stream_response(formatted_messages, language, options_mode=options_mode):
+                if event == 'done':
+                    payload['language'] = language
+                    payload['sessionId'] = session_id
+                    if session_id:
+                        record_exchange(chat_sessions, session_id, new_message, payload['response'])
+                yield _sse(event, payload)
+        except Exception as e:
+            logger.exception("Chatbot stream error occurred")
+            yield _sse('error', {
+                'error': f'Chatbot error: {str(e)}',
+                'details': 'Please try again'
+            })
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/chatbot/session', methods=['POST'])
+def create_chat_session():
+    return jsonify({'sessionId': chat_sessions.create()}), 201
+
+@app.route('/api/chatbot/session/<session_id>', methods=['GET', 'DELETE'])
+def chat_session(session_id):
+    if request.method == 'DELETE':
+        chat_sessions.delete(session_id)
+        return '', 204
+    try:
+        return jsonify({'sessionId': session_id, 'messages': chat_sessions.get(session_id)})
+    except SessionNotFound:
+        return jsonify({'error': 'Unknown chat session'}), 404
+
+@app.route('/api/chatbot/options', methods=['POST'])
+def chat_options():
+    """LLM-written follow-up options for a reply, fetched after it is displayed."""
+    try:
+        data = request.get_json()
+        if not data or not data.get('response'):
+            return jsonify({'error': 'Missing response'}), 400
+
+        language = data.get('language', 'en')
+        if language not in ['en', 'es', 'fr', 'de']:
+            language = 'en'
+
+        options = chatbot_service.generate_options(data['response'], language)
+        return jsonify({'options': options, 'language': language})
+
+    except Exception as e:
+        logger.exception("Chatbot options error occurred")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/achievements', methods=['GET'])
 def get_achievements():
-    # TODO: Implement achievements
-    pass
+    user_id = request.args.get('userId') or DEFAULT_USER_ID
+    try:
+        return jsonify({
+            'summary': progress_store.summary(user_id),
+            'achievements': progress_store.achievements(user_id)
+        })
+    except Exception as e:
+        logger.error(f"Achievements error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
 
 @app.route('/api/history', methods=['GET'])
 def get_history():
-    # TODO: Implement history retrieval
-    pass
+    user_id = request.args.get('userId') or DEFAULT_USER_ID
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    try:
+        events = progress_store.history(user_id, limit=limit, before=request.args.get('before', type=int))
+        return jsonify({'events': events})
+    except Exception as e:
+        logger.error(f"History error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def load_captions(video_id: str, target_language: str) -> Optional[Dict[str, Any]]:
+    """A video's captions in ``target_language`` as a timed index, served from the caption cache.
+
+    Returns ``None`` when the video has no usable captions.
+    """
+    captions = course_artifact.get_captions(video_id, target_language)
+    if captions is not None:
+        return captions
+    return caption_cache.get_or_load(video_id, target_language, fetch_captions)
+
+def fetch_captions(video_id: str, target_language: str) -> Optional[Dict[str, Any]]:
+    """Fetch a video's captions from YouTube, translating them if needed."""
+    # Get transcript list; a video without captions is an answer, cached like any other
+    try:
+        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+    except (TranscriptsDisabled, NoTranscriptFound, VideoUnavailable) as e:
+        logger.info(f"No captions for video {video_id}: {type(e).__name__}")
+        return None
+
+    # Language code mapping
+    lang_map = {
+        'spanish': ['es', 'es-419', 'es-ES', 'es-MX', 'es-US'],
+        'french': ['fr', 'fr-FR', 'fr-CA'],
+        'german': ['de', 'de-DE'],
+        'italian': ['it', 'it-IT'],
+        'japanese': ['ja'],
+        'tamil': ['ta']
+    }
+
+    target_codes = lang_map.get(target_language, [target_language])
+
+    # Try to get transcript in target language
+    transcript = None
+    orig_language = None
+
+    # First try regular transcripts
+    for lang_code in target_codes:
+        try:
+            transcript = transcript_list.find_transcript([lang_code])
+            orig_language = lang_code
+            logger.info(f"Found transcript in {lang_code}")
+            break
+        except:
+            continue
+
+    # If not found, try auto-generated
+    if not transcript:
+        try:
+            for lang_code in target_codes:
+                for t in transcript_list._generated_transcripts:
+                    if t._language_code == lang_code:
+                        transcript = t
+                        orig_language = lang_code
+                        logger.info(f"Found auto-generated transcript in {lang_code}")
+                        break
+                if transcript:
+                    break
+        except:
+            pass
+
+    # If still not found, try to translate from any available transcript
+    if not transcript:
+        try:
+            # Get first available transcript
+            transcript = next(iter(transcript_list._manually_created_transcripts.values()))
+            orig_language = transcript._language_code
+            # Translate to target language
+            transcript = transcript.translate(target_codes[0])
+            logger.info(f"Translated from {orig_language} to {target_codes[0]}")
+        except Exception as e:
+            logger.warning(f"Translation attempt failed: {str(e)}")
+
+    if not transcript:
+        return None
+
+    return {
+        'index': CaptionIndex.from_entries(transcript.fetch()),
+        'original': orig_language or target_codes[0],
+        'translated': target_codes[0]
+    }
 
 @app.route('/api/youtube/captions', methods=['GET'])
 def get_youtube_captions():
@@ -267,67 +595,14 @@ def get_youtube_captions():
         return jsonify({'error': 'Missing required parameters'}), 400
 
     try:
-        # Get transcript list
-        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-        
-        # Language code mapping
-        lang_map = {
-            'spanish': ['es', 'es-419', 'es-ES', 'es-MX', 'es-US'],
-            'french': ['fr', 'fr-FR', 'fr-CA'],
-            'german': ['de', 'de-DE']
-        }
-
-        target_codes = lang_map.get(target_language, [target_language])
-        
-        # Try to get transcript in target language
-        transcript = None
-        orig_language = None
-
-        # First try regular transcripts
-        for lang_code in target_codes:
-            try:
-                transcript = transcript_list.find_transcript([lang_code])
-                orig_language = lang_code
-                logger.info(f"Found transcript in {lang_code}")
-                break
-            except:
-                continue
-
-        # If not found, try auto-generated
-        if not transcript:
-            try:
-                for lang_code in target_codes:
-                    for t in transcript_list._generated_transcripts:
-                        if t._language_code == lang_code:
-                            transcript = t
-                            orig_language = lang_code
-                            logger.info(f"Found auto-generated transcript in {lang_code}")
-                            break
-                    if transcript:
-                        break
-            except:
-                pass
-
-        # If still not found, try to translate from any available transcript
-        if not transcript:
-            try:
-                # Get first available transcript
-                transcript = next(iter(transcript_list._manually_created_transcripts.values()))
-                orig_language = transcript._language_code
-                # Translate to target language
-                transcript = transcript.translate(target_codes[0])
-                logger.info(f"Translated from {orig_language} to {target_codes[0]}")
-            except Exception as e:
-                logger.warning(f"Translation attempt failed: {str(e)}")
-
-        if not transcript:
+        captions = load_captions(video_id, target_language)
+        if not captions:
             return jsonify({
                 'error': 'No captions available',
                 'details': f'Could not find or translate captions for {target_language}'
             }), 404
 
-        # Get transcript text
-        captions_text = ' '.join([entry['text'] for entry in transcript.fetch()])
+        captions_text = captions['index'].text
 
         return jsonify({
             'captions': {
@@ -335,9 +610,11 @@ def get_youtube_captions():
                 'translated': captions_text
             },
             'language': {
-                'original': orig_language or target_codes[0],
-                'translated': target_codes[0]
-            }
+                'original': captions['original'],
+                'translated': captions['translated']
+            },
+            # Per-caption timing as parallel arrays; offsets index into the caption text
+            'timing': captions['index'].to_columns(include_text=False)
         })
 
     except Exception as e:
@@ -347,6 +624,39 @@ def get_youtube_captions():
             'details': str(e)
         }), 500
 
+@app.route('/api/youtube/captions/seek', methods=['GET'])
+def seek_youtube_captions():
+    video_id = request.args.get('videoId')
+    target_language = request.args.get('language', '').lower()
+    phrase = request.args.get('phrase')
+    time = request.args.get('time', type=float)
+
+    if not video_id or not target_language or (not phrase and time is None):
+        return jsonify({'error': 'Missing required parameters'}), 400
+
+    try:
+        captions = load_captions(video_id, target_language)
+        if not captions:
+            return jsonify({'error': 'No captions available'}), 404
+
+        index = captions['index']
+        i = index.find_phrase(phrase, after=request.args.get('after', 0.0, type=float)) if phrase else index.caption_at(time)
+        if i is None:
+            return jsonify({'error': 'Not found'}), 404
+
+        caption = index[i]
+        return jsonify({
+            'index': i,
+            'time': format_timestamp(caption['start']),
+            'start': caption['start'],
+            'duration': caption['duration'],
+            'text': caption['text']
+        })
+
+    except Exception as e:
+        logger.exception(f"Caption seek error: {str(e)}")
+        return jsonify({'error': 'Failed to fetch captions', 'details': str(e)}), 500
+
 @app.route('/api/generate-summary', methods=['POST'])
 def generate_summary():
     try:
@@ -369,94 +679,34 @@ def generate_course_summary():
         data = request.get_json()
         captions = data.get('captions')
         language = data.get('language', '').lower()
+        video_id = data.get('videoId')
+
+        # Curated lesson videos are summarized ahead of time by prefetch_courses.py
+        if video_id:
+            precomputed = course_artifact.get_summary(video_id, language)
+            if precomputed is not None:
+                return jsonify(precomputed)
 
         if not captions:
             return jsonify({'error': 'Missing captions'}), 400
 
-        headers = {
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        # Language-specific prompts
-        language_prompts = {
-            'spanish': "Analyze these Spanish language captions for key Spanish learning concepts",
-            'french': "Analyze these French language captions for key French learning concepts",
-            'german': "Analyze these German language captions for key German learning concepts",
-            'default': f"Analyze these {language} language captions for key language learning concepts"
-        }
-
-        base_prompt = language_prompts.get(language, language_prompts['default'])
-        
-        structured_prompt = f"""{base_prompt}
-
-        Text to analyze: {captions}
-
-        Create a comprehensive language learning analysis that includes:
-        1. Key vocabulary with translations and example usage
-        2. Grammar patterns and rules demonstrated
-        3. Cultural context and insights
-        4. Practice exercises and dialogues
-        5. Important phrases and expressions
-        6. Timeline of topics covered
-
-        Format as JSON with:
-        {{
-            "mainPoints": ["5-7 key learning points"],
-            "keyVocabulary": [
-                {{"word": "original word", "meaning": "translation and usage notes"}}
-            ],
-            "conceptBreakdown": [
-                {{"concept": "grammar or usage pattern", "explanation": "detailed explanation with examples"}}
-            ],
-            "culturalInsights": ["3-5 cultural insights"],
-            "practiceExercises": [
-                {{
-                    "type": "dialogue/exercise type",
-                    "description": "complete exercise with examples and translations"
-                }}
-            ],
-            "timeline": [
-                {{"time": "MM:SS", "topic": "topic description"}}
-            ]
-        }}"""
-
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers=headers,
-            json={
-                "model": "llama-3.3-70b-versatile",
-                "messages": [
-                    {"role": "system", "content": "You are an expert language teacher creating detailed lesson summaries with timelines and practice materials."},
-                    {"role": "user", "content": structured_prompt}
-                ],
-                "temperature": 0.3,
-                "max_tokens": 4000,
-                "response_format": {"type": "json_object"}
-            }
-        )
-
-        if not response.ok:
-            logger.error(f"Groq API error: {response.text}")
-            return jsonify({'error': 'Failed to generate summary'}), response.status_code
+        timing = data.get('timing')
+        if timing:
+            # Timed captions let the timeline be located locally
+            try:
+                captions = CaptionIndex.from_columns(timing)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
 
-        result = response.json()
-        content = json.loads(result['choices'][0]['message']['content'])
+        content = course_summary_service.summarize(captions, language)
 
         # Enhanced response structure with timeline and practice materials
-        formatted_response = {
-            "summary": {
-                "mainPoints": content.get("mainPoints", []),
-                "keyVocabulary": content.get("keyVocabulary", []),
-                "conceptBreakdown": content.get("conceptBreakdown", []),
-                "culturalInsights": content.get("culturalInsights", []),
-                "practiceExercises": content.get("practiceExercises", [])
-            },
-            "timestamps": content.get("timeline", [{"time": "0:00", "topic": "Start of lesson"}])
-        }
-
-        return jsonify(formatted_response)
+        return jsonify(format_course_summary(content))
 
+    except requests.HTTPError as e:
+        logger.error(f"Groq API error: {e.response.text if e.response is not None else str(e)}")
+        status = e.response.status_code if e.response is not None else 502
+        return jsonify({'error': 'Failed to generate summary'}), status
     except Exception as e:
         logger.exception("Failed to generate course summary")
         error_msg = str(e)
@@ -482,7 +732,8 @@ def generate_practice():
         if not all([language, level, exercise_type]):
             return jsonify({'error': 'Missing required parameters'}), 400
 
-        exercises = practice_service.generate_exercises(language, level, exercise_type)
+        # Served from ready-made sets; the pool refills itself in the background
+        exercises = practice_pool.get(language, level, exercise_type, learner_id=data.get('learnerId'))
         
         # Validate response structure
         if not exercises or 'exercises' not in exercises or not exercises['exercises']:
@@ -505,7 +756,7 @@ def generate_summary_from_captions(captions: str, language: str) -> str:
 
         prompt = f"Generate a summary for the following captions in {language}:\n\n{captions}"
 
-        response = requests.post(
+        response = http_client.post(
             GROQ_API_ENDPOINT,
             headers=headers,
             json={
@@ -0,0 +1,305 @@
+"""ASGI entry point serving the /api routes with the async service layer.
+
+Run with e.g. ``uvicorn asgi:app --workers 4``. Routes with an async
+implementation below are handled on the event loop; every other route falls
+through to the Flask app in ``app.py`` via the WSGI bridge.
+"""
+import asyncio
+import json
+import logging
+import os
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.wsgi import WSGIMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+
+from app import app as flask_app, GROQ_API_KEY, translation_cache, http_client, audio_blobs, VOICE_AUDIO_MODE, speech_service as sync_speech_service, chat_sessions, practice_pool, lesson_store, learning_service as sync_learning_service, chatbot_service as sync_chatbot_service
+from services.async_http_client import AsyncGroqHttpClient
+from services.chatbot_service import OPTIONS_MODES
+from services.translator import AUDIO_MODES
+from services.audio_blob_store import safe_audio_type
+from services.audio_preprocess import AudioTooLong
+from services.chat_session_store import SessionNotFound, parse_chat_request, record_exchange
+from services.async_services import (
+    AsyncGroqTranslator,
+    AsyncSpeechService,
+    AsyncChatbotService,
+    AsyncPracticeService,
+    AsyncLearningService,
+)
+
+logger = logging.getLogger(__name__)
+
+async_http_client = AsyncGroqHttpClient(
+    pool_maxsize=int(os.getenv("GROQ_ASYNC_POOL_MAXSIZE", "100")),
+    timeouts=http_client.timeouts,
+    connect_timeout=http_client.connect_timeout,
+    rate_limiter=http_client.rate_limiter
+)
+translator = AsyncGroqTranslator(
+    GROQ_API_KEY,
+    http_client=async_http_client,
+    cache=translation_cache,
+    audio_store=audio_blobs,
+    speech_service=AsyncSpeechService(
+        GROQ_API_KEY,
+        http_client=async_http_client,
+        codec=sync_speech_service.codec,
+        chunk_seconds=sync_speech_service.chunk_seconds,
+        max_workers=sync_speech_service.max_workers,
+        max_duration=sync_speech_service.max_duration,
+        backend=sync_speech_service.backend,
+        local_backend=sync_speech_service.local_backend
+    )
+)
+learning_service = AsyncLearningService(
+    GROQ_API_KEY,
+    http_client=async_http_client,
+    store=lesson_store,
+    variants=sync_learning_service.variants
+)
+practice_service = AsyncPracticeService(GROQ_API_KEY, http_client=async_http_client)
+chatbot_service = AsyncChatbotService(
+    GROQ_API_KEY,
+    http_client=async_http_client,
+    options_mode=sync_chatbot_service.options_mode,
+    history=sync_chatbot_service.history
+)
+
+async def _json_body(request: Request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+async def translate_text(request: Request):
+    try:
+        data = await _json_body(request)
+        logger.debug(f"Received translation request: {data}")
+
+        if not data:
+            return JSONResponse({'error': 'No JSON data received'}, status_code=400)
+
+        text = data.get('text')
+        source_lang = data.get('sourceLang')
+        target_lang = data.get('targetLang')
+
+        if not all([text, source_lang, target_lang]):
+            return JSONResponse({
+                'error': 'Missing required parameters',
+                'received': {
+                    'text': text,
+                    'sourceLang': source_lang,
+                    'targetLang': target_lang
+                }
+            }, status_code=400)
+
+        result = await translator.translate_with_context(text, source_lang, target_lang)
+        return JSONResponse(result)
+
+    except Exception as e:
+        logger.exception("Translation error occurred")
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+async def translate_voice(request: Request):
+    try:
+        # Same upload limit as the Flask app, checked before the body is spooled
+        max_upload = flask_app.config['MAX_CONTENT_LENGTH']
+        if int(request.headers.get('content-length') or 0) > max_upload:
+            return JSONResponse({'error': f'Upload exceeds {max_upload} bytes'}, status_code=413)
+
+        form = await request.form()
+        audio_file = form.get('audio')
+        if audio_file is None or isinstance(audio_file, str):
+            return JSONResponse({'error': 'No audio file provided'}, status_code=400)
+        if audio_file.size is not None and audio_file.size > max_upload:
+            return JSONResponse({'error': f'Upload exceeds {max_upload} bytes'}, status_code=413)
+
+        source_lang = form.get('sourceLang', 'auto')
+        target_lang = form.get('targetLang')
+
+        if not target_lang:
+            return JSONResponse({'error': 'Target language is required'}, status_code=400)
+
+        audio_mode = form.get('audioMode', VOICE_AUDIO_MODE)
+        if audio_mode not in AUDIO_MODES:
+            return JSONResponse({'error': f"audioMode must be one of {', '.join(AUDIO_MODES)}"}, status_code=400)
+
+        transcriber = form.get('transcriber') or None
+        if transcriber is not None and transcriber not in sync_speech_service.backends:
+            return JSONResponse({'error': f"transcriber must be one of {', '.join(sync_speech_service.backends)}"},
+                                status_code=400)
+
+        # Starlette already spooled the upload; hand over the file instead of reading it into memory
+        result = await translator.translate_voice(audio_file.file, source_lang, target_lang,
+                                                  audio_mode=audio_mode,
+                                                  audio_type=safe_audio_type(audio_file.content_type),
+                                                  backend=transcriber)
+        return JSONResponse(result)
+
+    except AudioTooLong as e:
+        return JSONResponse({'error': str(e)}, status_code=413)
+    except Exception as e:
+        logger.exception("Voice translation error occurred")
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+async def get_lesson(request: Request):
+    try:
+        data = await _json_body(request)
+        if not data:
+            raise ValueError("No data provided")
+
+        lesson_name = data.get('lesson')
+        language = data.get('language')
+        level = data.get('level')
+
+        if not all([lesson_name, language, level]):
+            raise ValueError("Missing required parameters")
+
+        content = await learning_service.generate_lesson_content(lesson_name, language, level)
+
+        if not content or not content.get('sections'):
+            raise ValueError("Invalid lesson content generated")
+
+        return JSONResponse(content)
+
+    except Exception as e:
+        logger.exception("Failed to generate lesson")
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+async def chat(request: Request):
+    try:
+        data = await _json_body(request)
+        if not data:
+            return JSONResponse({'error': 'No data provided'}, status_code=400)
+
+        language = data.get('language', 'en')
+        options_mode = data.get('optionsMode')
+
+        # Validate language parameter
+        if language not in ['en', 'es', 'fr', 'de']:
+            language = 'en'
+        if options_mode not in OPTIONS_MODES:
+            options_mode = None
+
+        try:
+            session_id, new_message, formatted_messages = await asyncio.to_thread(parse_chat_request, data, chat_sessions)
+        except SessionNotFound:
+            return JSONResponse({'error': 'Unknown chat session'}, status_code=404)
+        except ValueError as e:
+            return JSONResponse({'error': str(e)}, status_code=400)
+
+        result = await chatbot_service.generate_response(formatted_messages, language, options_mode=options_mode)
+
+        if session_id:
+            await asyncio.to_thread(record_exchange, chat_sessions, session_id, new_message, result['response'])
+
+        return JSONResponse({
+            'response': result['response'],
+            'options': result['options'],
+            'language': language,
+            'sessionId': session_id
+        })
+
+    except Exception as e:
+        logger.exception("Chatbot error occurred")
+        return JSONResponse({
+            'error': f'Chatbot error: {str(e)}',
+            'details': 'Please try again'
+        }, status_code=500)
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def chat_stream(request: Request):
+    data = await _json_body(request)
+    if not data:
+        return JSONResponse({'error': 'No data provided'}, status_code=400)
+
+    language = data.get('language', 'en')
+    options_mode = data.get('optionsMode')
+    if language not in ['en', 'es', 'fr', 'de']:
+        language = 'en'
+    if options_mode not in OPTIONS_MODES:
+        options_mode = None
+
+    try:
+        session_id, new_message, formatted_messages = await asyncio.to_thread(parse_chat_request, data, chat_sessions)
+    except SessionNotFound:
+        return JSONResponse({'error': 'Unknown chat session'}, status_code=404)
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+
+    async def events():
+        try:
+            async for event, payload in chatbot_service.stream_response(formatted_messages, language, options_mode=options_mode):
+                if event == 'done':
+                    payload['language'] = language
+                    payload['sessionId'] = session_id
+                    if session_id:
+                        await asyncio.to_thread(record_exchange, chat_sessions, session_id, new_message, payload['response'])
+                yield _sse(event, payload)
+        except Exception as e:
+            logger.exception("Chatbot stream error occurred")
+            yield _sse('error', {
+                'error': f'Chatbot error: {str(e)}',
+                'details': 'Please try again'
+            })
+
+    return StreamingResponse(
+        events(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+async def generate_practice(request: Request):
+    try:
+        data = await _json_body(request)
+        if not data:
+            return JSONResponse({'error': 'No data provided'}, status_code=400)
+
+        language = data.get('language')
+        level = data.get('level')
+        exercise_type = data.get('type')
+
+        if not all([language, level, exercise_type]):
+            return JSONResponse({'error': 'Missing required parameters'}, status_code=400)
+
+        exercises = await asyncio.to_thread(practice_pool.take, language, level, exercise_type,
+                                            learner_id=data.get('learnerId'))
+        if exercises is None:
+            exercises = await practice_service.generate_exercises(language, level, exercise_type)
+
+        if not exercises or 'exercises' not in exercises or not exercises['exercises']:
+            logger.error(f"Invalid exercise data generated: {exercises}")
+            return JSONResponse({'error': 'Failed to generate valid exercises'}, status_code=500)
+
+        return JSONResponse(exercises)
+
+    except Exception as e:
+        logger.exception("Failed to generate practice exercises")
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+async def shutdown():
+    await async_http_client.close()
+
+app = Starlette(
+    routes=[
+        Route('/api/translate/text', translate_text, methods=['POST']),
+        Route('/api/translate/voice', translate_voice, methods=['POST']),
+        Route('/api/learning/lesson', get_lesson, methods=['POST']),
+        Route('/api/chatbot', chat, methods=['POST']),
+        Route('/api/chatbot/stream', chat_stream, methods=['POST']),
+        Route('/api/practice/generate', generate_practice, methods=['POST']),
+        # Remaining routes are served by the Flask app in a thread pool
+        Mount('/', app=WSGIMiddleware(flask_app)),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])
+    ],
+    on_shutdown=[shutdown]
+)
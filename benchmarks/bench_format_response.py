@@ -0,0 +1,72 @@
+"""Micro-benchmark for the chatbot response formatter.
+
+Compares ``format_markdown`` against the previous regex/str.replace
+implementation on generated tutor replies of roughly 500 and 5,000 tokens and
+checks both produce the same output.
+
+    python benchmarks/bench_format_response.py
+"""
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.chat_history import count_tokens
+from services.chatbot_service import SECTION_HEADINGS, format_markdown
+
+def legacy_format_response(content: str) -> str:
+    """The formatter as it was before the single-pass rewrite."""
+    formatted = content.strip()
+    section_formats = {section: heading + '\n{content}\n' for section, heading in SECTION_HEADINGS.items()}
+
+    for section, template in section_formats.items():
+        pattern = f'{section}:(.*?)(?=(?:{"|".join(section_formats.keys())}):|\\Z)'
+        for match in re.finditer(pattern, formatted, re.DOTALL):
+            body = match.group(1).strip()
+            formatted = formatted.replace(f'{section}:{body}', template.format(content=body))
+
+    formatted = re.sub(r'([^(]+)\s*\(([^)]+)\)', r'\1\n(\2)', formatted)
+    return re.sub(r'(?m)^[-•]\s*(.+)$', r'* \1', formatted)
+
+_PHRASES = [
+    ("¿Cómo estás?", "How are you?"),
+    ("Me gusta aprender idiomas", "I like learning languages"),
+    ("la biblioteca", "the library"),
+    ("Je voudrais un café", "I would like a coffee"),
+    ("Ich habe Hunger", "I am hungry"),
+    ("hasta luego", "see you later"),
+]
+
+def make_reply(target_tokens: int, seed: int = 0) -> str:
+    """Build a tutor-style reply with every section, bullets and inline translations."""
+    rng = random.Random(seed)
+    lines = ["Great question! Let's look at this step by step."]
+    n = 0
+    while count_tokens('\n'.join(lines)) < target_tokens:
+        for section in SECTION_HEADINGS:
+            if count_tokens('\n'.join(lines)) >= target_tokens:
+                break
+            n += 1
+            lines.append(f"{section}:Part {n} covers how to use this in everyday conversation.")
+            for _ in range(rng.randint(2, 4)):
+                phrase, meaning = rng.choice(_PHRASES)
+                lines.append(f"{rng.choice('-•')} {phrase} ({meaning}) is common in part {n}.")
+            lines.append("")
+    return '\n'.join(lines)
+
+def main() -> None:
+    for target in (500, 5000):
+        reply = make_reply(target)
+        assert legacy_format_response(reply) == format_markdown(reply), "formatter output differs"
+
+        number = max(1, 20000 // target)
+        legacy = min(timeit.repeat(lambda: legacy_format_response(reply), number=number, repeat=5)) / number
+        current = min(timeit.repeat(lambda: format_markdown(reply), number=number, repeat=5)) / number
+        print(f"{count_tokens(reply):>6} tokens  legacy {legacy * 1e3:8.3f} ms  "
+              f"single-pass {current * 1e3:8.3f} ms  speedup {legacy / current:5.1f}x")
+
+if __name__ == '__main__':
+    main()
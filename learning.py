@@ -6,6 +6,9 @@ from typing import Dict, List, Optional
 import logging
 import requests
 import os
+from services.learning_service import lesson_cache
+from services.course_catalog import CourseCatalog
+from services.progress_store import get_progress_store, DEFAULT_PROGRESS_STORE_PATH, DEFAULT_USER_ID
 
 # Configure logging for learning module
 logger = logging.getLogger(__name__)
@@ -263,6 +266,9 @@ LANGUAGE_COURSES = {
     }
 }
 
+# Lookup indexes over LANGUAGE_COURSES, built once at import
+CATALOG = CourseCatalog(LANGUAGE_COURSES)
+
 # Complete LESSON_CONTENT dictionary
 LESSON_CONTENT = {
     "Spanish": {
@@ -370,6 +376,11 @@ class LanguageLearningSystem:
         self.selected_lesson = None
         self.selected_lesson_id = None
         self.progress = {}
+        # Completed lessons per language as a bitset over CATALOG positions, plus its popcount
+        self.completed_bits = {}
+        self.completed_counts = {}
+        self.user_id = os.getenv("LEARNER_ID", DEFAULT_USER_ID)
+        self.store = get_progress_store(os.getenv("PROGRESS_STORE_PATH", DEFAULT_PROGRESS_STORE_PATH))
         self.lesson_generator = DynamicLessonGenerator()
         self.current_lesson = None
         self.load_progress()
@@ -378,13 +389,49 @@ class LanguageLearningSystem:
     def initialize_progress(self):
         """Initialize the progress tracking system"""
         if 'learning_progress' not in st.session_state:
-            st.session_state.learning_progress = {}
+            st.session_state.learning_progress = self._load_stored_progress()
         self.progress = st.session_state.learning_progress
         if 'progress' in st.session_state:
             self.main_progress = st.session_state.progress
         else:
             st.session_state.progress = {}
             self.main_progress = st.session_state.progress
+        self._index_progress()
+
+    def _load_stored_progress(self):
+        """Completed lessons persisted by earlier sessions"""
+        try:
+            return {f"{language}-{lesson_id}": True
+                    for language, lesson_id in self.store.completed_lessons(self.user_id)}
+        except Exception as e:
+            logger.error(f"Failed to load stored progress: {str(e)}")
+            return {}
+
+    def _index_progress(self):
+        """Rebuild the per-language completion bitsets from the progress dict"""
+        self.completed_bits = {}
+        self.completed_counts = {}
+        for key, done in self.progress.items():
+            if done:
+                language, _, lesson_id = key.partition('-')
+                self._mark_completed(language, lesson_id)
+
+    def _mark_completed(self, language, lesson_id):
+        """Set the lesson's bit; returns False if it was already set or is not in the catalog"""
+        position = CATALOG.position(language, lesson_id)
+        if position is None:
+            return False
+        bits = self.completed_bits.get(language, 0)
+        mask = 1 << position
+        if bits & mask:
+            return False
+        self.completed_bits[language] = bits | mask
+        self.completed_counts[language] = self.completed_counts.get(language, 0) + 1
+        return True
+
+    def is_completed(self, language, lesson_id):
+        position = CATALOG.position(language, lesson_id)
+        return position is not None and bool(self.completed_bits.get(language, 0) >> position & 1)
 
     def select_language(self):
         languages = list(LANGUAGE_COURSES.keys())
@@ -397,35 +444,31 @@ class LanguageLearningSystem:
 
     def get_lesson_id(self, title):
         """Get lesson ID from lesson title"""
-        for lang in LANGUAGE_COURSES:
-            for chapter in LANGUAGE_COURSES[lang]["chapters"].values():
-                for lesson in chapter["lessons"]:
-                    if lesson["title"] == title:
-                        return lesson["id"]
-        return None
+        return CATALOG.lesson_id(title)
 
     def select_lesson(self):
-        chapters = LANGUAGE_COURSES[self.selected_language]["chapters"]
-        for chap_id, chap_data in chapters.items():
-            if chap_data["title"] == self.selected_chapter:
-                lessons = chap_data["lessons"]
-                lesson_titles = [lesson["title"] for lesson in lessons]
-                self.selected_lesson = st.sidebar.selectbox("Select Lesson", lesson_titles)
-                # Get the lesson ID for the selected title
-                for lesson in lessons:
-                    if lesson["title"] == self.selected_lesson:
-                        self.selected_lesson_id = lesson["id"]
-                break
-
-    def update_progress(self):
-        """Update progress for current lesson"""
-        if self.selected_language and self.selected_lesson:
-            lesson_key = f"{self.selected_language}-{self.selected_lesson_id}"
+        chap_id = CATALOG.chapter_id(self.selected_language, self.selected_chapter)
+        if chap_id is not None:
+            lessons = LANGUAGE_COURSES[self.selected_language]["chapters"][chap_id]["lessons"]
+            lesson_titles = [lesson["title"] for lesson in lessons]
+            self.selected_lesson = st.sidebar.selectbox("Select Lesson", lesson_titles)
+            # Get the lesson ID for the selected title
+            self.selected_lesson_id = CATALOG.lesson_id(self.selected_lesson, self.selected_language)
+
+    def update_progress(self, lesson_id=None):
+        """Update progress for the given lesson, defaulting to the one picked in the sidebar"""
+        lesson_id = lesson_id or self.selected_lesson_id
+        if self.selected_language and lesson_id:
+            lesson_key = f"{self.selected_language}-{lesson_id}"
             self.progress[lesson_key] = True
+            newly_completed = self._mark_completed(self.selected_language, lesson_id)
             st.session_state.learning_progress = self.progress
+            # Queued only; the store writes it in the background. Points are only for the first completion
+            self.store.record_completion(self.user_id, self.selected_language, lesson_id,
+                                         points=10 if newly_completed else 0)
             
             # Update main progress tracker
-            if hasattr(self.main_progress, 'add_points'):
+            if newly_completed and hasattr(self.main_progress, 'add_points'):
                 self.main_progress.add_points(10)
             if hasattr(self.main_progress, 'record_practice'):
                 self.main_progress.record_practice()
@@ -442,24 +485,10 @@ class LanguageLearningSystem:
 
     def get_progress_for_language(self, language):
         """Get progress percentage for a specific language"""
-        if not language or not LANGUAGE_COURSES.get(language):
-            return 0.0
-        
-        total_lessons = sum(
-            len(chapter["lessons"]) 
-            for chapter in LANGUAGE_COURSES[language]["chapters"].values()
-        )
-        
+        total_lessons = CATALOG.lesson_count(language) if language else 0
         if total_lessons == 0:
             return 0.0
-            
-        # Use self.progress dictionary instead of UserProgressTracker
-        completed_lessons = sum(
-            1 for key in self.progress.keys() 
-            if key.startswith(f"{language}-") and self.progress[key]
-        )
-        
-        return completed_lessons / total_lessons
+        return self.completed_counts.get(language, 0) / total_lessons
 
     def show_lesson(self, lesson_id):
         """Load and display a specific lesson"""
@@ -472,17 +501,9 @@ class LanguageLearningSystem:
                 return LESSON_CONTENT[self.selected_language][lesson_id]
             
             # If not found, try dynamic generation
-            lesson_title = None
-            for chapter in LANGUAGE_COURSES[self.selected_language]["chapters"].values():
-                for lesson in chapter["lessons"]:
-                    if lesson["id"] == lesson_id:
-                        lesson_title = lesson["title"]
-                        break
-                if lesson_title:
-                    break
-            
-            if lesson_title:
-                return self.lesson_generator.get_lesson_content(lesson_title, self.selected_language)
+            ref = CATALOG.get(self.selected_language, lesson_id)
+            if ref:
+                return self.lesson_generator.get_lesson_content(ref.lesson["title"], self.selected_language)
             
             raise ValueError(f"No content found for lesson {lesson_id}")
                 
@@ -572,12 +593,9 @@ def show_lesson_interface(system):
         
         # Set the selected language if not already set
         if not system.selected_language:
-            for lang in LANGUAGE_COURSES:
-                for chapter in LANGUAGE_COURSES[lang]["chapters"].values():
-                    for l in chapter["lessons"]:
-                        if l["id"] == lesson["id"]:
-                            system.selected_language = lang
-                            break
+            ref = CATALOG.locate(lesson)
+            if ref:
+                system.selected_language = ref.language
         
         lesson_content = system.show_lesson(lesson["id"])
         
@@ -625,7 +643,7 @@ def show_lesson_interface(system):
         
         with col2:
             if st.button("Complete Lesson ✓"):
-                system.update_progress()
+                system.update_progress(lesson["id"])
                 st.success("¡Muy bien! Lesson completed! +10 points")
                 next_lesson = get_next_lesson(system.selected_language, lesson["id"])
                 if next_lesson:
@@ -713,14 +731,16 @@ if __name__ == "__main__":
 
 class DynamicLessonGenerator:
     def __init__(self):
-        self.lesson_cache = {}
+        # Process-wide and bounded, so every Streamlit session shares generated lessons
+        self.lesson_cache = lesson_cache()
         
     def get_lesson_content(self, lesson_name, language):
         try:
             # Try to get from cache first
-            cache_key = f"{language}_{lesson_name}"
-            if cache_key in self.lesson_cache:
-                return self.lesson_cache[cache_key]
+            cache_key = ("streamlit", language, lesson_name)
+            cached = self.lesson_cache.get(cache_key)
+            if cached is not None:
+                return cached
             
             # Generate dynamic content if not in cache
             content = self._generate_lesson_content(lesson_name, language)
@@ -728,7 +748,7 @@ class DynamicLessonGenerator:
                 return self.get_fallback_content(lesson_name)
                 
             # Cache the content
-            self.lesson_cache[cache_key] = content
+            self.lesson_cache.set(cache_key, content)
             return content
         except Exception as e:
             logger.error(f"Error generating lesson content: {str(e)}")
@@ -803,25 +823,7 @@ class DynamicLessonGenerator:
 
 def get_next_lesson(language, current_id):
     """Helper function to find the next lesson"""
-    current_chapter, current_lesson = current_id.split('.')
-    current_chapter = int(current_chapter)
-    current_lesson = int(current_lesson)
-    
-    chapters = LANGUAGE_COURSES[language]["chapters"]
-    
-    # Try next lesson in current chapter
-    if f"{current_chapter}.{current_lesson + 1}" in LESSON_CONTENT[language]:
-        for lesson in chapters[str(current_chapter)]["lessons"]:
-            if lesson["id"] == f"{current_chapter}.{current_lesson + 1}":
-                return lesson
-    
-    # Try first lesson of next chapter
-    if str(current_chapter + 1) in chapters:
-        next_chapter_lessons = chapters[str(current_chapter + 1)]["lessons"]
-        if next_chapter_lessons:
-            return next_chapter_lessons[0]
-    
-    return None
+    return CATALOG.next_lesson(language, current_id)
 
 # Move GROQ configuration to proper location
 GROQ_API_ENDPOINT = "https://api.groq.com/v1/completions"
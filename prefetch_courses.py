@@ -0,0 +1,85 @@
+"""Prefetch captions and course summaries for every curated lesson video.
+
+Walks ``LANGUAGE_COURSES`` in learning.py, fetches each lesson video's
+captions and generates its course summary with bounded parallelism, and
+writes a versioned artifact that app.py loads at startup:
+
+    python prefetch_courses.py --workers 4
+    python prefetch_courses.py --languages spanish french --skip-summaries
+
+Entries already in an existing artifact, and cached captions, are kept unless
+``--refresh`` is given.
+"""
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app import course_summary_service, fetch_captions, caption_cache
+from services.course_artifact import CourseArtifact, DEFAULT_ARTIFACT_PATH, DEFAULT_COURSES_PATH, load_language_courses, iter_course_videos
+from services.course_summary_service import format_course_summary
+
+logger = logging.getLogger('prefetch_courses')
+
+def prefetch_video(artifact: CourseArtifact, language: str, video_id: str, summarize: bool, refresh: bool) -> str:
+    captions = None if refresh else artifact.get_captions(video_id, language)
+    if captions is None:
+        # Fetch through the caption cache so the running app is warmed too
+        if refresh:
+            # Bypass cached entries, then overwrite them with what YouTube has now
+            captions = fetch_captions(video_id, language)
+            caption_cache.set(video_id, language, captions)
+        else:
+            captions = caption_cache.get_or_load(video_id, language, fetch_captions)
+        if captions is None:
+            return 'no captions'
+        artifact.add_captions(video_id, language, captions)
+
+    if summarize and (refresh or artifact.get_summary(video_id, language) is None):
+        content = course_summary_service.summarize(captions['index'], language)
+        artifact.add_summary(video_id, language, format_course_summary(content))
+    return 'ok'
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--output', default=DEFAULT_ARTIFACT_PATH, help='artifact path (default: %(default)s)')
+    parser.add_argument('--courses', default=DEFAULT_COURSES_PATH, help='module defining LANGUAGE_COURSES')
+    parser.add_argument('--workers', type=int, default=4, help='videos processed concurrently')
+    parser.add_argument('--languages', nargs='*', help='only these languages (e.g. spanish french)')
+    parser.add_argument('--skip-summaries', action='store_true', help='prefetch captions only')
+    parser.add_argument('--refresh', action='store_true', help='refetch entries already in the artifact or caption cache')
+    args = parser.parse_args()
+
+    videos = list(iter_course_videos(load_language_courses(args.courses)))
+    if args.languages:
+        wanted = {language.lower() for language in args.languages}
+        videos = [(language, video_id) for language, video_id in videos if language in wanted]
+
+    artifact = CourseArtifact.load(args.output)
+    logger.info(f"Prefetching {len(videos)} videos with {args.workers} workers")
+
+    started = time.monotonic()
+    failures = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(prefetch_video, artifact, language, video_id, not args.skip_summaries, args.refresh): (language, video_id)
+            for language, video_id in videos
+        }
+        for future in as_completed(futures):
+            language, video_id = futures[future]
+            try:
+                logger.info(f"{language}/{video_id}: {future.result()}")
+            except Exception as e:
+                failures += 1
+                logger.error(f"{language}/{video_id}: failed: {str(e)}")
+
+    artifact.generated_at = time.time()
+    artifact.save(args.output)
+    logger.info(
+        f"Wrote {args.output} with {len(artifact.captions)} captions and {len(artifact.summaries)} summaries "
+        f"in {time.monotonic() - started:.1f}s ({failures} failed)"
+    )
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+
+from .http_client import DEFAULT_TIMEOUTS, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, rate_limit_body
+from .rate_limiter import TokenBucketRateLimiter, RateLimitExceeded, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+class AsyncHTTPError(Exception):
+    """Raised by :meth:`AsyncResponse.raise_for_status` for non-2xx responses."""
+
+    def __init__(self, status_code: int, text: str):
+        super().__init__(f"{status_code} Error: {text[:200]}")
+        self.status_code = status_code
+        self.text = text
+
+class AsyncResponse:
+    """Fully read response exposing the parts of ``requests.Response`` the services use."""
+
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 400
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise AsyncHTTPError(self.status_code, self.text)
+
+class AsyncGroqHttpClient:
+    """aiohttp counterpart of :class:`GroqHttpClient` for the async services.
+
+    The ``ClientSession`` is created lazily inside the running event loop and
+    keeps a pool of keep-alive connections; call :meth:`close` on shutdown.
+    """
+
+    def __init__(self, pool_maxsize: int = 100, timeouts: Optional[Dict[str, float]] = None,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 rate_limiter: Optional[TokenBucketRateLimiter] = None):
+        self.pool_maxsize = pool_maxsize
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.connect_timeout = connect_timeout
+        self.rate_limiter = rate_limiter
+        self._session = None
+
+    def _session_for_loop(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def _timeout_for(self, url: str) -> aiohttp.ClientTimeout:
+        read_timeout = DEFAULT_READ_TIMEOUT
+        for path, timeout in self.timeouts.items():
+            if url.endswith(path):
+                read_timeout = timeout
+                break
+        return aiohttp.ClientTimeout(total=None, connect=self.connect_timeout, sock_read=read_timeout)
+
+    async def _acquire(self, url: str, payload: Optional[Dict], wait: bool) -> Optional[float]:
+        """Draw from the rate limiter, waiting at most the read timeout.
+
+        Returns the suggested retry delay if the wait ran out, else None.
+        """
+        if self.rate_limiter is None:
+            return None
+        tokens = estimate_tokens(payload)
+        read_timeout = self._timeout_for(url).sock_read
+        deadline = asyncio.get_running_loop().time() + read_timeout
+        while True:
+            try:
+                # The limiter takes a file lock shared with other workers; never block the loop on it
+                await asyncio.to_thread(self.rate_limiter.acquire, tokens, wait=False)
+                return None
+            except RateLimitExceeded as e:
+                if not wait:
+                    raise
+                if asyncio.get_running_loop().time() + e.retry_after > deadline:
+                    logger.warning(f"Rate limit quota not free within {read_timeout}s, answering 429 for {url}")
+                    return e.retry_after
+                logger.debug(f"Rate limiter waiting {e.retry_after:.2f} seconds")
+                await asyncio.sleep(e.retry_after)
+
+    async def post(self, url: str, headers: Optional[Dict[str, str]] = None,
+                   json: Optional[Dict] = None, data: Any = None,
+                   rate_limit_wait: bool = True) -> AsyncResponse:
+        retry_after = await self._acquire(url, json, rate_limit_wait)
+        if retry_after is not None:
+            return AsyncResponse(429, rate_limit_body(retry_after))
+        session = self._session_for_loop()
+        async with session.post(url, headers=headers, json=json, data=data,
+                                timeout=self._timeout_for(url)) as response:
+            text = await response.text()
+            return AsyncResponse(response.status, text)
+
+    async def stream_lines(self, url: str, headers: Optional[Dict[str, str]] = None,
+                           json: Optional[Dict] = None,
+                           rate_limit_wait: bool = True) -> AsyncIterator[bytes]:
+        """POST and yield the response body line by line as it arrives."""
+        retry_after = await self._acquire(url, json, rate_limit_wait)
+        if retry_after is not None:
+            raise AsyncHTTPError(429, rate_limit_body(retry_after))
+        session = self._session_for_loop()
+        async with session.post(url, headers=headers, json=json,
+                                timeout=self._timeout_for(url)) as response:
+            if response.status >= 400:
+                raise AsyncHTTPError(response.status, await response.text())
+            async for line in response.content:
+                yield line
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
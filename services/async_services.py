@@ -0,0 +1,378 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from .async_http_client import AsyncGroqHttpClient, AsyncHTTPError
+from .chat_history import ChatHistoryManager
+from .chatbot_service import ChatbotService, DEFAULT_OPTIONS, StreamingFormatter, parse_stream_line, suggest_options
+from .learning_service import LearningService
+from .lesson_store import LessonStore
+from .audio_preprocess import PreparedAudio
+from .audio_upload import Audio, KeepOpenReader
+from .practice_service import PracticeService
+from .single_flight import AsyncSingleFlight
+from .speech_service import SpeechService, is_retryable, stitch_transcripts
+from .translation_cache import TranslationCache
+from .audio_blob_store import AudioBlobStore
+from .translator import AUDIO_INLINE, GroqTranslator, TRANSLATION_PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+# The async services reuse the prompt building and response parsing of their
+# blocking counterparts and only replace the transport with aiohttp. The
+# SQLite-backed caches and stores they share are still blocking, so every call
+# into them goes through asyncio.to_thread.
+
+class AsyncSpeechService(SpeechService):
+    def __init__(self, api_key: str, http_client: AsyncGroqHttpClient, **kwargs):
+        super().__init__(api_key, **kwargs)
+        self.http = http_client
+
+    def _form(self, prepared: PreparedAudio, fields: Dict) -> aiohttp.FormData:
+        prepared.stream.seek(0)
+        form = aiohttp.FormData()
+        # aiohttp streams file objects part by part instead of copying them
+        form.add_field('file', KeepOpenReader(prepared.stream), filename=prepared.filename,
+                       content_type=prepared.content_type)
+        for name, value in fields.items():
+            if value is not None:
+                form.add_field(name, value)
+        return form
+
+    async def _post_with_retries(self, endpoint: str, prepared: PreparedAudio, fields: Dict) -> Dict:
+        for attempt in range(self.chunk_retries + 1):
+            try:
+                response = await self.http.post(
+                    f"{self.base_url}/{endpoint}",
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    data=self._form(prepared, fields)
+                )
+                response.raise_for_status()
+                return response.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError, AsyncHTTPError) as e:
+                status = e.status_code if isinstance(e, AsyncHTTPError) else None
+                if attempt == self.chunk_retries or not is_retryable(status):
+                    raise
+                delay = self.retry_delay * (2 ** attempt)
+                logger.warning(f"Audio chunk at {prepared.offset:.1f}s failed ({str(e)}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+
+    async def _post_audio(self, endpoint: str, audio: Audio, fields: Dict) -> Dict:
+        # Decoding and re-encoding is CPU bound, keep it off the event loop
+        chunks = await asyncio.to_thread(self._prepare, audio)
+        if len(chunks) == 1:
+            return stitch_transcripts(chunks, [await self._post_with_retries(endpoint, chunks[0], fields)])
+
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def post_chunk(chunk: PreparedAudio) -> Dict:
+            async with semaphore:
+                return await self._post_with_retries(endpoint, chunk, fields)
+
+        tasks = [asyncio.ensure_future(post_chunk(chunk)) for chunk in chunks]
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            # gather leaves the other uploads running when one fails or the request is cancelled
+            for task in tasks:
+                task.cancel()
+        return stitch_transcripts(chunks, results)
+
+    async def transcribe_audio(self, audio_data: Audio, source_lang: str = "auto",
+                               backend: Optional[str] = None) -> Dict:
+        """Transcribe audio using Whisper model."""
+        try:
+            if self._use_local(backend):
+                return await asyncio.to_thread(self._run_local, audio_data, source_lang, 'transcribe')
+            return await self._post_audio("transcriptions", audio_data, self._transcription_fields(source_lang))
+
+        except Exception as e:
+            logger.error(f"Transcription error: {str(e)}")
+            raise
+
+    async def translate_audio(self, audio_data: Audio, backend: Optional[str] = None) -> Dict:
+        """Translate audio directly to English text using Whisper."""
+        try:
+            if self._use_local(backend):
+                return await asyncio.to_thread(self._run_local, audio_data, "auto", 'translate')
+            return await self._post_audio("translations", audio_data, self._translation_fields())
+
+        except Exception as e:
+            logger.error(f"Audio translation error: {str(e)}")
+            raise
+
+class AsyncGroqTranslator(GroqTranslator):
+    def __init__(self, api_key: str, http_client: AsyncGroqHttpClient,
+                 cache: Optional[TranslationCache] = None,
+                 audio_store: Optional[AudioBlobStore] = None,
+                 speech_service: Optional[AsyncSpeechService] = None):
+        super().__init__(api_key, cache=cache, audio_store=audio_store, speech_service=speech_service)
+        self.http = http_client
+        self.inflight = AsyncSingleFlight()
+
+    async def _backoff(self, retry_count: int) -> None:
+        """Exponential backoff on 429 without blocking the event loop."""
+        if retry_count >= self.max_retries:
+            raise Exception("Max retries exceeded, please try again later")
+
+        delay = self.retry_delay * (2 ** retry_count)
+        logger.warning(f"Rate limited, waiting {delay} seconds before retry")
+        await asyncio.sleep(delay)
+
+    async def translate_with_context(self, text: str, source_lang: str, target_lang: str) -> Dict:
+        if source_lang == "auto":
+            source_lang = self.detect_language(text)
+            logger.info(f"Detected language: {source_lang}")
+
+        cache_key = TranslationCache.make_key(text, source_lang, target_lang, TRANSLATION_PROMPT_VERSION)
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                logger.debug(f"Translation cache hit for {source_lang}->{target_lang}")
+                return cached
+
+        return await self.inflight.do(cache_key, self._translate_uncached, text, source_lang, target_lang, cache_key)
+
+    async def _translate_uncached(self, text: str, source_lang: str, target_lang: str, cache_key: Optional[str] = None) -> Dict:
+        retry_count = 0
+        while retry_count < self.max_retries:
+            try:
+                response = await self.http.post(
+                    self.base_url,
+                    headers=self.headers,
+                    json=self._build_payload(text, source_lang, target_lang)
+                )
+
+                if response.status_code == 429:  # Too Many Requests
+                    await self._backoff(retry_count)
+                    retry_count += 1
+                    continue
+
+                response.raise_for_status()
+                translation_data = self._parse_translation(response.json())
+                if translation_data is None:
+                    return self._fallback_translation(text)
+
+                if self.cache is not None and cache_key is not None:
+                    await asyncio.to_thread(self.cache.set, cache_key, translation_data)
+
+                return translation_data
+
+            except (aiohttp.ClientError, asyncio.TimeoutError, AsyncHTTPError) as e:
+                logger.error(f"API request failed: {str(e)}")
+                raise Exception(f"Translation service error: {str(e)}")
+            except Exception as e:
+                logger.error(f"Unexpected error: {str(e)}")
+                raise
+
+        raise Exception("Translation failed after maximum retries")
+
+    async def translate_voice(self, audio_data: Audio, source_lang: str, target_lang: str,
+                              audio_mode: str = AUDIO_INLINE, audio_type: str = "audio/wav",
+                              backend: Optional[str] = None) -> Dict:
+        """Translate voice input to voice output with proper error handling."""
+        try:
+            speech_service = self.speech_service or AsyncSpeechService(self.api_key, http_client=self.http)
+
+            transcription = await speech_service.transcribe_audio(audio_data, source_lang, backend=backend)
+            if not transcription or 'text' not in transcription:
+                raise ValueError("Failed to transcribe audio")
+
+            translation = await self.translate_with_context(
+                transcription['text'],
+                source_lang,
+                target_lang
+            )
+
+            # Reads the upload and may write it to the audio blob store
+            return await asyncio.to_thread(self._build_voice_result, audio_data, transcription, translation,
+                                           audio_mode, audio_type)
+
+        except Exception as e:
+            logger.error(f"Voice translation error: {str(e)}")
+            raise
+
+class AsyncChatbotService(ChatbotService):
+    def __init__(self, api_key: str, http_client: AsyncGroqHttpClient,
+                 options_mode: str = "parallel", options_timeout: float = 10,
+                 history: Optional[ChatHistoryManager] = None):
+        super().__init__(api_key, options_mode=options_mode, options_timeout=options_timeout, history=history)
+        self.http = http_client
+
+    async def _build_payload_async(self, messages: List[Dict[str, str]], language: str) -> Dict[str, Any]:
+        # History compaction may call the blocking summarizer, so keep it off the event loop
+        if self.history is None:
+            return self._build_payload(messages, language)
+        return await asyncio.to_thread(self._build_payload, messages, language)
+
+    def _start_options(self, messages: List[Dict[str, str]], language: str, mode: str) -> Optional[asyncio.Task]:
+        if mode != "parallel":
+            return None
+        last_message = next(
+            (msg.get('content', '') for msg in reversed(messages) if msg.get('role') == 'user'),
+            ''
+        )
+        if not last_message:
+            return None
+        return asyncio.ensure_future(self._generate_options_for_message(last_message, language))
+
+    async def _finish_options(self, pending: Optional[asyncio.Task], formatted_content: str, language: str, mode: str) -> List[str]:
+        if mode == "serial":
+            return await self._generate_options(formatted_content, language)
+        if pending is not None:
+            try:
+                return await asyncio.wait_for(pending, timeout=self.options_timeout)
+            except Exception as e:
+                logger.warning(f"Parallel options generation failed: {str(e)}")
+        return suggest_options(formatted_content)
+
+    async def _generate_options_for_message(self, last_message: str, language: str) -> List[str]:
+        response = await self.http.post(
+            self.base_url,
+            headers=self.headers,
+            json=self._message_options_payload(last_message, language)
+        )
+        response.raise_for_status()
+        return self._parse_options(response.json())
+
+    async def generate_response(self, messages: List[Dict[str, str]], language: str = "en",
+                                options_mode: Optional[str] = None) -> Dict[str, Any]:
+        mode = options_mode or self.options_mode
+        pending_options = self._start_options(messages, language, mode)
+        try:
+            response = await self.http.post(
+                self.base_url,
+                headers=self.headers,
+                json=await self._build_payload_async(messages, language)
+            )
+
+            response.raise_for_status()
+            formatted_content = self._parse_completion(response.json())
+
+            suggested_options = await self._finish_options(pending_options, formatted_content, language, mode)
+
+            return {
+                "response": formatted_content,
+                "options": suggested_options
+            }
+
+        except Exception as e:
+            logger.error(f"Chatbot response generation error: {str(e)}")
+            raise
+        finally:
+            if pending_options is not None:
+                pending_options.cancel()
+
+    async def stream_response(self, messages: List[Dict[str, str]], language: str = "en",
+                              options_mode: Optional[str] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Async counterpart of :meth:`ChatbotService.stream_response`."""
+        mode = options_mode or self.options_mode
+        pending_options = self._start_options(messages, language, mode)
+        try:
+            payload = await self._build_payload_async(messages, language)
+            payload["stream"] = True
+
+            formatter = StreamingFormatter()
+            parts = []
+            async for line in self.http.stream_lines(self.base_url, headers=self.headers, json=payload):
+                delta = parse_stream_line(line)
+                if not delta:
+                    continue
+                parts.append(delta)
+                text = formatter.feed(delta)
+                if text:
+                    yield "delta", {"text": text}
+
+            text = formatter.flush()
+            if text:
+                yield "delta", {"text": text}
+
+            if not parts:
+                raise ValueError("No response generated")
+
+            formatted_content = self.format_response(''.join(parts))
+            yield "done", {
+                "response": formatted_content,
+                "options": await self._finish_options(pending_options, formatted_content, language, mode)
+            }
+        finally:
+            # Also runs when the client disconnects and the generator is closed mid-stream
+            if pending_options is not None:
+                pending_options.cancel()
+
+    async def _generate_options(self, last_response: str, language: str) -> List[str]:
+        try:
+            response = await self.http.post(
+                self.base_url,
+                headers=self.headers,
+                json=self._options_payload(last_response, language)
+            )
+
+            response.raise_for_status()
+            return self._parse_options(response.json())
+
+        except Exception as e:
+            logger.error(f"Options generation error: {str(e)}")
+            return list(DEFAULT_OPTIONS)
+
+class AsyncPracticeService(PracticeService):
+    def __init__(self, api_key: str, http_client: AsyncGroqHttpClient):
+        super().__init__(api_key)
+        self.http = http_client
+
+    async def generate_exercises(self, language: str, level: str, exercise_type: str) -> Dict[str, Any]:
+        try:
+            response = await self.http.post(
+                self.base_url,
+                headers=self.headers,
+                json=self._build_payload(language, level, exercise_type)
+            )
+
+            if not response.ok:
+                logger.error(f"API call failed: {response.text}")
+                return self._get_fallback_exercises(language, exercise_type)
+
+            return self._parse_exercises(response.json(), language, exercise_type)
+
+        except Exception as e:
+            logger.error(f"Failed to generate exercises: {str(e)}")
+            return self._get_fallback_exercises(language, exercise_type)
+
+class AsyncLearningService(LearningService):
+    def __init__(self, api_key: str, http_client: AsyncGroqHttpClient,
+                 store: Optional[LessonStore] = None, variants: int = 1):
+        super().__init__(api_key, store=store, variants=variants)
+        self.http = http_client
+        self.inflight = AsyncSingleFlight()
+
+    async def generate_lesson_content(self, lesson_name: str, language: str, level: str) -> Dict[str, Any]:
+        stored = await asyncio.to_thread(self._get_stored, lesson_name, language, level)
+        if stored is not None:
+            return stored
+
+        return await self.inflight.do(
+            (lesson_name, language, level),
+            self._generate_lesson_content, lesson_name, language, level
+        )
+
+    async def _generate_lesson_content(self, lesson_name: str, language: str, level: str) -> Dict[str, Any]:
+        try:
+            response = await self.http.post(
+                self.base_url,
+                headers=self.headers,
+                json=self._build_payload(lesson_name, language, level)
+            )
+
+            response.raise_for_status()
+            lesson = self._parse_lesson(response.json())
+            if lesson is None:
+                return self._get_fallback_content(lesson_name)
+
+            await asyncio.to_thread(self._store, lesson_name, language, level, lesson)
+            return lesson
+
+        except Exception as e:
+            logger.error(f"Failed to generate lesson content: {str(e)}")
+            return self._get_fallback_content(lesson_name)
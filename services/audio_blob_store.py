@@ -0,0 +1,106 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUDIO_BLOB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'audio_blobs.sqlite3')
+
+# Route serving stored blobs; format with the blob id
+AUDIO_URL = "/api/audio/{}"
+
+_AUDIO_TYPE_RE = re.compile(r'^audio/[\w.+-]+$')
+
+def safe_audio_type(content_type: Optional[str]) -> str:
+    """The client-supplied type if it is a plain ``audio/*`` type, else ``audio/wav``.
+
+    Blobs are served from the API origin, so anything else (e.g. text/html)
+    must never be echoed back as the Content-Type.
+    """
+    mimetype = (content_type or '').split(';', 1)[0].strip().lower()
+    return mimetype if _AUDIO_TYPE_RE.match(mimetype) else 'audio/wav'
+
+class AudioBlobStore:
+    """Short-lived, size-bounded store for audio handed back to clients by URL.
+
+    Blobs live in a SQLite file (WAL mode) so every gunicorn worker can serve
+    a URL created by any other. They expire after ``ttl`` seconds, and the
+    oldest ones are dropped once the total would exceed ``max_bytes``.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_AUDIO_BLOB_PATH, max_bytes: int = 64 * 1024 * 1024,
+                 ttl: float = 300):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = self._connection()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS blobs ("
+                "id TEXT PRIMARY KEY, content_type TEXT NOT NULL, data BLOB NOT NULL, "
+                "size INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS blobs_expiry ON blobs (expires_at)")
+            conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Audio blob store disabled: {str(e)}")
+            self.db_path = None
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, data: bytes, content_type: str) -> Optional[str]:
+        """Store a blob and return its id, or ``None`` if it could not be stored."""
+        if not self.db_path or len(data) > self.max_bytes:
+            return None
+        blob_id = uuid.uuid4().hex
+        now = time.time()
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM blobs WHERE expires_at <= ?", (now,))
+                conn.execute(
+                    "INSERT INTO blobs (id, content_type, data, size, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    (blob_id, safe_audio_type(content_type), sqlite3.Binary(data), len(data), now + self.ttl)
+                )
+                # Drop the oldest blobs until the total fits again
+                conn.execute(
+                    "DELETE FROM blobs WHERE id IN ("
+                    "SELECT id FROM (SELECT id, SUM(size) OVER (ORDER BY expires_at DESC) AS total FROM blobs) "
+                    "WHERE total > ?)",
+                    (self.max_bytes,)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to store audio blob: {str(e)}")
+            return None
+        return blob_id
+
+    def get(self, blob_id: str) -> Optional[Tuple[bytes, str]]:
+        """``(data, content_type)``, or ``None`` once the blob has expired or been evicted."""
+        if not self.db_path:
+            return None
+        try:
+            row = self._connection().execute(
+                "SELECT data, content_type FROM blobs WHERE id = ? AND expires_at > ?",
+                (blob_id, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read audio blob: {str(e)}")
+            return None
+        return (bytes(row[0]), row[1]) if row else None
+
+    def url(self, blob_id: str) -> str:
+        return AUDIO_URL.format(blob_id)
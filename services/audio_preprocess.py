@@ -0,0 +1,204 @@
+import logging
+from math import gcd
+from typing import BinaryIO, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .audio_upload import spooled_buffer
+
+logger = logging.getLogger(__name__)
+
+try:
+    import soundfile as sf
+except (ImportError, OSError) as e:  # OSError: libsndfile missing
+    logger.warning(f"soundfile unavailable, audio will be uploaded as recorded: {str(e)}")
+    sf = None
+
+# Whisper resamples everything to 16 kHz mono, so nothing above that is worth uploading
+TARGET_RATE = 16000
+FRAME_SECONDS = 0.02
+# Frames quieter than this (dB below the loudest frame) count as silence
+SILENCE_DB = -40.0
+# Kept around the speech so word onsets and tails are not clipped
+PAD_SECONDS = 0.15
+# Longest recording decoded; the whole file is held in memory as float32 while it is prepared
+MAX_DURATION = 15 * 60
+# Anti-aliasing filter length, in input (or output, whichever is slower) samples either side
+FILTER_HALF_WIDTH = 10
+# Chunk boundaries are placed at the quietest point of a window this long, so a
+# pause between phrases wins over a single quiet frame inside a word
+PAUSE_SECONDS = 0.2
+
+CODECS = {
+    'flac': ('FLAC', 'PCM_16', 'audio.flac', 'audio/flac'),
+    'opus': ('OGG', 'OPUS', 'audio.ogg', 'audio/ogg'),
+}
+
+class PreparedAudio(NamedTuple):
+    stream: BinaryIO
+    filename: str
+    content_type: str
+    duration: Optional[float] = None
+    # Start of this audio within the original recording, in seconds
+    offset: float = 0.0
+
+class AudioTooLong(ValueError):
+    """The recording is longer than the configured maximum duration."""
+
+def decode(stream: BinaryIO, max_duration: Optional[float] = MAX_DURATION) -> Tuple[np.ndarray, int]:
+    """Decode to float32 samples shaped (frames, channels) and the sample rate.
+
+    Raises :class:`AudioTooLong` for recordings over ``max_duration`` seconds,
+    checked before anything beyond the limit is decoded.
+    """
+    stream.seek(0)
+    try:
+        info = sf.info(stream)
+    except Exception:
+        info = None
+    if info is not None:
+        if max_duration is not None and info.duration > max_duration:
+            raise AudioTooLong(f"Recording is {info.duration:.0f}s long, the limit is {max_duration:.0f}s")
+        stream.seek(0)
+        samples, rate = sf.read(stream, dtype='float32', always_2d=True)
+        return samples, rate
+
+    # Browser recordings are usually WebM/Opus, which libsndfile cannot read; pydub shells out to ffmpeg
+    stream.seek(0)
+    from pydub import AudioSegment
+    # Decode at most one second past the limit: enough to tell the recording is too long
+    segment = AudioSegment.from_file(stream, duration=None if max_duration is None else max_duration + 1)
+    if max_duration is not None and segment.duration_seconds > max_duration:
+        raise AudioTooLong(f"Recording is longer than the limit of {max_duration:.0f}s")
+    samples = np.array(segment.get_array_of_samples(), dtype=np.float32)
+    samples /= float(1 << (8 * segment.sample_width - 1))
+    return samples.reshape(-1, segment.channels), segment.frame_rate
+
+def to_mono(samples: np.ndarray) -> np.ndarray:
+    return samples.mean(axis=1) if samples.ndim == 2 else samples
+
+def lowpass_taps(up: int, down: int) -> np.ndarray:
+    """Kaiser-windowed sinc cutting off at the lower of the two Nyquist rates, for the upsampled signal."""
+    cutoff = 1.0 / max(up, down)
+    half = FILTER_HALF_WIDTH * max(up, down)
+    taps = cutoff * np.sinc(cutoff * np.arange(-half, half + 1)) * np.kaiser(2 * half + 1, 5.0)
+    # Gain ``up`` makes up for the zeros upsampling would insert
+    return taps * (up / taps.sum())
+
+def resample(samples: np.ndarray, rate: int, target: int = TARGET_RATE) -> np.ndarray:
+    """Polyphase resampling of mono samples, low-passed so nothing above the target Nyquist aliases.
+
+    Equivalent to upsampling by ``up``, filtering and keeping every ``down``-th
+    sample, but each output sample only touches the input samples under its
+    filter phase (as ``scipy.signal.resample_poly`` does).
+    """
+    if rate == target or len(samples) == 0:
+        return samples
+    divisor = gcd(rate, target)
+    up, down = target // divisor, rate // divisor
+    taps = lowpass_taps(up, down)
+    half = len(taps) // 2
+    # Phase ``r`` of the filter is taps[r], taps[r + up], ...; pad so every phase has the same length
+    per_phase = -(-len(taps) // up)
+    phases = np.zeros(per_phase * up)
+    phases[:len(taps)] = taps
+    phases = phases.reshape(per_phase, up).T[:, ::-1].astype(np.float32)
+
+    out_len = -(-len(samples) * up // down)
+    padded = np.concatenate([
+        np.zeros(per_phase - 1, dtype=np.float32),
+        samples.astype(np.float32),
+        np.zeros(per_phase + half // up + 1, dtype=np.float32),
+    ])
+    # windows[k] holds input samples k - per_phase + 1 .. k
+    windows = np.lib.stride_tricks.sliding_window_view(padded, per_phase)
+    out = np.empty(out_len, dtype=np.float32)
+    # Output n lands on the upsampled grid at n * down + half; outputs ``up`` apart share a phase
+    for first in range(min(up, out_len)):
+        position = first * down + half
+        count = len(range(first, out_len, up))
+        out[first::up] = windows[position // up::down][:count] @ phases[position % up]
+    return out
+
+def frame_energy(samples: np.ndarray, rate: int) -> Tuple[np.ndarray, int]:
+    """RMS energy of consecutive ``FRAME_SECONDS`` frames, and the frame length in samples."""
+    frame = max(1, int(rate * FRAME_SECONDS))
+    frames = len(samples) // frame
+    energy = np.sqrt(np.mean(samples[:frames * frame].reshape(frames, frame) ** 2, axis=1))
+    return energy, frame
+
+def voiced_bounds(samples: np.ndarray, rate: int, silence_db: float = SILENCE_DB,
+                  pad: float = PAD_SECONDS) -> Tuple[int, int]:
+    """Sample range left after dropping leading and trailing frames ``silence_db`` below the loudest one."""
+    energy, frame = frame_energy(samples, rate)
+    if len(energy) == 0 or energy.max() <= 0:
+        return 0, len(samples)
+    voiced = np.flatnonzero(energy >= energy.max() * 10 ** (silence_db / 20))
+    start = max(0, voiced[0] * frame - int(pad * rate))
+    end = min(len(samples), (voiced[-1] + 1) * frame + int(pad * rate))
+    return int(start), int(end)
+
+def trim_silence(samples: np.ndarray, rate: int, silence_db: float = SILENCE_DB,
+                 pad: float = PAD_SECONDS) -> np.ndarray:
+    start, end = voiced_bounds(samples, rate, silence_db, pad)
+    return samples[start:end]
+
+def split_on_pauses(samples: np.ndarray, rate: int, max_seconds: float,
+                    min_seconds: Optional[float] = None) -> List[Tuple[int, int]]:
+    """Split into sample ranges of at most ``max_seconds``, cutting at the quietest pause.
+
+    Each cut lands in the last ``max_seconds - min_seconds`` of its chunk
+    (half of it by default), at the centre of the lowest-energy
+    ``PAUSE_SECONDS`` window, so chunks break between phrases rather than
+    mid-word wherever the recording allows it.
+    """
+    energy, frame = frame_energy(samples, rate)
+    max_frames = max(1, int(max_seconds / FRAME_SECONDS))
+    min_frames = int((max_seconds / 2 if min_seconds is None else min_seconds) / FRAME_SECONDS)
+    min_frames = min(max(min_frames, 1), max_frames)
+    window = max(1, int(PAUSE_SECONDS / FRAME_SECONDS))
+    smoothed = np.convolve(energy, np.ones(window) / window, mode='same')
+
+    ranges = []
+    cursor = 0
+    while len(energy) - cursor > max_frames:
+        candidates = smoothed[cursor + min_frames:cursor + max_frames + 1]
+        cut = cursor + min_frames + int(np.argmin(candidates))
+        ranges.append((cursor * frame, cut * frame))
+        cursor = cut
+    ranges.append((cursor * frame, len(samples)))
+    return ranges
+
+def encode(samples: np.ndarray, rate: int, codec: str = 'flac', offset: float = 0.0) -> PreparedAudio:
+    container, subtype, filename, content_type = CODECS[codec]
+    buffer = spooled_buffer()
+    sf.write(buffer, samples, rate, format=container, subtype=subtype)
+    buffer.seek(0)
+    return PreparedAudio(buffer, filename, content_type, len(samples) / rate, offset)
+
+def load_speech(stream: BinaryIO, max_duration: Optional[float] = MAX_DURATION) -> Tuple[np.ndarray, float]:
+    """Mono 16 kHz samples with leading and trailing silence trimmed, and where they start in seconds."""
+    if sf is None:
+        raise RuntimeError("soundfile is not available")
+    samples, rate = decode(stream, max_duration)
+    samples = resample(to_mono(samples), rate)
+    start, end = voiced_bounds(samples, TARGET_RATE)
+    return samples[start:end], start / TARGET_RATE
+
+def prepare_for_transcription(stream: BinaryIO, codec: str = 'flac',
+                              max_seconds: Optional[float] = None,
+                              max_duration: Optional[float] = MAX_DURATION) -> List[PreparedAudio]:
+    """Mono, 16 kHz, silence-trimmed and compressed copies of a recording.
+
+    Recordings longer than ``max_seconds`` are split at pauses into several
+    chunks, each carrying its offset in the original recording. Raises
+    :class:`AudioTooLong` past ``max_duration``; on any other error the
+    recording could not be decoded and callers fall back to the original.
+    """
+    samples, offset = load_speech(stream, max_duration)
+    if max_seconds is None or len(samples) <= max_seconds * TARGET_RATE:
+        return [encode(samples, TARGET_RATE, codec, offset)]
+    return [
+        encode(samples[chunk_start:chunk_end], TARGET_RATE, codec, offset + chunk_start / TARGET_RATE)
+        for chunk_start, chunk_end in split_on_pauses(samples, TARGET_RATE, max_seconds)
+    ]
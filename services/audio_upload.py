@@ -0,0 +1,84 @@
+import io
+import os
+import tempfile
+import uuid
+from typing import BinaryIO, Dict, Iterator, Optional, Union
+
+# Uploads up to this size stay in memory; larger ones roll over to an anonymous temp file
+DEFAULT_SPOOL_MEMORY = 1024 * 1024
+
+Audio = Union[bytes, BinaryIO]
+
+def spooled_buffer(max_memory: int = DEFAULT_SPOOL_MEMORY) -> BinaryIO:
+    """A writable buffer that never has a name on disk, even after spilling."""
+    return tempfile.SpooledTemporaryFile(max_size=max_memory, mode='w+b')
+
+def as_stream(audio: Audio) -> BinaryIO:
+    return io.BytesIO(audio) if isinstance(audio, (bytes, bytearray)) else audio
+
+class KeepOpenReader(io.RawIOBase):
+    """Read-only view of a binary file; closing the view leaves the file open.
+
+    aiohttp closes file payloads once sent, but the upload may still be read
+    again afterwards (e.g. to return it to the caller).
+    """
+
+    def __init__(self, fileobj: BinaryIO):
+        self._file = fileobj
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._file.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+class MultipartStream:
+    """Streaming multipart/form-data body with text fields and one file part.
+
+    Reads the file part straight from ``fileobj`` while the request is being
+    sent, so the upload is never copied into a second in-memory body. The
+    total length is known up front, so requests sends a plain Content-Length
+    body instead of chunked encoding.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, fields: Dict[str, Optional[str]], name: str, fileobj: BinaryIO,
+                 filename: str, content_type: str):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+
+        head = b''.join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'.encode('utf-8')
+            for key, value in fields.items() if value is not None
+        )
+        head += (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        ).encode('utf-8')
+        tail = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+
+        fileobj.seek(0, os.SEEK_END)
+        size = fileobj.tell()
+        fileobj.seek(0)
+        self.len = len(head) + size + len(tail)
+        self._parts = [io.BytesIO(head), fileobj, io.BytesIO(tail)]
+
+    def read(self, size: int = -1) -> bytes:
+        out = bytearray()
+        while self._parts and (size < 0 or len(out) < size):
+            data = self._parts[0].read(-1 if size < 0 else size - len(out))
+            if not data:
+                self._parts.pop(0)
+                continue
+            out += data
+        return bytes(out)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional
+
+from .cache import LRUCache
+from .caption_index import CaptionIndex
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPTION_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'captions.sqlite3')
+
+# Stored for videos known to have no captions in a language
+NO_CAPTIONS = object()
+
+class CaptionCache:
+    """Cache of fetched captions keyed by (video id, language).
+
+    Captions are kept in an in-process LRU and, zlib-compressed, in a SQLite
+    file shared by all workers. "No captions available" results are cached
+    too, for the shorter ``negative_ttl``, so repeated misses do not keep
+    probing YouTube.
+    """
+
+    def __init__(self, db_path: Optional[str] = DEFAULT_CAPTION_CACHE_PATH, max_entries: int = 256,
+                 ttl: float = 7 * 24 * 3600, negative_ttl: float = 3600):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.memory = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.inflight = SingleFlight()
+        self._local = threading.local()
+
+        if self.db_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+                conn = self._connection()
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS captions ("
+                    "key TEXT PRIMARY KEY, payload BLOB, expires_at REAL NOT NULL)"
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Caption cache disk tier disabled: {str(e)}")
+                self.db_path = None
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(video_id: str, language: str) -> str:
+        return f"{video_id}\x1f{language.lower()}"
+
+    @staticmethod
+    def _encode(captions: Dict[str, Any]) -> bytes:
+        data = {
+            'timing': captions['index'].to_columns(),
+            'original': captions['original'],
+            'translated': captions['translated'],
+        }
+        return zlib.compress(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    @staticmethod
+    def _decode(payload: bytes) -> Dict[str, Any]:
+        data = json.loads(zlib.decompress(payload).decode('utf-8'))
+        return {
+            'index': CaptionIndex.from_columns(data['timing']),
+            'original': data['original'],
+            'translated': data['translated'],
+        }
+
+    def get(self, video_id: str, language: str) -> Any:
+        """Cached captions, :data:`NO_CAPTIONS` for a cached miss, or ``None`` if not cached."""
+        key = self.make_key(video_id, language)
+        value = self.memory.get(key)
+        if value is None and self.db_path:
+            value = self._get_from_disk(key)
+        return value
+
+    def _get_from_disk(self, key: str) -> Any:
+        try:
+            row = self._connection().execute(
+                "SELECT payload, expires_at FROM captions WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read caption cache entry: {str(e)}")
+            return None
+
+        if row is None:
+            return None
+        payload, expires_at = row
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            return None
+
+        if payload is None:
+            value = NO_CAPTIONS
+        else:
+            try:
+                value = self._decode(payload)
+            except (zlib.error, ValueError, KeyError) as e:
+                logger.warning(f"Discarding corrupt caption cache entry: {str(e)}")
+                return None
+        self.memory.set(key, value, ttl=remaining)
+        return value
+
+    def set(self, video_id: str, language: str, captions: Optional[Dict[str, Any]]) -> None:
+        """Store captions, or a negative entry when ``captions`` is ``None``."""
+        key = self.make_key(video_id, language)
+        if captions is None:
+            value, payload, ttl = NO_CAPTIONS, None, self.negative_ttl
+        else:
+            value, payload, ttl = captions, self._encode(captions), self.ttl
+
+        self.memory.set(key, value, ttl=ttl)
+        if self.db_path:
+            try:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO captions (key, payload, expires_at) VALUES (?, ?, ?)",
+                    (key, payload, time.time() + ttl)
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to write caption cache entry: {str(e)}")
+
+    def get_or_load(self, video_id: str, language: str,
+                    loader: Callable[[str, str], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Return cached captions or call ``loader(video_id, language)`` once and cache its result.
+
+        ``None`` from the loader is cached as a negative entry; exceptions are
+        not cached.
+        """
+        value = self.get(video_id, language)
+        if value is None:
+            value = self.inflight.do(self.make_key(video_id, language), self._load, video_id, language, loader)
+        return None if value is NO_CAPTIONS else value
+
+    def _load(self, video_id: str, language: str, loader) -> Any:
+        captions = loader(video_id, language)
+        self.set(video_id, language, captions)
+        return NO_CAPTIONS if captions is None else captions
+
+    def purge_expired(self) -> int:
+        """Delete expired rows from the disk tier, returning how many were removed."""
+        if not self.db_path:
+            return 0
+        conn = self._connection()
+        cursor = conn.execute("DELETE FROM captions WHERE expires_at <= ?", (time.time(),))
+        conn.commit()
+        return cursor.rowcount
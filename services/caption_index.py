@@ -0,0 +1,105 @@
+import re
+from array import array
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, Optional
+
+class CaptionIndex:
+    """Caption timing kept as parallel arrays over one joined caption text.
+
+    ``starts[i]`` and ``durations[i]`` are the timing of caption ``i`` and
+    ``offsets[i]`` is where its text begins in ``text``. Lookups by time or by
+    character offset are binary searches over these arrays.
+    """
+
+    def __init__(self, text: str, starts: Iterable[float], durations: Iterable[float], offsets: Iterable[int]):
+        self.text = text
+        self.starts = array('d', starts)
+        self.durations = array('d', durations)
+        self.offsets = array('q', offsets)
+        if not len(self.starts) == len(self.durations) == len(self.offsets):
+            raise ValueError("Caption timing arrays must have the same length")
+        if any(b < a for a, b in zip(self.starts, self.starts[1:])):
+            raise ValueError("Caption start times must be sorted")
+        if any(b < a for a, b in zip(self.offsets, self.offsets[1:])) or \
+                (self.offsets and not 0 <= self.offsets[0] <= self.offsets[-1] <= len(text)):
+            raise ValueError("Caption text offsets must be sorted and within the text")
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict[str, Any]]) -> 'CaptionIndex':
+        """Build from ``youtube_transcript_api`` entries; ``text`` is the entries joined with spaces."""
+        parts, starts, durations, offsets = [], [], [], []
+        pos = 0
+        for entry in entries:
+            entry_text = entry['text']
+            starts.append(float(entry.get('start', 0)))
+            durations.append(float(entry.get('duration', 0)))
+            offsets.append(pos)
+            parts.append(entry_text)
+            pos += len(entry_text) + 1
+        return cls(' '.join(parts), starts, durations, offsets)
+
+    @classmethod
+    def from_columns(cls, data: Dict[str, Any]) -> 'CaptionIndex':
+        """Inverse of :meth:`to_columns`; raises ``ValueError`` on malformed data."""
+        try:
+            return cls(data['text'], data['starts'], data['durations'], data['offsets'])
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid caption timing: {str(e)}")
+
+    def to_columns(self, include_text: bool = True) -> Dict[str, Any]:
+        columns = {
+            "starts": self.starts.tolist(),
+            "durations": self.durations.tolist(),
+            "offsets": self.offsets.tolist(),
+        }
+        if include_text:
+            columns["text"] = self.text
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        end = self.offsets[i + 1] - 1 if i + 1 < len(self) else len(self.text)
+        return {
+            "text": self.text[self.offsets[i]:end],
+            "start": self.starts[i],
+            "duration": self.durations[i],
+        }
+
+    def caption_at(self, seconds: float) -> Optional[int]:
+        """Index of the caption on screen at ``seconds``, or ``None`` between captions."""
+        i = bisect_right(self.starts, seconds) - 1
+        if i < 0 or seconds >= self.starts[i] + self.durations[i]:
+            return None
+        return i
+
+    def caption_at_offset(self, offset: int) -> Optional[int]:
+        """Index of the caption containing character ``offset`` of ``text``."""
+        i = bisect_right(self.offsets, offset) - 1
+        return i if i >= 0 else None
+
+    def find_phrase(self, phrase: str, after: float = 0.0) -> Optional[int]:
+        """Index of the first caption at or after ``after`` seconds where ``phrase`` starts.
+
+        Matching ignores case and treats any run of whitespace (including the
+        joins between captions) as one space.
+        """
+        words = phrase.split()
+        if not words or not len(self):
+            return None
+        pattern = re.compile(r'\s+'.join(re.escape(w) for w in words), re.IGNORECASE)
+        first = max(0, bisect_right(self.starts, after) - 1)
+        match = pattern.search(self.text, self.offsets[first])
+        if match is None:
+            return None
+        return self.caption_at_offset(match.start())
+
+    def time_of(self, phrase: str, after: float = 0.0) -> Optional[float]:
+        """Start time in seconds of the caption where ``phrase`` is first said, or ``None``."""
+        i = self.find_phrase(phrase, after)
+        return None if i is None else self.starts[i]
@@ -0,0 +1,163 @@
+import hashlib
+import logging
+import math
+import re
+from typing import Callable, Dict, List, Optional
+
+from .cache import LRUCache
+from .http_client import GroqHttpClient, get_http_client
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?。！？])\s')
+
+# Rough per-message overhead of the chat format (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+def count_tokens(text: str) -> int:
+    """Approximate BPE token count: punctuation is one token, words ~4 characters per token."""
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in _TOKEN_RE.findall(text))
+
+def message_tokens(message: Dict[str, str]) -> int:
+    return count_tokens(message.get('content', '')) + MESSAGE_OVERHEAD_TOKENS
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Keep the tail of ``text`` that fits in ``max_tokens``."""
+    pieces = text.split(' ')
+    kept = []
+    total = 0
+    for piece in reversed(pieces):
+        total += count_tokens(piece)
+        if total > max_tokens:
+            break
+        kept.append(piece)
+    return ' '.join(reversed(kept))
+
+def extractive_summary(previous: str, turns: List[Dict[str, str]], max_tokens: int) -> str:
+    """Local fallback summary: the first sentence of each folded turn."""
+    lines = [previous] if previous else []
+    for turn in turns:
+        first_sentence = _SENTENCE_END_RE.split(turn.get('content', '').strip(), maxsplit=1)[0]
+        lines.append(f"{turn.get('role', 'user')}: {first_sentence[:200]}")
+    return _truncate_to_tokens(' '.join(lines), max_tokens)
+
+class LLMSummarizer:
+    """Folds conversation turns into a rolling summary with a short completion."""
+
+    def __init__(self, api_key: str, http_client: Optional[GroqHttpClient] = None):
+        self.http = http_client or get_http_client()
+        self.base_url = "https://api.groq.com/openai/v1/chat/completions"
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def __call__(self, previous: str, turns: List[Dict[str, str]], max_tokens: int) -> str:
+        transcript = '\n'.join(f"{t.get('role', 'user')}: {t.get('content', '')}" for t in turns)
+        prompt = (
+            f"Existing summary of a language-learning conversation:\n{previous or '(none)'}\n\n"
+            f"New turns:\n{transcript}\n\n"
+            "Update the summary to include the new turns. Keep the learner's goals, level, "
+            "mistakes and topics covered. Reply with the summary only."
+        )
+        response = self.http.post(
+            self.base_url,
+            headers=self.headers,
+            json={
+                "model": "llama-3.3-70b-versatile",
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": 0.2,
+                "max_tokens": max_tokens
+            }
+        )
+        response.raise_for_status()
+        return response.json()['choices'][0]['message']['content'].strip()
+
+Summarizer = Callable[[str, List[Dict[str, str]], int], str]
+
+class ChatHistoryManager:
+    """Keeps a chat prompt within a token budget.
+
+    The most recent turns are kept verbatim; older turns are folded into a
+    rolling summary. Summaries are cached by a hash chain over the folded
+    prefix, so a new summary is only computed for turns not yet folded, on top
+    of the longest prefix already summarized.
+    """
+
+    def __init__(self, token_budget: int = 2000, summary_tokens: int = 300,
+                 summarizer: Optional[Summarizer] = None, cache_size: int = 512):
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer
+        self.summaries = LRUCache(max_entries=cache_size, ttl=6 * 3600)
+
+    @staticmethod
+    def _prefix_hashes(messages: List[Dict[str, str]]) -> List[str]:
+        """hashes[i] identifies messages[:i + 1]."""
+        hashes = []
+        digest = b''
+        for msg in messages:
+            digest = hashlib.sha256(
+                digest + msg.get('role', '').encode('utf-8') + b'\x1f' + msg.get('content', '').encode('utf-8')
+            ).digest()
+            hashes.append(digest.hex())
+        return hashes
+
+    def _summarize(self, folded: List[Dict[str, str]]) -> str:
+        hashes = self._prefix_hashes(folded)
+        cached = self.summaries.get(hashes[-1])
+        if cached is not None:
+            return cached
+
+        # Start from the longest already-summarized prefix
+        previous, start = '', 0
+        for i in range(len(hashes) - 2, -1, -1):
+            summary = self.summaries.get(hashes[i])
+            if summary is not None:
+                previous, start = summary, i + 1
+                break
+
+        new_turns = folded[start:]
+        summary = None
+        if self.summarizer is not None:
+            try:
+                summary = self.summarizer(previous, new_turns, self.summary_tokens)
+            except Exception as e:
+                logger.warning(f"History summarization failed, using extractive summary: {str(e)}")
+        if not summary:
+            summary = extractive_summary(previous, new_turns, self.summary_tokens)
+
+        self.summaries.set(hashes[-1], summary)
+        return summary
+
+    def compact(self, messages: List[Dict[str, str]], reserved_tokens: int = 0) -> List[Dict[str, str]]:
+        """Return ``messages`` trimmed to the budget, prefixed by a summary of what was dropped.
+
+        ``reserved_tokens`` accounts for the system prompt the caller adds.
+        """
+        budget = self.token_budget - reserved_tokens
+        total = sum(message_tokens(m) for m in messages)
+        if total <= budget:
+            return messages
+
+        budget -= self.summary_tokens + MESSAGE_OVERHEAD_TOKENS
+        kept = 0
+        used = 0
+        for msg in reversed(messages):
+            cost = message_tokens(msg)
+            # The latest message is always kept, even if it alone exceeds the budget
+            if kept and used + cost > budget:
+                break
+            used += cost
+            kept += 1
+
+        folded = messages[:len(messages) - kept]
+        if not folded:
+            return messages
+
+        summary = self._summarize(folded)
+        logger.debug(f"Folded {len(folded)} chat turns into a {count_tokens(summary)}-token summary")
+        return [
+            {"role": "system", "content": f"Summary of the earlier conversation: {summary}"}
+        ] + messages[len(folded):]
@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHAT_SESSION_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'chat_sessions.sqlite3')
+
+class SessionNotFound(KeyError):
+    """Raised when a chat session id is unknown or has expired."""
+
+class ChatSessionStore:
+    """Chat transcripts in a SQLite file (WAL), shared by every worker.
+
+    Each session keeps its last ``max_messages`` messages; beyond
+    ``max_sessions`` the least recently updated sessions are dropped. If the
+    file cannot be opened the store falls back to an in-memory database, so
+    sessions still work but only within this process.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_CHAT_SESSION_PATH, max_sessions: int = 1000,
+                 max_messages: int = 200):
+        self.db_path = db_path
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self._local = threading.local()
+        self._uri = False
+        self._keepalive = None
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._create_schema()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Chat session store not shared between workers: {str(e)}")
+            # Named shared-cache database, so every thread's connection sees the same sessions
+            self.db_path = f"file:chat-sessions-{uuid.uuid4().hex}?mode=memory&cache=shared"
+            self._uri = True
+            self._local = threading.local()
+            # The in-memory database lives only as long as some connection to it is open
+            self._keepalive = self._connection()
+            self._create_schema()
+
+    def _create_schema(self) -> None:
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "id TEXT PRIMARY KEY, messages TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated_at)")
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, uri=self._uri)
+            if not self._uri:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create(self) -> str:
+        session_id = uuid.uuid4().hex
+        conn = self._connection()
+        with conn:
+            conn.execute("INSERT INTO sessions (id, messages, updated_at) VALUES (?, '[]', ?)",
+                         (session_id, time.time()))
+            conn.execute(
+                "DELETE FROM sessions WHERE id IN ("
+                "SELECT id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,)
+            )
+        return session_id
+
+    def get(self, session_id: str) -> List[Dict[str, str]]:
+        """Return a copy of the session's transcript."""
+        row = self._connection().execute(
+            "SELECT messages FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            raise SessionNotFound(session_id)
+        return json.loads(row[0])
+
+    def extend(self, session_id: str, new_messages: List[Dict[str, str]]) -> None:
+        conn = self._connection()
+        with conn:
+            # Take the write lock before reading, so concurrent replies from other workers are not lost
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT messages FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None:
+                raise SessionNotFound(session_id)
+            messages = (json.loads(row[0]) + list(new_messages))[-self.max_messages:]
+            conn.execute(
+                "UPDATE sessions SET messages = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(messages, ensure_ascii=False), time.time(), session_id)
+            )
+
+    def delete(self, session_id: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+def record_exchange(store: ChatSessionStore, session_id: str, new_message: Dict[str, str],
+                    reply: str) -> bool:
+    """Append a user message and the reply to the session, returning whether it was saved.
+
+    By now the model has answered, so a session that has meanwhile been
+    deleted or evicted, or a store error, is only logged: the caller still
+    returns the reply.
+    """
+    try:
+        store.extend(session_id, [new_message, {'role': 'assistant', 'content': reply}])
+        return True
+    except SessionNotFound:
+        logger.warning(f"Chat session {session_id} disappeared before its reply was saved")
+    except sqlite3.Error as e:
+        logger.error(f"Failed to save chat session {session_id}: {str(e)}")
+    return False
+
+def parse_chat_request(data: Dict[str, Any], store: ChatSessionStore) -> Tuple[Optional[str], Optional[Dict[str, str]], List[Dict[str, str]]]:
+    """Resolve a chatbot request body to ``(session_id, new_message, messages)``.
+
+    Session requests send ``sessionId`` plus only the new ``message``; legacy
+    requests send the whole ``messages`` transcript. Raises ``ValueError`` for
+    malformed input and :class:`SessionNotFound` for unknown sessions.
+    """
+    session_id = data.get('sessionId')
+    if session_id is not None and not isinstance(session_id, str):
+        raise ValueError('sessionId must be a string')
+    if not session_id:
+        messages = data.get('messages', [])
+        if not isinstance(messages, list):
+            raise ValueError('Invalid message format')
+        messages = [
+            msg for msg in messages
+            if isinstance(msg, dict) and 'content' in msg and msg.get('role') in ('user', 'assistant')
+        ]
+        if not messages:
+            raise ValueError('Invalid message format')
+        return None, None, messages
+
+    new_message = data.get('message')
+    if isinstance(new_message, str):
+        new_message = {'role': 'user', 'content': new_message}
+    if not isinstance(new_message, dict) or not new_message.get('content'):
+        raise ValueError('Invalid message format')
+    # Only user turns come from the client; assistant and system turns are ours to write
+    new_message = {'role': 'user', 'content': new_message['content']}
+
+    return session_id, new_message, store.get(session_id) + [new_message]
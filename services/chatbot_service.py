@@ -1,13 +1,237 @@
-import requests
+import json
 import logging
 import re
-from typing import List, Dict, Any
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from .http_client import GroqHttpClient, get_http_client
+from .chat_history import ChatHistoryManager, message_tokens
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_OPTIONS = ["Tell me more", "Give me an example", "Let's practice"]
+
+# How follow-up options are produced:
+#   local    - derived from the response's sections, no extra LLM call
+#   parallel - LLM call from the user's last message, run alongside the reply
+#   serial   - LLM call from the finished reply (one extra round trip)
+OPTIONS_MODES = ("local", "parallel", "serial")
+
+SECTION_OPTIONS = {
+    'Example': "Give me more examples",
+    'Practice': "Give me another exercise",
+    'Grammar': "Explain this grammar in more detail",
+    'Vocabulary': "Quiz me on this vocabulary",
+    'Tip': "Share another tip",
+    'Translation': "Translate another sentence",
+}
+
+SECTION_HEADINGS = {
+    'Example': '## 🔍 Examples',
+    'Practice': '## ✨ Practice This',
+    'Grammar': '## 📚 Grammar Note',
+    'Vocabulary': '## 📖 Vocabulary',
+    'Tip': '## 💡 Pro Tip',
+    'Translation': '## 🗣️ Translation',
+}
+
+# Sections are applied in this order; it decides which section wraps which when markers interleave
+_SECTION_PRIORITY = {name: i for i, name in enumerate(SECTION_HEADINGS)}
+_SECTION_MARKER_RE = re.compile(f'({"|".join(SECTION_HEADINGS)}):')
+_LIST_RE = re.compile(r'(?m)^[-•]\s*(.+)$')
+
+def _section_applies(content: str, continues: bool = False) -> bool:
+    """Whether a ``Section:`` marker followed by ``content`` becomes a heading.
+
+    It does unless the content starts with whitespace; blank content still
+    counts, unless ``continues`` says more text follows it.
+    """
+    return not content[:1].isspace() or not (continues or content.strip())
+
+def _scan_sections(text: str, continues: bool = False):
+    """Find the markers in ``text``, where each one's content ends and whether it applies.
+
+    A marker's content runs to the next marker that is either unapplied or of
+    a section that does not rank below it; lower-ranked sections in between
+    are nested inside it. ``continues`` means ``text`` is followed by more of
+    the reply, as for every streamed line but the last.
+    """
+    markers = [(m.start(), m.end(), m.group(1)) for m in _SECTION_MARKER_RE.finditer(text)]
+    count = len(markers)
+    applied = [False] * count
+    content_end = [len(text)] * count
+    for i in range(count - 1, -1, -1):
+        priority = _SECTION_PRIORITY[markers[i][2]]
+        for j in range(i + 1, count):
+            if not applied[j] or _SECTION_PRIORITY[markers[j][2]] >= priority:
+                content_end[i] = markers[j][0]
+                break
+        raw = text[markers[i][1]:content_end[i]]
+        applied[i] = _section_applies(raw, continues and content_end[i] == len(text))
+    return markers, applied, content_end
+
+def _format_sections(text: str) -> str:
+    """Turn ``Section:content`` runs into headed blocks in one scan over the markers."""
+    markers, applied, content_end = _scan_sections(text)
+    if not markers:
+        return text
+    count = len(markers)
+
+    def render(pos: int, stop: int, k: int):
+        parts = []
+        while k < count and markers[k][0] < stop:
+            start, colon_end, section = markers[k]
+            parts.append(text[pos:start])
+            if not applied[k]:
+                parts.append(text[start:colon_end])
+                pos = colon_end
+                k += 1
+                continue
+            pos = content_end[k]
+            inner, k = render(colon_end, pos, k + 1)
+            body = inner.rstrip()
+            parts.append(f"{SECTION_HEADINGS[section]}\n{body}\n{inner[len(body):]}")
+        parts.append(text[pos:stop])
+        return ''.join(parts), k
+
+    return render(0, len(text), 0)[0]
+
+def _break_translations(text: str) -> str:
+    """Put each parenthesised translation on its own line: ``hola (hello)`` -> ``hola\\n(hello)``."""
+    parts = []
+    pos = 0
+    scan = 0
+    q = text.find('(')
+    while q != -1:
+        if q > scan:
+            r = text.find(')', q + 1)
+            if r == -1:
+                break
+            if r > q + 1:
+                parts.append(text[pos:q])
+                parts.append('\n')
+                parts.append(text[q:r + 1])
+                pos = scan = r + 1
+                q = text.find('(', scan)
+                continue
+        scan = q + 1
+        q = text.find('(', scan)
+    parts.append(text[pos:])
+    return ''.join(parts)
+
+def format_markdown(content: str) -> str:
+    """Format a tutor reply as markdown: section headings, translations on their own line, ``*`` bullets."""
+    formatted = _format_sections(content.strip())
+    formatted = _break_translations(formatted)
+    return _LIST_RE.sub(r'* \1', formatted)
+
+def _format_lines(text: str, last: bool = False) -> str:
+    """Apply the section, translation and list rules of ``format_markdown`` to streamed lines.
+
+    Headings go where ``format_markdown`` puts them; only the blank lines it
+    adds after a section are left out. ``last`` marks the end of the reply.
+    """
+    markers, applied, _ = _scan_sections(text if last else text + '\n', continues=not last)
+    parts = []
+    pos = 0
+    for (start, colon_end, section), apply in zip(markers, applied):
+        if apply:
+            parts.append(text[pos:start])
+            parts.append(SECTION_HEADINGS[section] + '\n')
+            pos = colon_end
+    parts.append(text[pos:])
+    text = _break_translations(''.join(parts))
+    return _LIST_RE.sub(r'* \1', text)
+
+def _awaits_content(text: str) -> bool:
+    """Whether the last marker in ``text`` has only whitespace after it, so the next line decides it."""
+    last = None
+    for last in _SECTION_MARKER_RE.finditer(text):
+        pass
+    return last is not None and not text[last.end():].strip()
+
+class StreamingFormatter:
+    """Formats a streamed completion incrementally, one completed line at a time.
+
+    Lines ending in a bare ``Section:`` marker are held back until the next
+    non-blank line shows whether the marker becomes a heading.
+    """
+
+    def __init__(self):
+        self._pending = ''
+        self._started = False
+
+    def feed(self, chunk: str) -> str:
+        self._pending += chunk
+        if not self._started:
+            # format_markdown strips the reply first
+            self._pending = self._pending.lstrip()
+            self._started = bool(self._pending)
+        complete, newline, rest = self._pending.rpartition('\n')
+        if not newline or _awaits_content(complete):
+            return ''
+        self._pending = rest
+        return _format_lines(complete) + '\n'
+
+    def flush(self) -> str:
+        text, self._pending = self._pending, ''
+        return _format_lines(text, last=True) if text else ''
+
+def parse_stream_line(line) -> Optional[str]:
+    """Return the content delta carried by one SSE line of a streamed completion."""
+    if isinstance(line, bytes):
+        line = line.decode('utf-8')
+    line = line.strip()
+    if not line.startswith('data:'):
+        return None
+    data = line[len('data:'):].strip()
+    if not data or data == '[DONE]':
+        return None
+    chunk = json.loads(data)
+    choices = chunk.get('choices') or [{}]
+    return choices[0].get('delta', {}).get('content')
+
+# Markdown headings, or "Section:" markers the formatter left in place
+_HEADING_RE = re.compile(f'(?m)^#{{1,6}}\\s*(.+?)\\s*$|({"|".join(SECTION_HEADINGS)}):')
+
+def suggest_options(content: str, limit: int = 3) -> List[str]:
+    """Cheaply derive follow-up options from a formatted response's section headings."""
+    options = []
+    for match in _HEADING_RE.finditer(content):
+        heading = match.group(1) or match.group(2)
+        for section, option in SECTION_OPTIONS.items():
+            if section.lower() in heading.lower():
+                break
+        else:
+            # Drop any leading emoji/punctuation from model-written headings
+            topic = re.sub(r'^[^\w¿¡]+', '', heading).strip()
+            option = f"Tell me more about {topic}" if topic else None
+        if option and option not in options:
+            options.append(option)
+        if len(options) == limit:
+            return options
+
+    for option in DEFAULT_OPTIONS:
+        if len(options) == limit:
+            break
+        if option not in options:
+            options.append(option)
+    return options
+
 class ChatbotService:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client: Optional[GroqHttpClient] = None,
+                 options_mode: str = "parallel", options_timeout: float = 10,
+                 history: Optional[ChatHistoryManager] = None):
+        if options_mode not in OPTIONS_MODES:
+            raise ValueError(f"Unknown options mode: {options_mode}")
         self.api_key = api_key
+        self.http = http_client or get_http_client()
+        self.history = history
+        self.options_mode = options_mode
+        self.options_timeout = options_timeout
+        # Created on the first parallel options call
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
         self.base_url = "https://api.groq.com/openai/v1/chat/completions"
         self.headers = {
             "Authorization": f"Bearer {api_key}",
@@ -15,98 +239,85 @@ class ChatbotService:
         }
 
     def format_response(self, content: str) -> str:
-        formatted = content.strip()
-        
-        # Add clear section breaks
-        section_formats = {
-            'Example': (
-                '## 🔍 Examples\n'
-                '{content}\n'
-            ),
-            'Practice': (
-                '## ✨ Practice This\n'
-                '{content}\n'
-            ),
-            'Grammar': (
-                '## 📚 Grammar Note\n'
-                '{content}\n'
-            ),
-            'Vocabulary': (
-                '## 📖 Vocabulary\n'
-                '{content}\n'
-            ),
-            'Tip': (
-                '## 💡 Pro Tip\n'
-                '{content}\n'
-            ),
-            'Translation': (
-                '## 🗣️ Translation\n'
-                '{content}\n'
-            )
+        return format_markdown(content)
+
+    def _build_payload(self, messages: List[Dict[str, str]], language: str) -> Dict[str, Any]:
+        system_message = {"role": "system", "content": self._get_system_prompt(language)}
+
+        # Add conversation history
+        conversation = []
+        for msg in messages:
+            role = msg.get('role', 'user')
+            content = msg.get('content', '')
+            if content:  # Only add non-empty messages
+                conversation.append({
+                    "role": role,
+                    "content": content
+                })
+
+        # Keep long sessions within the prompt token budget
+        if self.history is not None:
+            conversation = self.history.compact(conversation, reserved_tokens=message_tokens(system_message))
+
+        formatted_messages = [system_message] + conversation
+
+        return {
+            "model": "llama-3.3-70b-versatile",
+            "messages": formatted_messages,
+            "temperature": 0.7,
+            "max_tokens": 500,
         }
-        
-        # Format sections
-        for section, template in section_formats.items():
-            pattern = f'{section}:(.*?)(?=(?:{"|".join(section_formats.keys())}):|\Z)'
-            matches = re.finditer(pattern, formatted, re.DOTALL)
-            for match in matches:
-                content = match.group(1).strip()
-                formatted = formatted.replace(
-                    f'{section}:{content}',
-                    template.format(content=content)
-                )
-        
-        # Format translations
-        formatted = re.sub(
-            r'([^(]+)\s*\(([^)]+)\)',
-            r'\1\n(\2)',
-            formatted
+
+    def _parse_completion(self, result: Dict[str, Any]) -> str:
+        if not result.get('choices'):
+            raise ValueError("No response generated")
+
+        content = result['choices'][0]['message']['content']
+        return self.format_response(content)
+
+    def _start_options(self, messages: List[Dict[str, str]], language: str, mode: str) -> Optional[Future]:
+        """In parallel mode, kick off option generation before the main completion."""
+        if mode != "parallel":
+            return None
+        last_message = next(
+            (msg.get('content', '') for msg in reversed(messages) if msg.get('role') == 'user'),
+            ''
         )
-        
-        # Format lists
-        formatted = re.sub(r'(?m)^[-•]\s*(.+)$', r'* \1', formatted)
-        
-        return formatted
+        if not last_message:
+            return None
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="chat-options")
+        return self._executor.submit(self._generate_options_for_message, last_message, language)
 
-    def generate_response(self, messages: List[Dict[str, str]], language: str = "en") -> Dict[str, Any]:
+    def _finish_options(self, pending: Optional[Future], formatted_content: str, language: str, mode: str) -> List[str]:
+        if mode == "serial":
+            return self._generate_options(formatted_content, language)
+        if pending is not None:
+            try:
+                return pending.result(timeout=self.options_timeout)
+            except Exception as e:
+                logger.warning(f"Parallel options generation failed: {str(e)}")
+        return suggest_options(formatted_content)
+
+    def generate_response(self, messages: List[Dict[str, str]], language: str = "en",
+                          options_mode: Optional[str] = None) -> Dict[str, Any]:
+        mode = options_mode or self.options_mode
+        pending_options = None
         try:
-            # Clean up messages format
-            formatted_messages = [
-                {"role": "system", "content": self._get_system_prompt(language)}
-            ]
-
-            # Add conversation history
-            for msg in messages:
-                role = msg.get('role', 'user')
-                content = msg.get('content', '')
-                if content:  # Only add non-empty messages
-                    formatted_messages.append({
-                        "role": role,
-                        "content": content
-                    })
-
-            response = requests.post(
+            pending_options = self._start_options(messages, language, mode)
+
+            response = self.http.post(
                 self.base_url,
                 headers=self.headers,
-                json={
-                    "model": "llama-3.3-70b-versatile",
-                    "messages": formatted_messages,
-                    "temperature": 0.7,
-                    "max_tokens": 500,
-                }
+                json=self._build_payload(messages, language)
             )
             
             response.raise_for_status()
-            result = response.json()
-
-            if not result.get('choices'):
-                raise ValueError("No response generated")
-
-            content = result['choices'][0]['message']['content']
-            formatted_content = self.format_response(content)
+            formatted_content = self._parse_completion(response.json())
             
             # Generate suggested next options based on the conversation
-            suggested_options = self._generate_options(formatted_content, language)
+            suggested_options = self._finish_options(pending_options, formatted_content, language, mode)
 
             return {
                 "response": formatted_content,
@@ -116,6 +327,56 @@ class ChatbotService:
         except Exception as e:
             logger.error(f"Chatbot response generation error: {str(e)}")
             raise
+        finally:
+            # A no-op once the options are in; otherwise nobody is waiting for them
+            if pending_options is not None:
+                pending_options.cancel()
+
+    def stream_response(self, messages: List[Dict[str, str]], language: str = "en",
+                        options_mode: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``(event, data)`` pairs while the completion streams in.
+
+        ``delta`` events carry incrementally formatted text; the final ``done``
+        event carries the fully formatted response and the suggested options.
+        """
+        mode = options_mode or self.options_mode
+        pending_options = self._start_options(messages, language, mode)
+        try:
+            payload = self._build_payload(messages, language)
+            payload["stream"] = True
+
+            response = self.http.post(self.base_url, headers=self.headers, json=payload, stream=True)
+            try:
+                response.raise_for_status()
+                formatter = StreamingFormatter()
+                parts = []
+                for line in response.iter_lines():
+                    delta = parse_stream_line(line)
+                    if not delta:
+                        continue
+                    parts.append(delta)
+                    text = formatter.feed(delta)
+                    if text:
+                        yield "delta", {"text": text}
+            finally:
+                response.close()
+
+            text = formatter.flush()
+            if text:
+                yield "delta", {"text": text}
+
+            if not parts:
+                raise ValueError("No response generated")
+
+            formatted_content = self.format_response(''.join(parts))
+            yield "done", {
+                "response": formatted_content,
+                "options": self._finish_options(pending_options, formatted_content, language, mode)
+            }
+        finally:
+            # Also runs when the client disconnects and the generator is closed mid-stream
+            if pending_options is not None:
+                pending_options.cancel()
 
     def _get_system_prompt(self, language: str) -> str:
         return f"""You are a language tutor. Always respond in {language}.
@@ -134,38 +395,73 @@ class ChatbotService:
         ## 💡 Practice
         Try these exercises..."""
 
+    def _options_payload(self, last_response: str, language: str) -> Dict[str, Any]:
+        return {
+            "model": "llama-3.3-70b-versatile",
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "Generate 3 relevant follow-up options based on the previous response."
+                },
+                {
+                    "role": "user",
+                    "content": f"Previous response: {last_response}\nGenerate 3 natural follow-up options for continuing the conversation about learning {language}."
+                }
+            ],
+            "temperature": 0.7,
+            "max_tokens": 150
+        }
+
+    def _message_options_payload(self, last_message: str, language: str) -> Dict[str, Any]:
+        return {
+            "model": "llama-3.3-70b-versatile",
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "Generate 3 relevant follow-up options a learner might pick after asking this."
+                },
+                {
+                    "role": "user",
+                    "content": f"Learner's message: {last_message}\nGenerate 3 natural follow-up options for continuing the conversation about learning {language}."
+                }
+            ],
+            "temperature": 0.7,
+            "max_tokens": 150
+        }
+
+    def _generate_options_for_message(self, last_message: str, language: str) -> List[str]:
+        """Options based on the user's message, so they can be generated alongside the reply."""
+        response = self.http.post(
+            self.base_url,
+            headers=self.headers,
+            json=self._message_options_payload(last_message, language)
+        )
+        response.raise_for_status()
+        return self._parse_options(response.json())
+
+    def _parse_options(self, result: Dict[str, Any]) -> List[str]:
+        if not result.get('choices'):
+            return list(DEFAULT_OPTIONS)
+
+        options_text = result['choices'][0]['message']['content']
+        options = [opt.strip('- ').strip() for opt in options_text.split('\n') if opt.strip()][:3]
+        return options if options else list(DEFAULT_OPTIONS)
+
+    def generate_options(self, last_response: str, language: str) -> List[str]:
+        """LLM-written follow-up options for a finished reply, for optional later enrichment."""
+        return self._generate_options(last_response, language)
+
     def _generate_options(self, last_response: str, language: str) -> List[str]:
         try:
-            response = requests.post(
+            response = self.http.post(
                 self.base_url,
                 headers=self.headers,
-                json={
-                    "model": "llama-3.3-70b-versatile",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "Generate 3 relevant follow-up options based on the previous response."
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Previous response: {last_response}\nGenerate 3 natural follow-up options for continuing the conversation about learning {language}."
-                        }
-                    ],
-                    "temperature": 0.7,
-                    "max_tokens": 150
-                }
+                json=self._options_payload(last_response, language)
             )
             
             response.raise_for_status()
-            result = response.json()
-            
-            if not result.get('choices'):
-                return ["Tell me more", "Give me an example", "Let's practice"]
-
-            options_text = result['choices'][0]['message']['content']
-            options = [opt.strip('- ').strip() for opt in options_text.split('\n') if opt.strip()][:3]
-            return options if options else ["Tell me more", "Give me an example", "Let's practice"]
+            return self._parse_options(response.json())
 
         except Exception as e:
             logger.error(f"Options generation error: {str(e)}")
-            return ["Tell me more", "Give me an example", "Let's practice"]
+            return list(DEFAULT_OPTIONS)
@@ -0,0 +1,122 @@
+import ast
+import gzip
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .caption_index import CaptionIndex
+
+logger = logging.getLogger(__name__)
+
+# Bump when the artifact layout or the summary prompt changes
+ARTIFACT_VERSION = 1
+
+DEFAULT_ARTIFACT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'course_artifact.json.gz')
+DEFAULT_COURSES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'learning.py')
+
+_VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+def load_language_courses(path: str = DEFAULT_COURSES_PATH) -> Dict[str, Any]:
+    """Read ``LANGUAGE_COURSES`` from learning.py without importing Streamlit."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'LANGUAGE_COURSES' for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError(f"LANGUAGE_COURSES not found in {path}")
+
+def iter_course_videos(courses: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+    """Yield each distinct ``(language, video_id)`` of the catalog, skipping placeholder ids."""
+    seen = set()
+    for language, course in courses.items():
+        for chapter in course.get('chapters', {}).values():
+            for lesson in chapter.get('lessons', []):
+                video_ids = [lesson.get('video_id')] + [v.get('id') for v in lesson.get('video_options', [])]
+                for video_id in video_ids:
+                    if not video_id or not _VIDEO_ID_RE.match(video_id) or 'VIDEO' in video_id:
+                        continue
+                    key = (language.lower(), video_id)
+                    if key not in seen:
+                        seen.add(key)
+                        yield key
+
+def _key(video_id: str, language: str) -> str:
+    return f"{language.lower()}/{video_id}"
+
+class CourseArtifact:
+    """Precomputed captions and course summaries for the curated lesson videos.
+
+    Built offline by ``prefetch_courses.py`` and loaded read-only at startup.
+    """
+
+    def __init__(self, captions: Optional[Dict[str, Dict]] = None,
+                 summaries: Optional[Dict[str, Dict]] = None, generated_at: Optional[float] = None):
+        self.captions = captions or {}
+        self.summaries = summaries or {}
+        self.generated_at = generated_at
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_ARTIFACT_PATH) -> 'CourseArtifact':
+        """Load an artifact, or return an empty one if it is missing, unreadable or outdated."""
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable course artifact {path}: {str(e)}")
+            return cls()
+
+        if data.get('version') != ARTIFACT_VERSION:
+            logger.warning(f"Ignoring course artifact version {data.get('version')}, expected {ARTIFACT_VERSION}")
+            return cls()
+
+        artifact = cls(data.get('captions'), data.get('summaries'), data.get('generated_at'))
+        logger.info(f"Loaded course artifact with {len(artifact.captions)} captions and {len(artifact.summaries)} summaries")
+        return artifact
+
+    def save(self, path: str = DEFAULT_ARTIFACT_PATH) -> None:
+        """Write the artifact atomically so running workers never read a partial file."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        data = {
+            'version': ARTIFACT_VERSION,
+            'generated_at': self.generated_at or time.time(),
+            'captions': self.captions,
+            'summaries': self.summaries,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def add_captions(self, video_id: str, language: str, captions: Dict[str, Any]) -> None:
+        self.captions[_key(video_id, language)] = {
+            'timing': captions['index'].to_columns(),
+            'original': captions['original'],
+            'translated': captions['translated'],
+        }
+
+    def add_summary(self, video_id: str, language: str, summary: Dict[str, Any]) -> None:
+        self.summaries[_key(video_id, language)] = summary
+
+    def get_captions(self, video_id: str, language: str) -> Optional[Dict[str, Any]]:
+        data = self.captions.get(_key(video_id, language))
+        if data is None:
+            return None
+        return {
+            'index': CaptionIndex.from_columns(data['timing']),
+            'original': data['original'],
+            'translated': data['translated'],
+        }
+
+    def get_summary(self, video_id: str, language: str) -> Optional[Dict[str, Any]]:
+        return self.summaries.get(_key(video_id, language))
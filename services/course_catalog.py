@@ -0,0 +1,79 @@
+from types import MappingProxyType
+from typing import Any, Dict, NamedTuple, Optional
+
+class LessonRef(NamedTuple):
+    language: str
+    chapter_id: str
+    lesson: Dict[str, Any]
+
+class CourseCatalog:
+    """Read-only lookup indexes over a ``LANGUAGE_COURSES``-style catalog.
+
+    Built once from the catalog dict; every lookup is a single dict access.
+    Lesson ids repeat across languages ("1.1" exists in each course), so
+    lessons are keyed by ``(language, lesson_id)``.
+    """
+
+    __slots__ = ('_lessons', '_by_object', '_first_id', '_titles', '_first_title', '_chapters', '_counts',
+                 '_positions', '_next')
+
+    def __init__(self, courses: Dict[str, Any]):
+        lessons, by_object, first_id, titles, first_title, chapters, counts, positions, chain = \
+            {}, {}, {}, {}, {}, {}, {}, {}, {}
+        for language, course in courses.items():
+            ordered = []
+            for chapter_id, chapter in course.get('chapters', {}).items():
+                chapters.setdefault((language, chapter['title']), chapter_id)
+                for lesson in chapter.get('lessons', []):
+                    ref = LessonRef(language, chapter_id, lesson)
+                    lessons[(language, lesson['id'])] = ref
+                    by_object[id(lesson)] = ref
+                    first_id.setdefault(lesson['id'], ref)
+                    titles.setdefault((language, lesson['title']), lesson['id'])
+                    first_title.setdefault(lesson['title'], lesson['id'])
+                    positions[(language, lesson['id'])] = len(ordered)
+                    ordered.append(lesson)
+            counts[language] = len(ordered)
+            # Next lesson in course order: the rest of the chapter, then the next chapter
+            for current, following in zip(ordered, ordered[1:] + [None]):
+                chain[(language, current['id'])] = following
+
+        self._lessons = MappingProxyType(lessons)
+        self._by_object = MappingProxyType(by_object)
+        self._first_id = MappingProxyType(first_id)
+        self._titles = MappingProxyType(titles)
+        self._first_title = MappingProxyType(first_title)
+        self._chapters = MappingProxyType(chapters)
+        self._counts = MappingProxyType(counts)
+        self._positions = MappingProxyType(positions)
+        self._next = MappingProxyType(chain)
+
+    def get(self, language: str, lesson_id: str) -> Optional[LessonRef]:
+        return self._lessons.get((language, lesson_id))
+
+    def locate(self, lesson: Dict[str, Any]) -> Optional[LessonRef]:
+        """Find where a lesson dict taken from the catalog lives."""
+        ref = self._by_object.get(id(lesson))
+        if ref is not None and ref.lesson is lesson:
+            return ref
+        # A copied lesson dict: fall back to the first course with that id
+        return self._first_id.get(lesson.get('id'))
+
+    def lesson_id(self, title: str, language: Optional[str] = None) -> Optional[str]:
+        """Id of the lesson titled ``title``; without a language, the first course that has it."""
+        if language is None:
+            return self._first_title.get(title)
+        return self._titles.get((language, title))
+
+    def chapter_id(self, language: str, title: str) -> Optional[str]:
+        return self._chapters.get((language, title))
+
+    def lesson_count(self, language: str) -> int:
+        return self._counts.get(language, 0)
+
+    def position(self, language: str, lesson_id: str) -> Optional[int]:
+        """Zero-based index of the lesson in its course, stable for a given catalog."""
+        return self._positions.get((language, lesson_id))
+
+    def next_lesson(self, language: str, lesson_id: str) -> Optional[Dict[str, Any]]:
+        return self._next.get((language, lesson_id))
@@ -0,0 +1,320 @@
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .caption_index import CaptionIndex
+from .chat_history import count_tokens
+from .http_client import GroqHttpClient, get_http_client
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_RE = re.compile(r'[^.!?。！？]+(?:[.!?。！？]+["»”\')\]]*|$)\s*')
+_SENTENCE_END_RE = re.compile(r'[.!?。！？]["»”\')\]]*\s*$')
+
+LANGUAGE_PROMPTS = {
+    'spanish': "Analyze these Spanish language captions for key Spanish learning concepts",
+    'french': "Analyze these French language captions for key French learning concepts",
+    'german': "Analyze these German language captions for key German learning concepts",
+}
+
+# Plain caption text, a CaptionIndex, or entries as returned by
+# youtube_transcript_api: {"text", "start", "duration"}
+Captions = Union[str, CaptionIndex, Sequence[Dict[str, Any]]]
+
+def format_timestamp(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """Seconds for an "MM:SS" / "H:MM:SS" string, or ``None`` if it is not one."""
+    try:
+        parts = [float(p) for p in str(value).strip().split(':')]
+    except ValueError:
+        return None
+    if not 1 <= len(parts) <= 3:
+        return None
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + part
+    return seconds
+
+def _split_sentences(text: str, max_tokens: int) -> List[str]:
+    """Sentences of ``text``; sentences over ``max_tokens`` are cut at word boundaries."""
+    pieces = []
+    for sentence in _SENTENCE_RE.findall(text):
+        if count_tokens(sentence) <= max_tokens:
+            pieces.append(sentence)
+            continue
+        words, used = [], 0
+        for word in sentence.split(' '):
+            cost = count_tokens(word)
+            if words and used + cost > max_tokens:
+                pieces.append(' '.join(words) + ' ')
+                words, used = [], 0
+            words.append(word)
+            used += cost
+        if words:
+            pieces.append(' '.join(words))
+    return pieces
+
+def chunk_captions(captions: Captions, max_tokens: int = 1500) -> List[Dict[str, Any]]:
+    """Split captions into chunks of at most ~``max_tokens``.
+
+    Plain text is packed sentence by sentence. Timed caption entries are packed
+    entry by entry, closing a full chunk after the last entry that ends a
+    sentence, and each chunk keeps the ``start``/``end`` time it covers.
+    """
+    if isinstance(captions, str):
+        chunks, current, used = [], [], 0
+        for sentence in _split_sentences(captions, max_tokens):
+            cost = count_tokens(sentence)
+            if current and used + cost > max_tokens:
+                chunks.append({"text": ''.join(current).strip()})
+                current, used = [], 0
+            current.append(sentence)
+            used += cost
+        if current and ''.join(current).strip():
+            chunks.append({"text": ''.join(current).strip()})
+        return chunks
+
+    chunks = []
+    current, used, last_sentence_end = [], 0, 0
+
+    def close(entries):
+        start = float(entries[0].get('start', 0))
+        end = float(entries[-1].get('start', 0)) + float(entries[-1].get('duration', 0))
+        chunks.append({
+            "text": ' '.join(e.get('text', '').strip() for e in entries),
+            "start": start,
+            "end": end,
+        })
+
+    for entry in captions:
+        cost = count_tokens(entry.get('text', ''))
+        if current and used + cost > max_tokens:
+            # Prefer to break after a sentence; otherwise break at this timestamp
+            cut = last_sentence_end or len(current)
+            close(current[:cut])
+            current = current[cut:]
+            used = sum(count_tokens(e.get('text', '')) for e in current)
+            last_sentence_end = 0
+        current.append(entry)
+        used += cost
+        if _SENTENCE_END_RE.search(entry.get('text', '')):
+            last_sentence_end = len(current)
+    if current:
+        close(current)
+    return chunks
+
+def _dedupe(items: List[Any], key) -> List[Any]:
+    seen = set()
+    result = []
+    for item in items:
+        k = key(item)
+        if not k or k in seen:
+            continue
+        seen.add(k)
+        result.append(item)
+    return result
+
+def _normalize(value: Any) -> str:
+    return ' '.join(str(value).lower().split())
+
+def _field_key(field: str):
+    return lambda item: _normalize(item.get(field, '')) if isinstance(item, dict) else _normalize(item)
+
+def _round_robin(lists: List[List[Any]]) -> List[Any]:
+    """Interleave per-chunk lists so capped results cover every part of the video."""
+    result = []
+    for i in range(max((len(l) for l in lists), default=0)):
+        result.extend(l[i] for l in lists if i < len(l))
+    return result
+
+def _timeline_key(item: Dict[str, Any]) -> float:
+    # Entries without a parsable time keep their relative order at the end
+    seconds = parse_timestamp(item.get('time'))
+    return float('inf') if seconds is None else seconds
+
+def merge_summaries(parts: List[Dict[str, Any]], max_main_points: int = 7,
+                    max_insights: int = 5) -> Dict[str, Any]:
+    """Merge per-chunk analyses into one, dropping duplicates across chunks and non-object parts."""
+    parts = [p for p in parts if isinstance(p, dict)]
+
+    def collect(field):
+        return [p.get(field) or [] for p in parts if isinstance(p.get(field, []), list)]
+
+    timeline = _dedupe(
+        [item for items in collect('timeline') for item in items if isinstance(item, dict)],
+        lambda item: (str(item.get('time', '')).strip(), _normalize(item.get('topic', '')))
+    )
+    timeline.sort(key=_timeline_key)
+
+    return {
+        "mainPoints": _dedupe(_round_robin(collect('mainPoints')), _normalize)[:max_main_points],
+        "keyVocabulary": _dedupe([v for items in collect('keyVocabulary') for v in items], _field_key('word')),
+        "conceptBreakdown": _dedupe([c for items in collect('conceptBreakdown') for c in items], _field_key('concept')),
+        "culturalInsights": _dedupe(_round_robin(collect('culturalInsights')), _normalize)[:max_insights],
+        "practiceExercises": _dedupe([e for items in collect('practiceExercises') for e in items], _field_key('description')),
+        "timeline": timeline,
+    }
+
+def format_course_summary(content: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a merged analysis as the /api/learning/course-summary response."""
+    return {
+        "summary": {
+            "mainPoints": content.get("mainPoints", []),
+            "keyVocabulary": content.get("keyVocabulary", []),
+            "conceptBreakdown": content.get("conceptBreakdown", []),
+            "culturalInsights": content.get("culturalInsights", []),
+            "practiceExercises": content.get("practiceExercises", [])
+        },
+        "timestamps": content.get("timeline") or [{"time": "0:00", "topic": "Start of lesson"}]
+    }
+
+class CourseSummaryService:
+    """Summarizes lesson video captions with a map-reduce over caption chunks.
+
+    Each chunk is analysed by its own completion, at most ``max_concurrency``
+    at a time, and the partial analyses are merged locally, so latency follows
+    the slowest chunk instead of the length of the whole transcript.
+    """
+
+    def __init__(self, api_key: str, http_client: Optional[GroqHttpClient] = None,
+                 chunk_tokens: int = 1500, max_concurrency: int = 4):
+        self.api_key = api_key
+        self.http = http_client or get_http_client()
+        self.chunk_tokens = chunk_tokens
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="course-summary")
+        self.base_url = "https://api.groq.com/openai/v1/chat/completions"
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def _build_payload(self, chunk: Dict[str, Any], index: int, total: int, language: str) -> Dict[str, Any]:
+        base_prompt = LANGUAGE_PROMPTS.get(
+            language, f"Analyze these {language} language captions for key language learning concepts"
+        )
+        part = ""
+        if total > 1:
+            part = f"\n\n        These captions are part {index + 1} of {total} of the video."
+
+        if 'start' in chunk:
+            # Timed captions: the model quotes where each topic starts and the
+            # time is looked up locally instead of being guessed
+            timeline_item = '{"phrase": "exact words from the text where the topic starts", "topic": "topic description"}'
+        else:
+            timeline_item = '{"time": "MM:SS", "topic": "topic description"}'
+
+        structured_prompt = f"""{base_prompt}{part}
+
+        Text to analyze: {chunk['text']}
+
+        Create a comprehensive language learning analysis that includes:
+        1. Key vocabulary with translations and example usage
+        2. Grammar patterns and rules demonstrated
+        3. Cultural context and insights
+        4. Practice exercises and dialogues
+        5. Important phrases and expressions
+        6. Timeline of topics covered
+
+        Format as JSON with:
+        {{
+            "mainPoints": ["5-7 key learning points"],
+            "keyVocabulary": [
+                {{"word": "original word", "meaning": "translation and usage notes"}}
+            ],
+            "conceptBreakdown": [
+                {{"concept": "grammar or usage pattern", "explanation": "detailed explanation with examples"}}
+            ],
+            "culturalInsights": ["3-5 cultural insights"],
+            "practiceExercises": [
+                {{
+                    "type": "dialogue/exercise type",
+                    "description": "complete exercise with examples and translations"
+                }}
+            ],
+            "timeline": [
+                {timeline_item}
+            ]
+        }}"""
+
+        return {
+            "model": "llama-3.3-70b-versatile",
+            "messages": [
+                {"role": "system", "content": "You are an expert language teacher creating detailed lesson summaries with timelines and practice materials."},
+                {"role": "user", "content": structured_prompt}
+            ],
+            "temperature": 0.3,
+            "max_tokens": 4000 if total == 1 else 1500,
+            "response_format": {"type": "json_object"}
+        }
+
+    def _summarize_chunk(self, chunk: Dict[str, Any], index: int, total: int, language: str) -> Dict[str, Any]:
+        response = self.http.post(
+            self.base_url,
+            headers=self.headers,
+            json=self._build_payload(chunk, index, total, language)
+        )
+        if not response.ok:
+            logger.error(f"Groq API error for caption chunk {index + 1}/{total}: {response.text}")
+            response.raise_for_status()
+
+        result = response.json()
+        part = json.loads(result['choices'][0]['message']['content'])
+        if not isinstance(part, dict):
+            # Counted as a failed chunk by summarize()
+            raise ValueError(f"Expected a JSON object, got {type(part).__name__}")
+        return part
+
+    @staticmethod
+    def _resolve_timeline(part: Dict[str, Any], chunk: Dict[str, Any], captions: CaptionIndex) -> None:
+        """Replace quoted phrases in a chunk's timeline with the time they are said."""
+        timeline = []
+        for item in part.get('timeline') or []:
+            if not isinstance(item, dict) or not item.get('topic'):
+                continue
+            seconds = captions.time_of(str(item.get('phrase', '')), after=chunk['start'])
+            if seconds is None or seconds >= chunk['end']:
+                seconds = chunk['start']
+            timeline.append({"time": format_timestamp(seconds), "topic": item['topic'], "seconds": seconds})
+        if not timeline:
+            topic = next(iter(part.get('mainPoints') or []), "Start of section")
+            timeline.append({"time": format_timestamp(chunk['start']), "topic": topic, "seconds": chunk['start']})
+        part['timeline'] = timeline
+
+    def summarize(self, captions: Captions, language: str) -> Dict[str, Any]:
+        """Return the merged analysis; raises if every chunk failed."""
+        if not isinstance(captions, (str, CaptionIndex)):
+            captions = CaptionIndex.from_entries(captions)
+        chunks = chunk_captions(captions, self.chunk_tokens)
+        if not chunks:
+            raise ValueError("Captions are empty")
+
+        total = len(chunks)
+        logger.info(f"Summarizing captions in {total} chunk(s)")
+        futures = [
+            self._executor.submit(self._summarize_chunk, chunk, i, total, language)
+            for i, chunk in enumerate(chunks)
+        ]
+
+        parts = []
+        errors = []
+        for i, future in enumerate(futures):
+            try:
+                part = future.result()
+                if isinstance(captions, CaptionIndex):
+                    self._resolve_timeline(part, chunks[i], captions)
+                parts.append(part)
+            except Exception as e:
+                logger.error(f"Caption chunk {i + 1}/{total} failed: {str(e)}")
+                errors.append(e)
+
+        if not parts:
+            raise errors[0]
+        return merge_summaries(parts)
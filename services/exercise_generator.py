@@ -1,12 +1,13 @@
 import logging
-from typing import List, Dict, Any
-import requests
+from typing import List, Dict, Any, Optional
+from .http_client import GroqHttpClient, get_http_client
 
 logger = logging.getLogger(__name__)
 
 class ExerciseGenerator:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client: Optional[GroqHttpClient] = None):
         self.api_key = api_key
+        self.http = http_client or get_http_client()
         self.base_url = "https://api.groq.com/openai/v1/chat/completions"
         self.headers = {
             "Authorization": f"Bearer {api_key}",
@@ -38,7 +39,7 @@ class ExerciseGenerator:
         Generate 3-5 exercises."""
 
         try:
-            response = requests.post(
+            response = self.http.post(
                 self.base_url,
                 headers=self.headers,
                 json={
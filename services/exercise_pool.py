@@ -0,0 +1,137 @@
+import logging
+import threading
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .cache import LRUCache
+from .practice_service import EXERCISE_TYPES, LEVELS, PRACTICE_LANGUAGES, PracticeService
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, str, str]
+
+class ExercisePool:
+    """Ready-made exercise sets per (language, level, exercise type).
+
+    Requests are served from the pool; a background worker refills a bucket
+    whenever it drops below ``low_water`` sets. Each set is served to at most
+    ``max_uses`` learners and never twice to the same learner, after which it
+    is rotated out of the pool. Only the languages and levels the practice
+    page offers are pooled; anything else is left to the caller to generate.
+    """
+
+    def __init__(self, service: PracticeService, target_size: int = 5, low_water: int = 2,
+                 max_uses: int = 3, max_workers: int = 2, max_buckets: int = 256,
+                 max_learners: int = 10000):
+        self.service = service
+        self.target_size = target_size
+        self.low_water = low_water
+        self.max_uses = max_uses
+        self.max_buckets = max_buckets
+        self._buckets: Dict[PoolKey, deque] = OrderedDict()
+        self._refilling = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="exercise-pool")
+        # learner id -> ids of the sets already served to them
+        self._seen = LRUCache(max_entries=max_learners, ttl=7 * 24 * 3600)
+
+    @staticmethod
+    def _key(language: str, level: str, exercise_type: str) -> PoolKey:
+        return (language, level, exercise_type)
+
+    @staticmethod
+    def pooled(language: str, level: str, exercise_type: str) -> bool:
+        """Whether sets for this combination are kept ready; client input outside it never starts a refill."""
+        return language in PRACTICE_LANGUAGES and level in LEVELS and exercise_type in EXERCISE_TYPES
+
+    def _bucket(self, key: PoolKey) -> deque:
+        # Callers hold self._lock
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = deque()
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def take(self, language: str, level: str, exercise_type: str,
+             learner_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Pop a set the learner has not seen, or ``None`` if the pool has none ready.
+
+        Never blocks on generation; a refill is scheduled when the bucket runs low.
+        """
+        if not self.pooled(language, level, exercise_type):
+            return None
+        key = self._key(language, level, exercise_type)
+        seen = self._seen.get(learner_id) if learner_id else None
+
+        with self._lock:
+            bucket = self._bucket(key)
+            picked = None
+            for _ in range(len(bucket)):
+                entry = bucket.popleft()
+                if picked is None and (seen is None or entry['id'] not in seen):
+                    picked = entry
+                    entry['uses'] += 1
+                    if entry['uses'] >= self.max_uses:
+                        continue
+                # Sets skipped or still usable rotate to the back
+                bucket.append(entry)
+            if picked is not None and learner_id:
+                seen = set(seen or ())
+                seen.add(picked['id'])
+                self._seen.set(learner_id, seen)
+            elif picked is None and bucket:
+                # The learner has seen every ready set: retire the oldest so a fresh one is generated
+                bucket.popleft()
+            ready = len(bucket)
+
+        if ready < self.low_water or picked is None:
+            self._schedule_refill(key)
+        if picked is None:
+            return None
+        return dict(picked['exercises'], setId=picked['id'])
+
+    def get(self, language: str, level: str, exercise_type: str,
+            learner_id: Optional[str] = None) -> Dict[str, Any]:
+        """Serve from the pool, generating synchronously only on an empty bucket."""
+        exercises = self.take(language, level, exercise_type, learner_id)
+        if exercises is not None:
+            return exercises
+        logger.debug(f"Exercise pool miss for {language}/{level}/{exercise_type}")
+        return self.service.generate_exercises(language, level, exercise_type)
+
+    def prefill(self, keys: Iterable[PoolKey]) -> None:
+        """Schedule background fills for the given (language, level, exercise type) keys."""
+        for language, level, exercise_type in keys:
+            if self.pooled(language, level, exercise_type):
+                self._schedule_refill(self._key(language, level, exercise_type))
+
+    def ready(self, language: str, level: str, exercise_type: str) -> int:
+        with self._lock:
+            return len(self._buckets.get(self._key(language, level, exercise_type), ()))
+
+    def _schedule_refill(self, key: PoolKey) -> None:
+        with self._lock:
+            if key in self._refilling:
+                return
+            self._refilling.add(key)
+        self._executor.submit(self._refill, key)
+
+    def _refill(self, key: PoolKey) -> None:
+        try:
+            while True:
+                with self._lock:
+                    if len(self._bucket(key)) >= self.target_size:
+                        return
+                exercises = self.service.generate_exercises_strict(*key)
+                with self._lock:
+                    self._bucket(key).append({'id': uuid.uuid4().hex, 'exercises': exercises, 'uses': 0})
+        except Exception as e:
+            logger.error(f"Exercise pool refill failed for {'/'.join(key)}: {str(e)}")
+        finally:
+            with self._lock:
+                self._refilling.discard(key)
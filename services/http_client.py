@@ -0,0 +1,116 @@
+import json
+import logging
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .rate_limiter import TokenBucketRateLimiter, RateLimitExceeded, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
+# Read timeouts per endpoint path; audio uploads take longer than chat completions
+DEFAULT_TIMEOUTS = {
+    "/chat/completions": 30,
+    "/audio/transcriptions": 60,
+    "/audio/translations": 60,
+}
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+
+def rate_limit_body(retry_after: float) -> str:
+    """Error body, in the API's own shape, for a request the local rate limiter did not admit in time."""
+    return json.dumps({"error": {"message": f"Rate limit reached, retry in {retry_after:.2f} seconds",
+                                 "type": "rate_limit_exceeded"}})
+
+def rate_limited_response(url: str, retry_after: float) -> requests.Response:
+    """Synthetic 429, so callers handle a local rate-limit timeout like one from the API."""
+    response = requests.Response()
+    response.status_code = 429
+    response.reason = "Too Many Requests"
+    response.url = url
+    response.headers["Retry-After"] = str(max(1, round(retry_after)))
+    response._content = rate_limit_body(retry_after).encode()
+    response._content_consumed = True
+    return response
+
+class GroqHttpClient:
+    """Pooled, keep-alive HTTP client shared by every Groq-backed service.
+
+    Wraps a single ``requests.Session`` so TCP/TLS connections to the API host
+    are reused across requests and threads instead of being re-established on
+    every call. When a rate limiter is attached, every POST first draws from
+    its shared request/token quota, waiting at most the request's read timeout.
+    """
+
+    def __init__(self, pool_connections: int = 4, pool_maxsize: int = 32,
+                 timeouts: Optional[Dict[str, float]] = None,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 rate_limiter: Optional[TokenBucketRateLimiter] = None):
+        self.rate_limiter = rate_limiter
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.connect_timeout = connect_timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=False
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _timeout_for(self, url: str):
+        for path, read_timeout in self.timeouts.items():
+            if url.endswith(path):
+                return (self.connect_timeout, read_timeout)
+        return (self.connect_timeout, DEFAULT_READ_TIMEOUT)
+
+    def post(self, url: str, rate_limit_wait: bool = True, **kwargs) -> requests.Response:
+        """POST through the pool; ``rate_limit_wait=False`` fails fast with RateLimitExceeded.
+
+        If the quota does not free up within the read timeout, a 429 response
+        is returned without sending the request.
+        """
+        timeout = kwargs.setdefault("timeout", self._timeout_for(url))
+        if self.rate_limiter is not None:
+            read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+            try:
+                self.rate_limiter.acquire(estimate_tokens(kwargs.get("json")), wait=rate_limit_wait,
+                                          timeout=read_timeout)
+            except RateLimitExceeded as e:
+                if not rate_limit_wait:
+                    raise
+                logger.warning(f"Rate limit quota not free within {read_timeout}s, answering 429 for {url}")
+                return rate_limited_response(url, e.retry_after)
+        return self.session.post(url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self._timeout_for(url))
+        return self.session.get(url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def get_http_client() -> GroqHttpClient:
+    """Return the process-wide client, creating it on first use."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = GroqHttpClient()
+    return _default_client
+
+def set_http_client(client: GroqHttpClient) -> None:
+    """Install ``client`` as the process-wide default."""
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
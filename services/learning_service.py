@@ -1,22 +1,94 @@
 import logging
-import requests
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import json
+from .cache import LRUCache, shared_cache
+from .http_client import GroqHttpClient, get_http_client
+from .lesson_store import LessonStore
+from .single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Bump when the lesson prompt changes so stored lessons are regenerated
+LESSON_PROMPT_VERSION = "1"
+
+# Name of the process-wide lesson cache shared with the Streamlit app
+LESSON_CACHE = "lessons"
+
+def lesson_cache(max_bytes: int = 64 * 1024 * 1024, ttl: float = 24 * 3600) -> LRUCache:
+    """The shared in-memory lesson cache; the limits only apply to the first call."""
+    return shared_cache(LESSON_CACHE, max_entries=4096, max_bytes=max_bytes, ttl=ttl)
+
+def is_valid_lesson(lesson: Any) -> bool:
+    """A lesson the routes can render: a dict with a non-empty ``sections`` list."""
+    return isinstance(lesson, dict) and isinstance(lesson.get('sections'), list) and bool(lesson['sections'])
+
 class LearningService:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client: Optional[GroqHttpClient] = None,
+                 store: Optional[LessonStore] = None, variants: int = 1,
+                 memory: Optional[LRUCache] = None):
         self.api_key = api_key
+        self.http = http_client or get_http_client()
+        self.store = store
+        self.variants = variants
+        self.memory = memory if memory is not None else lesson_cache()
+        if store is not None:
+            # Otherwise an invalidated lesson would still be served from memory until its TTL ran out
+            store.add_invalidation_listener(self._forget)
         self.base_url = "https://api.groq.com/openai/v1/chat/completions"
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
+        self.inflight = SingleFlight()
 
     def generate_lesson_content(self, lesson_name: str, language: str, level: str) -> Dict[str, Any]:
-        try:
-            prompt = f"""Generate a comprehensive {language} language lesson for {level} level.
+        stored = self._get_stored(lesson_name, language, level)
+        if stored is not None:
+            return stored
+
+        # Students opening the same lesson at once share one generation call
+        return self.inflight.do(
+            (lesson_name, language, level),
+            self._generate_lesson_content, lesson_name, language, level
+        )
+
+    @staticmethod
+    def _memory_key(lesson_name: str, language: str, level: str) -> tuple:
+        return ("lesson-service", LESSON_PROMPT_VERSION, lesson_name, language, level)
+
+    def _forget(self, matches) -> None:
+        """Drop in-memory lessons whose (lesson, language, level, prompt version) ``matches``."""
+        self.memory.delete_where(
+            lambda key: isinstance(key, tuple) and len(key) == 5 and key[0] == "lesson-service"
+            and matches(key[2], key[3], key[4], key[1])
+        )
+
+    def _get_stored(self, lesson_name: str, language: str, level: str) -> Optional[Dict[str, Any]]:
+        # With several variants, the store picks one per request, so only
+        # single-variant lessons are kept in memory
+        if self.variants == 1:
+            lesson = self.memory.get(self._memory_key(lesson_name, language, level))
+            if lesson is not None:
+                return lesson
+
+        if self.store is None:
+            return None
+        # Until all variants exist, new requests generate another one
+        lesson = self.store.get(lesson_name, language, level, LESSON_PROMPT_VERSION, min_variants=self.variants)
+        if not is_valid_lesson(lesson):
+            return None
+        if self.variants == 1:
+            self.memory.set(self._memory_key(lesson_name, language, level), lesson)
+        return lesson
+
+    def _store(self, lesson_name: str, language: str, level: str, lesson: Dict[str, Any]) -> None:
+        if self.variants == 1:
+            self.memory.set(self._memory_key(lesson_name, language, level), lesson)
+        if self.store is not None:
+            self.store.add(lesson_name, language, level, LESSON_PROMPT_VERSION, lesson, max_variants=self.variants)
+
+    def _build_payload(self, lesson_name: str, language: str, level: str) -> Dict[str, Any]:
+        prompt = f"""Generate a comprehensive {language} language lesson for {level} level.
             Topic: {lesson_name}
 
             Provide a detailed response in JSON format with following structure:
@@ -44,28 +116,41 @@ class LearningService:
                 "summary": "Key points learned"
             }}"""
 
-            response = requests.post(
+        return {
+            "model": "llama-3.3-70b-versatile",
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.7,
+            "max_tokens": 2000,
+            "response_format": { "type": "json_object" }
+        }
+
+    def _parse_lesson(self, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the generated lesson, or ``None`` if the model did not return a usable lesson."""
+        content = result['choices'][0]['message']['content']
+        
+        try:
+            lesson = json.loads(content)
+        except json.JSONDecodeError:
+            return None
+        # Anything else would be stored and then rejected by the routes on every request
+        return lesson if is_valid_lesson(lesson) else None
+
+    def _generate_lesson_content(self, lesson_name: str, language: str, level: str) -> Dict[str, Any]:
+        try:
+            response = self.http.post(
                 self.base_url,
                 headers=self.headers,
-                json={
-                    "model": "llama-3.3-70b-versatile",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.7,
-                    "max_tokens": 2000,
-                    "response_format": { "type": "json_object" }
-                },
-                timeout=30
+                json=self._build_payload(lesson_name, language, level)
             )
             
             response.raise_for_status()
-            result = response.json()
-            content = result['choices'][0]['message']['content']
-            
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError:
+            lesson = self._parse_lesson(response.json())
+            if lesson is None:
                 return self._get_fallback_content(lesson_name)
 
+            self._store(lesson_name, language, level, lesson)
+            return lesson
+
         except Exception as e:
             logger.error(f"Failed to generate lesson content: {str(e)}")
             return self._get_fallback_content(lesson_name)
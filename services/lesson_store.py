@@ -0,0 +1,150 @@
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LESSON_STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'lessons.sqlite3')
+
+class LessonStore:
+    """Durable store of generated lessons keyed by (lesson, language, level, prompt version).
+
+    A key may hold several variants so learners revisiting a lesson do not
+    always get the same text. Entries never expire on their own; bump the
+    prompt version or call :meth:`invalidate` when the content should change.
+    Listeners registered with :meth:`add_invalidation_listener` are told what
+    was deleted so in-memory copies in this process go too.
+    """
+
+    def __init__(self, db_path: Optional[str] = DEFAULT_LESSON_STORE_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._listeners: List[Callable[[Callable[..., bool]], None]] = []
+        if self.db_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+                conn = self._connection()
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS lessons ("
+                    "lesson TEXT NOT NULL, language TEXT NOT NULL, level TEXT NOT NULL, "
+                    "prompt_version TEXT NOT NULL, variant INTEGER NOT NULL, "
+                    "content TEXT NOT NULL, created_at REAL NOT NULL, "
+                    "PRIMARY KEY (lesson, language, level, prompt_version, variant))"
+                )
+                conn.commit()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Lesson store disabled, lessons will only be cached in memory: {str(e)}")
+                self.db_path = None
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def variants(self, lesson: str, language: str, level: str, prompt_version: str) -> int:
+        if not self.db_path:
+            return 0
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM lessons WHERE lesson = ? AND language = ? AND level = ? AND prompt_version = ?",
+            (lesson, language, level, prompt_version)
+        ).fetchone()
+        return row[0]
+
+    def get(self, lesson: str, language: str, level: str, prompt_version: str,
+            min_variants: int = 1) -> Optional[Dict[str, Any]]:
+        """Return a random stored variant, or ``None`` if fewer than ``min_variants`` are stored."""
+        if not self.db_path:
+            return None
+        try:
+            conn = self._connection()
+            stored = [row[0] for row in conn.execute(
+                "SELECT variant FROM lessons WHERE lesson = ? AND language = ? AND level = ? AND prompt_version = ?",
+                (lesson, language, level, prompt_version)
+            )]
+            if not stored or len(stored) < min_variants:
+                return None
+            row = conn.execute(
+                "SELECT content FROM lessons WHERE lesson = ? AND language = ? AND level = ? "
+                "AND prompt_version = ? AND variant = ?",
+                (lesson, language, level, prompt_version, random.choice(stored))
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read lesson store: {str(e)}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def add(self, lesson: str, language: str, level: str, prompt_version: str,
+            content: Dict[str, Any], max_variants: int = 1) -> None:
+        """Store a new variant; once ``max_variants`` exist the oldest one is replaced."""
+        if not self.db_path:
+            return
+        try:
+            conn = self._connection()
+            with conn:
+                rows = conn.execute(
+                    "SELECT variant FROM lessons WHERE lesson = ? AND language = ? AND level = ? "
+                    "AND prompt_version = ? ORDER BY created_at",
+                    (lesson, language, level, prompt_version)
+                ).fetchall()
+                if len(rows) >= max_variants:
+                    variant = rows[0][0]
+                else:
+                    variant = max((row[0] for row in rows), default=-1) + 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO lessons (lesson, language, level, prompt_version, variant, content, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (lesson, language, level, prompt_version, variant,
+                     json.dumps(content, ensure_ascii=False), time.time())
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to write lesson store: {str(e)}")
+
+    def add_invalidation_listener(self, listener: Callable[[Callable[..., bool]], None]) -> None:
+        """Call ``listener(matches)`` after lessons are deleted.
+
+        ``matches(lesson, language, level, prompt_version)`` tells whether a
+        key was among the deleted ones.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, matches: Callable[..., bool]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(matches)
+            except Exception as e:
+                logger.error(f"Lesson invalidation listener failed: {str(e)}")
+
+    def invalidate(self, lesson: Optional[str] = None, language: Optional[str] = None,
+                   level: Optional[str] = None, prompt_version: Optional[str] = None) -> int:
+        """Delete every stored lesson matching the given fields, returning how many were removed."""
+        filters = {'lesson': lesson, 'language': language, 'level': level, 'prompt_version': prompt_version}
+        clauses = [f"{column} = ?" for column, value in filters.items() if value is not None]
+        params = [value for value in filters.values() if value is not None]
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        removed = 0
+        if self.db_path:
+            conn = self._connection()
+            with conn:
+                removed = conn.execute(f"DELETE FROM lessons{where}", params).rowcount
+        self._notify(lambda *key: all(value is None or value == field
+                                      for value, field in zip(filters.values(), key)))
+        return removed
+
+    def purge_other_versions(self, prompt_version: str) -> int:
+        """Delete lessons generated with any prompt version other than ``prompt_version``."""
+        removed = 0
+        if self.db_path:
+            conn = self._connection()
+            with conn:
+                removed = conn.execute("DELETE FROM lessons WHERE prompt_version != ?", (prompt_version,)).rowcount
+        self._notify(lambda lesson, language, level, version: version != prompt_version)
+        return removed
@@ -1,64 +1,88 @@
 import logging
-import requests
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import json
+from .http_client import GroqHttpClient, get_http_client
 
 logger = logging.getLogger(__name__)
 
+EXERCISE_TYPES = (
+    "vocabulary-match",
+    "sentence-builder",
+    "listening-challenge",
+    "pronunciation-game",
+    "word-puzzle",
+    "conversation-sim",
+    "memory-cards",
+    "fill-blanks",
+)
+
+# What the practice page offers; only these are pre-generated by the exercise pool
+PRACTICE_LANGUAGES = ("English", "Spanish", "German", "French")
+LEVELS = ("A1", "A2", "B1", "B2", "C1", "C2")
+
 class PracticeService:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client: Optional[GroqHttpClient] = None):
         self.api_key = api_key
+        self.http = http_client or get_http_client()
         self.base_url = "https://api.groq.com/openai/v1/chat/completions"
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
 
-    def generate_exercises(self, language: str, level: str, exercise_type: str) -> Dict[str, Any]:
-        try:
-            prompt = self._get_exercise_prompt(language, level, exercise_type)
-            
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                json={
-                    "model": "llama-3.3-70b-versatile",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are an expert language teacher creating interactive exercises."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.7,
-                    "max_tokens": 2000,
-                    "response_format": { "type": "json_object" }
+    def _build_payload(self, language: str, level: str, exercise_type: str) -> Dict[str, Any]:
+        prompt = self._get_exercise_prompt(language, level, exercise_type)
+        return {
+            "model": "llama-3.3-70b-versatile",
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are an expert language teacher creating interactive exercises."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
                 }
-            )
-            
-            if not response.ok:
-                logger.error(f"API call failed: {response.text}")
-                return self._get_fallback_exercises(language, exercise_type)
+            ],
+            "temperature": 0.7,
+            "max_tokens": 2000,
+            "response_format": { "type": "json_object" }
+        }
 
-            result = response.json()
-            content = result['choices'][0]['message']['content']
-            parsed_content = json.loads(content)
+    def _parse_exercises(self, result: Dict[str, Any], language: str, exercise_type: str) -> Dict[str, Any]:
+        content = result['choices'][0]['message']['content']
+        parsed_content = json.loads(content)
 
-            # Transform API response to match expected format
-            exercises_data = self.transform_response(parsed_content, exercise_type)
+        # Transform API response to match expected format
+        exercises_data = self.transform_response(parsed_content, exercise_type)
 
-            if not exercises_data["exercises"]:
-                return self._get_fallback_exercises(language, exercise_type)
+        if not exercises_data["exercises"]:
+            raise ValueError("Response contained no exercises")
 
-            return exercises_data
+        return exercises_data
+
+    def generate_exercises(self, language: str, level: str, exercise_type: str) -> Dict[str, Any]:
+        try:
+            return self.generate_exercises_strict(language, level, exercise_type)
 
         except Exception as e:
             logger.error(f"Failed to generate exercises: {str(e)}")
             return self._get_fallback_exercises(language, exercise_type)
 
+    def generate_exercises_strict(self, language: str, level: str, exercise_type: str) -> Dict[str, Any]:
+        """Like :meth:`generate_exercises`, but raises instead of returning fallback content."""
+        response = self.http.post(
+            self.base_url,
+            headers=self.headers,
+            json=self._build_payload(language, level, exercise_type)
+        )
+
+        if not response.ok:
+            logger.error(f"API call failed: {response.text}")
+            response.raise_for_status()
+
+        return self._parse_exercises(response.json(), language, exercise_type)
+
     def _get_exercise_prompt(self, language: str, level: str, exercise_type: str) -> str:
         exercise_prompts = {
             "vocabulary-match": f"""Create a vocabulary matching game in {language} with:
@@ -0,0 +1,251 @@
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROGRESS_STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'progress.sqlite3')
+
+# Learner used when the caller does not identify one (single-user local installs)
+DEFAULT_USER_ID = 'local'
+
+LESSON_COMPLETED = 'lesson_completed'
+POINTS = 'points'
+
+# (id, title, description, summary field, target)
+ACHIEVEMENTS = (
+    ('first-steps', 'First Steps', 'Complete your first lesson', 'lessons_completed', 1),
+    ('quick-learner', 'Quick Learner', 'Complete 5 lessons in one day', 'best_day', 5),
+    ('dedicated', 'Dedicated Learner', 'Complete 10 lessons', 'lessons_completed', 10),
+    ('point-collector', 'Point Collector', 'Earn 100 points', 'points', 100),
+)
+
+class ProgressStore:
+    """Append-only log of learning events with per-user summaries, in SQLite (WAL).
+
+    ``record_*`` calls only queue the event; a background thread writes
+    queued events in batches every ``flush_interval`` seconds (or as soon as
+    ``batch_size`` are pending). Each batch also updates the materialized
+    ``summaries`` row of the users it touches, so reads never replay the log.
+    Reads therefore lag writes by up to one flush interval. If the database
+    cannot be opened the store is disabled: events are dropped and reads
+    return an empty history.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_PROGRESS_STORE_PATH, flush_interval: float = 1.0,
+                 batch_size: int = 256, max_pending: int = 100000):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._local = threading.local()
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = None
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._create_tables()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Progress store disabled, learning events will not be saved: {str(e)}")
+            self.db_path = None
+            return
+
+        self._thread = threading.Thread(target=self._run, name="progress-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _create_tables(self) -> None:
+        conn = self._connection()
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, kind TEXT NOT NULL, "
+            "language TEXT, lesson_id TEXT, points INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS events_user ON events (user_id, id);"
+            "CREATE TABLE IF NOT EXISTS completions ("
+            "user_id TEXT NOT NULL, language TEXT NOT NULL, lesson_id TEXT NOT NULL, completed_at REAL NOT NULL, "
+            "PRIMARY KEY (user_id, language, lesson_id));"
+            "CREATE TABLE IF NOT EXISTS daily ("
+            "user_id TEXT NOT NULL, day TEXT NOT NULL, lessons INTEGER NOT NULL, "
+            "PRIMARY KEY (user_id, day));"
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "user_id TEXT PRIMARY KEY, points INTEGER NOT NULL, lessons_completed INTEGER NOT NULL, "
+            "best_day INTEGER NOT NULL, first_active REAL NOT NULL, last_active REAL NOT NULL);"
+        )
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record_completion(self, user_id: str, language: str, lesson_id: str, points: int = 0) -> None:
+        """Queue a lesson completion; repeats are logged but award neither the lesson nor ``points`` again."""
+        self._enqueue((user_id, LESSON_COMPLETED, language, lesson_id, points, time.time()))
+
+    def record_points(self, user_id: str, points: int) -> None:
+        self._enqueue((user_id, POINTS, None, None, points, time.time()))
+
+    def _enqueue(self, event: tuple) -> None:
+        if not self.db_path:
+            return
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                logger.warning("Progress store backlog full, dropping oldest event")
+                self._pending.popleft()
+            self._pending.append(event)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Write every queued event now, returning how many were written."""
+        with self._write_lock:
+            with self._lock:
+                batch = list(self._pending)
+                self._pending.clear()
+            if not batch:
+                return 0
+            try:
+                self._write(batch)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to write {len(batch)} progress events: {str(e)}")
+                with self._lock:
+                    # Retry on the next flush, ahead of anything queued meanwhile
+                    self._pending.extendleft(reversed(batch))
+                return 0
+            return len(batch)
+
+    def _write(self, batch: List[tuple]) -> None:
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO events (user_id, kind, language, lesson_id, points, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                batch
+            )
+            for user_id, kind, language, lesson_id, points, created_at in batch:
+                new_lesson = 0
+                if kind == LESSON_COMPLETED:
+                    new_lesson = conn.execute(
+                        "INSERT OR IGNORE INTO completions (user_id, language, lesson_id, completed_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (user_id, language, lesson_id, created_at)
+                    ).rowcount
+                day_lessons = 0
+                if new_lesson:
+                    day = time.strftime('%Y-%m-%d', time.localtime(created_at))
+                    conn.execute(
+                        "INSERT INTO daily (user_id, day, lessons) VALUES (?, ?, 1) "
+                        "ON CONFLICT (user_id, day) DO UPDATE SET lessons = lessons + 1",
+                        (user_id, day)
+                    )
+                    day_lessons = conn.execute(
+                        "SELECT lessons FROM daily WHERE user_id = ? AND day = ?", (user_id, day)
+                    ).fetchone()[0]
+                elif kind == LESSON_COMPLETED:
+                    points = 0
+                conn.execute(
+                    "INSERT INTO summaries (user_id, points, lessons_completed, best_day, first_active, last_active) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (user_id) DO UPDATE SET points = points + excluded.points, "
+                    "lessons_completed = lessons_completed + excluded.lessons_completed, "
+                    "best_day = MAX(best_day, excluded.best_day), "
+                    "last_active = MAX(last_active, excluded.last_active)",
+                    (user_id, points, new_lesson, day_lessons, created_at, created_at)
+                )
+
+    def summary(self, user_id: str) -> Dict[str, Any]:
+        row = None
+        if self.db_path:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT points, lessons_completed, best_day, first_active, last_active "
+                "FROM summaries WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        if row is None:
+            return {'userId': user_id, 'points': 0, 'lessons_completed': 0, 'best_day': 0,
+                    'first_active': None, 'last_active': None, 'languages': {}}
+        languages = dict(conn.execute(
+            "SELECT language, COUNT(*) FROM completions WHERE user_id = ? GROUP BY language", (user_id,)
+        ).fetchall())
+        points, lessons, best_day, first_active, last_active = row
+        return {'userId': user_id, 'points': points, 'lessons_completed': lessons, 'best_day': best_day,
+                'first_active': first_active, 'last_active': last_active, 'languages': languages}
+
+    def completed_lessons(self, user_id: str) -> List[tuple]:
+        """``(language, lesson_id)`` of every lesson the user has completed."""
+        if not self.db_path:
+            return []
+        return self._connection().execute(
+            "SELECT language, lesson_id FROM completions WHERE user_id = ?", (user_id,)
+        ).fetchall()
+
+    def history(self, user_id: str, limit: int = 50, before: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Most recent events first; pass the last ``id`` seen as ``before`` to page back."""
+        if not self.db_path:
+            return []
+        rows = self._connection().execute(
+            "SELECT id, kind, language, lesson_id, points, created_at FROM events "
+            "WHERE user_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+            (user_id, before if before is not None else 2 ** 63 - 1, limit)
+        ).fetchall()
+        return [
+            {'id': event_id, 'kind': kind, 'language': language, 'lessonId': lesson_id,
+             'points': points, 'timestamp': created_at}
+            for event_id, kind, language, lesson_id, points, created_at in rows
+        ]
+
+    def achievements(self, user_id: str) -> List[Dict[str, Any]]:
+        summary = self.summary(user_id)
+        result = []
+        for achievement_id, title, description, field, target in ACHIEVEMENTS:
+            value = summary[field]
+            result.append({
+                'id': achievement_id,
+                'title': title,
+                'description': description,
+                'progress': min(100, int(value * 100 / target)),
+                'completed': value >= target,
+            })
+        return result
+
+    def close(self) -> None:
+        if self._closed or self._thread is None:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+_stores: Dict[str, ProgressStore] = {}
+_stores_lock = threading.Lock()
+
+def get_progress_store(db_path: str = DEFAULT_PROGRESS_STORE_PATH, **kwargs) -> ProgressStore:
+    """Return the process-wide store for ``db_path``, so script reruns share one flush thread.
+
+    ``kwargs`` are passed to :class:`ProgressStore` and only apply to the first call for a path.
+    """
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is None:
+            store = _stores[db_path] = ProgressStore(db_path, **kwargs)
+        return store
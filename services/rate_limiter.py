@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to per-process limiting
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_PATH = os.path.join(tempfile.gettempdir(), 'groq_rate_limit.state')
+
+class RateLimitExceeded(Exception):
+    """Raised when a fail-fast acquire finds the bucket empty."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit reached, retry in {retry_after:.2f} seconds")
+        self.retry_after = retry_after
+
+class TokenBucketRateLimiter:
+    """Requests-per-minute and tokens-per-minute token bucket.
+
+    Bucket levels live in a small state file guarded by an exclusive ``flock``,
+    so every worker process on the host draws from the same quota. Threads in
+    one process are serialized with a regular lock first, since ``flock`` does
+    not exclude threads sharing a file descriptor.
+    """
+
+    def __init__(self, requests_per_minute: float = 30, tokens_per_minute: Optional[float] = None,
+                 state_path: Optional[str] = DEFAULT_STATE_PATH):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.state_path = state_path if fcntl is not None else None
+        self._lock = threading.Lock()
+        self._state = None
+
+    def _full_state(self, now: float) -> dict:
+        return {
+            "requests": float(self.requests_per_minute),
+            "tokens": float(self.tokens_per_minute or 0),
+            "updated_at": now
+        }
+
+    def _refill(self, state: dict, now: float) -> dict:
+        elapsed = max(0.0, now - state["updated_at"])
+        state["requests"] = min(
+            float(self.requests_per_minute),
+            state["requests"] + elapsed * self.requests_per_minute / 60.0
+        )
+        if self.tokens_per_minute:
+            state["tokens"] = min(
+                float(self.tokens_per_minute),
+                state["tokens"] + elapsed * self.tokens_per_minute / 60.0
+            )
+        state["updated_at"] = now
+        return state
+
+    def _try_take(self, state: dict, tokens: int) -> float:
+        """Deduct from the buckets if possible; otherwise return seconds to wait."""
+        if self.tokens_per_minute:
+            # A single request larger than the whole bucket could never proceed
+            tokens = min(tokens, self.tokens_per_minute)
+
+        request_wait = 0.0
+        if state["requests"] < 1:
+            request_wait = (1 - state["requests"]) * 60.0 / self.requests_per_minute
+
+        token_wait = 0.0
+        if self.tokens_per_minute and state["tokens"] < tokens:
+            token_wait = (tokens - state["tokens"]) * 60.0 / self.tokens_per_minute
+
+        wait = max(request_wait, token_wait)
+        if wait == 0.0:
+            state["requests"] -= 1
+            if self.tokens_per_minute:
+                state["tokens"] -= tokens
+        return wait
+
+    def _attempt(self, tokens: int) -> float:
+        now = time.time()
+        with self._lock:
+            if self.state_path is None:
+                if self._state is None:
+                    self._state = self._full_state(now)
+                return self._try_take(self._refill(self._state, now), tokens)
+
+            with open(self.state_path, 'a+') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    try:
+                        state = json.loads(f.read() or 'null')
+                    except ValueError:
+                        state = None
+                    if not state:
+                        state = self._full_state(now)
+
+                    wait = self._try_take(self._refill(state, now), tokens)
+
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(state))
+                    f.flush()
+                    return wait
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def acquire(self, tokens: int = 0, wait: bool = True, timeout: Optional[float] = None) -> None:
+        """Take one request slot and ``tokens`` tokens from the shared quota.
+
+        With ``wait=False`` raise :class:`RateLimitExceeded` instead of sleeping.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            delay = self._attempt(tokens)
+            if delay == 0.0:
+                return
+            if not wait:
+                raise RateLimitExceeded(delay)
+            if deadline is not None and time.monotonic() + delay > deadline:
+                raise RateLimitExceeded(delay)
+            logger.debug(f"Rate limiter waiting {delay:.2f} seconds")
+            time.sleep(delay)
+
+def estimate_tokens(payload: Optional[dict]) -> int:
+    """Rough token cost of a chat completion: ~4 characters per prompt token plus max_tokens."""
+    if not payload:
+        return 0
+    prompt_chars = sum(len(str(m.get("content", ""))) for m in payload.get("messages", []))
+    prompt_chars += len(str(payload.get("prompt", "")))
+    return prompt_chars // 4 + int(payload.get("max_tokens") or 0)
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """Coalesce concurrent identical calls so only one of them does the work.
+
+    The first caller for a key runs the function; callers that arrive while it
+    is still in flight block and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            logger.debug(f"Joining in-flight call for {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            if call.waiters:
+                logger.debug(f"Shared result of {key} with {call.waiters} waiting callers")
+            call.done.set()
+
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+class AsyncSingleFlight:
+    """asyncio counterpart of :class:`SingleFlight`.
+
+    The shared work runs as its own task, so a caller that is cancelled (for
+    example on client disconnect) does not cancel it for the other waiters.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._calls[key] = task
+
+            def _forget(done_task, key=key):
+                if self._calls.get(key) is done_task:
+                    del self._calls[key]
+
+            task.add_done_callback(_forget)
+        else:
+            logger.debug(f"Joining in-flight call for {key}")
+
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
@@ -1,67 +1,183 @@
-import requests
 import base64
 import logging
-from typing import Dict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import requests
+from .audio_preprocess import CODECS, MAX_DURATION, AudioTooLong, PreparedAudio, load_speech, prepare_for_transcription
+from .audio_upload import Audio, MultipartStream, as_stream
+from .http_client import GroqHttpClient, get_http_client
+from .whisper_backend import LocalWhisperBackend
 
 logger = logging.getLogger(__name__)
 
+# Where transcription runs: Groq's hosted Whisper or a model loaded in this process
+BACKEND_GROQ = "groq"
+BACKEND_LOCAL = "local"
+BACKENDS = (BACKEND_GROQ, BACKEND_LOCAL)
+
+def is_retryable(status_code: Optional[int]) -> bool:
+    """Whether a failed upload is worth repeating: no response at all, rate limited or a server error."""
+    return status_code is None or status_code == 429 or status_code >= 500
+
+def stitch_transcripts(chunks: List[PreparedAudio], results: List[Dict]) -> Dict:
+    """Join per-chunk Whisper results into one, with segment times relative to the whole recording."""
+    segments = []
+    for chunk, result in zip(chunks, results):
+        if result.get('segments'):
+            for segment in result['segments']:
+                segments.append(dict(segment, start=segment['start'] + chunk.offset,
+                                     end=segment['end'] + chunk.offset))
+        elif result.get('text', '').strip():
+            segments.append({'start': chunk.offset, 'end': chunk.offset + (chunk.duration or 0.0),
+                             'text': result['text'].strip()})
+    text = ' '.join(segment['text'].strip() for segment in segments if segment['text'].strip())
+    stitched = {'text': text, 'segments': segments}
+    language = next((result['language'] for result in results if result.get('language')), None)
+    if language:
+        stitched['language'] = language
+    return stitched
+
 class SpeechService:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client: Optional[GroqHttpClient] = None,
+                 codec: Optional[str] = 'flac', chunk_seconds: Optional[float] = 60,
+                 max_workers: int = 4, chunk_retries: int = 2, retry_delay: float = 1.0,
+                 backend: str = BACKEND_GROQ, local_backend: Optional[LocalWhisperBackend] = None,
+                 max_duration: Optional[float] = MAX_DURATION):
+        if codec is not None and codec not in CODECS:
+            raise ValueError(f"Unsupported codec {codec!r}, expected one of {', '.join(CODECS)}")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+        if backend == BACKEND_LOCAL and local_backend is None:
+            raise ValueError("The local backend needs a local_backend")
+        # Default backend; callers can pick another per request
+        self.backend = backend
+        self.local_backend = local_backend
         self.api_key = api_key
+        self.http = http_client or get_http_client()
+        # Recordings are normalized and re-encoded with this codec before upload; None sends them as is
+        self.codec = codec
+        # Longer recordings are split at pauses and the chunks transcribed concurrently
+        self.chunk_seconds = chunk_seconds
+        # Longer recordings are refused rather than decoded into memory
+        self.max_duration = max_duration
+        self.max_workers = max_workers
+        self.chunk_retries = chunk_retries
+        self.retry_delay = retry_delay
         self.base_url = "https://api.groq.com/openai/v1/audio"
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "multipart/form-data"  # Changed for file upload
         }
 
-    def transcribe_audio(self, audio_data: bytes, source_lang: str = "auto") -> Dict:
+    @property
+    def backends(self) -> tuple:
+        """Backends callers may pick; local only when a model has been configured."""
+        return BACKENDS if self.local_backend is not None else (BACKEND_GROQ,)
+
+    def _transcription_fields(self, source_lang: str) -> Dict:
+        return {
+            'model': 'whisper-large-v3',  # Using Whisper Large v3 model
+            'language': source_lang if source_lang != "auto" else None,
+            'response_format': 'json'
+        }
+
+    def _translation_fields(self) -> Dict:
+        return {
+            'model': 'whisper-large-v3',  # Using Whisper Large v3 model
+            'response_format': 'json'
+        }
+
+    def _prepare(self, audio: Audio) -> List[PreparedAudio]:
+        """The file(s) to upload, with filename, content type and offset in the recording."""
+        stream = as_stream(audio)
+        if self.codec:
+            try:
+                return prepare_for_transcription(stream, self.codec, self.chunk_seconds, self.max_duration)
+            except AudioTooLong:
+                raise
+            except Exception as e:
+                logger.warning(f"Audio preprocessing failed, uploading as recorded: {str(e)}")
+        stream.seek(0)
+        return [PreparedAudio(stream, 'audio.wav', 'audio/wav')]
+
+    def _post_file(self, endpoint: str, prepared: PreparedAudio, fields: Dict) -> Dict:
+        body = MultipartStream(fields, 'file', prepared.stream, prepared.filename, prepared.content_type)
+        response = self.http.post(
+            f"{self.base_url}/{endpoint}",
+            headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": body.content_type},
+            data=body
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _post_with_retries(self, endpoint: str, prepared: PreparedAudio, fields: Dict) -> Dict:
+        for attempt in range(self.chunk_retries + 1):
+            try:
+                return self._post_file(endpoint, prepared, fields)
+            except requests.RequestException as e:
+                status = e.response.status_code if e.response is not None else None
+                if attempt == self.chunk_retries or not is_retryable(status):
+                    raise
+                delay = self.retry_delay * (2 ** attempt)
+                logger.warning(f"Audio chunk at {prepared.offset:.1f}s failed ({str(e)}), retrying in {delay}s")
+                time.sleep(delay)
+
+    def _post_audio(self, endpoint: str, audio: Audio, fields: Dict) -> Dict:
+        """POST the audio as multipart uploads streamed from ``audio`` (bytes or a binary file).
+
+        Chunks of a long recording are sent concurrently and retried on their
+        own, then stitched back together in order; a single chunk goes through
+        the same stitching so segment times always include its offset. Once a
+        chunk fails for good, chunks not yet sent are dropped.
+        """
+        chunks = self._prepare(audio)
+        if len(chunks) == 1:
+            return stitch_transcripts(chunks, [self._post_with_retries(endpoint, chunks[0], fields)])
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks)), thread_name_prefix="transcribe")
+        try:
+            futures = [pool.submit(self._post_with_retries, endpoint, chunk, fields) for chunk in chunks]
+            results = [future.result() for future in futures]
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return stitch_transcripts(chunks, results)
+
+    def _use_local(self, backend: Optional[str]) -> bool:
+        backend = backend or self.backend
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+        if backend == BACKEND_LOCAL and self.local_backend is None:
+            raise RuntimeError("Local Whisper backend is not configured")
+        return backend == BACKEND_LOCAL
+
+    def _run_local(self, audio: Audio, source_lang: str, task: str) -> Dict:
+        """Run the in-process model; it batches this clip with others queued at the same time."""
+        samples, offset = load_speech(as_stream(audio), self.max_duration)
+        language = None if source_lang == "auto" else source_lang.split('-')[0]
+        result = self.local_backend.transcribe(samples, language, task)
+        result['segments'] = [dict(s, start=s['start'] + offset, end=s['end'] + offset)
+                              for s in result['segments']]
+        return result
+
+    def transcribe_audio(self, audio_data: Audio, source_lang: str = "auto",
+                         backend: Optional[str] = None) -> Dict:
         """Transcribe audio using Whisper model."""
         try:
-            # Prepare the files and data
-            files = {
-                'file': ('audio.wav', audio_data, 'audio/wav')
-            }
-            data = {
-                'model': 'whisper-large-v3',  # Using Whisper Large v3 model
-                'language': source_lang if source_lang != "auto" else None,
-                'response_format': 'json'
-            }
-            
-            # Send request to the correct endpoint
-            response = requests.post(
-                f"{self.base_url}/transcriptions",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                files=files,
-                data=data
-            )
-            response.raise_for_status()
-            return response.json()
+            if self._use_local(backend):
+                return self._run_local(audio_data, source_lang, 'transcribe')
+            return self._post_audio("transcriptions", audio_data, self._transcription_fields(source_lang))
 
         except Exception as e:
             logger.error(f"Transcription error: {str(e)}")
             raise
 
-    def translate_audio(self, audio_data: bytes) -> Dict:
+    def translate_audio(self, audio_data: Audio, backend: Optional[str] = None) -> Dict:
         """Translate audio directly to English text using Whisper."""
         try:
-            # Prepare the files and data
-            files = {
-                'file': ('audio.wav', audio_data, 'audio/wav')
-            }
-            data = {
-                'model': 'whisper-large-v3',  # Using Whisper Large v3 model
-                'response_format': 'json'
-            }
-            
+            if self._use_local(backend):
+                return self._run_local(audio_data, "auto", 'translate')
             # Use the translations endpoint for direct audio translation
-            response = requests.post(
-                f"{self.base_url}/translations",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                files=files,
-                data=data
-            )
-            response.raise_for_status()
-            return response.json()
+            return self._post_audio("translations", audio_data, self._translation_fields())
 
         except Exception as e:
             logger.error(f"Audio translation error: {str(e)}")
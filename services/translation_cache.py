@@ -0,0 +1,116 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Optional
+
+from .cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'translations.sqlite3')
+
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different inputs share a cache entry."""
+    text = unicodedata.normalize('NFC', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+class TranslationCache:
+    """Two-tier translation cache: an in-process LRU backed by a SQLite file.
+
+    The SQLite tier runs in WAL mode so several gunicorn workers can share
+    one file and entries survive restarts.
+    """
+
+    def __init__(self, db_path: Optional[str] = DEFAULT_CACHE_PATH, max_entries: int = 2048,
+                 memory_ttl: float = 3600, disk_ttl: float = 7 * 24 * 3600):
+        self.db_path = db_path
+        self.disk_ttl = disk_ttl
+        self.memory = LRUCache(max_entries=max_entries, ttl=memory_ttl)
+        self._local = threading.local()
+
+        if self.db_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+                conn = self._connection()
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Translation cache disk tier disabled: {str(e)}")
+                self.db_path = None
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(text: str, source_lang: str, target_lang: str, prompt_version: str) -> str:
+        raw = "\x1f".join([prompt_version, source_lang, target_lang, normalize_text(text)])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        value = self.memory.get(key)
+        if value is None and self.db_path:
+            value = self._get_from_disk(key)
+            if value is not None:
+                self.memory.set(key, value)
+
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, data: Dict) -> None:
+        value = json.dumps(data, ensure_ascii=False)
+        self.memory.set(key, value)
+        if self.db_path:
+            try:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO translations (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, value, time.time())
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to write translation cache entry: {str(e)}")
+
+    def _get_from_disk(self, key: str) -> Optional[str]:
+        try:
+            row = self._connection().execute(
+                "SELECT value, created_at FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read translation cache entry: {str(e)}")
+            return None
+
+        if row is None:
+            return None
+        value, created_at = row
+        if self.disk_ttl is not None and created_at + self.disk_ttl <= time.time():
+            return None
+        return value
+
+    def purge_expired(self) -> int:
+        """Delete expired rows from the disk tier, returning how many were removed."""
+        if not self.db_path or self.disk_ttl is None:
+            return 0
+        conn = self._connection()
+        cursor = conn.execute(
+            "DELETE FROM translations WHERE created_at <= ?", (time.time() - self.disk_ttl,)
+        )
+        conn.commit()
+        return cursor.rowcount
@@ -3,12 +3,27 @@ import requests
 import logging
 import time
 import base64
-from typing import Dict
+from typing import Dict, Optional
 from langdetect import detect, LangDetectException
+from .audio_blob_store import AudioBlobStore
+from .audio_upload import Audio, as_stream
 from .speech_service import SpeechService
+from .http_client import GroqHttpClient, get_http_client
+from .translation_cache import TranslationCache
+from .single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the translation prompt changes so cached results are not reused
+TRANSLATION_PROMPT_VERSION = "1"
+
+# How a voice translation returns the caller's recording: base64 in the JSON,
+# a short-lived URL from the audio blob store, or not at all
+AUDIO_INLINE = "inline"
+AUDIO_URL = "url"
+AUDIO_NONE = "none"
+AUDIO_MODES = (AUDIO_INLINE, AUDIO_URL, AUDIO_NONE)
+
 LANGUAGES = {
     "English": "en",
     "Spanish": "es",
@@ -53,8 +68,16 @@ LANGUAGES = {
 }
 
 class GroqTranslator:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache: Optional[TranslationCache] = None,
+                 http_client: Optional[GroqHttpClient] = None,
+                 audio_store: Optional[AudioBlobStore] = None,
+                 speech_service: Optional[SpeechService] = None):
         self.api_key = api_key
+        self.http = http_client or get_http_client()
+        self.cache = cache
+        self.audio_store = audio_store
+        self.speech_service = speech_service
+        self.inflight = SingleFlight()
         self.base_url = "https://api.groq.com/openai/v1/chat/completions"
         self.headers = {
             "Authorization": f"Bearer {api_key}",
@@ -63,8 +86,6 @@ class GroqTranslator:
         self.languages = LANGUAGES
         self.retry_delay = 1  # Initial delay in seconds
         self.max_retries = 3
-        self.last_request_time = 0
-        self.min_request_interval = 1  # Minimum time between requests in seconds
 
     def _handle_rate_limit(self, retry_count: int) -> None:
         """Handle rate limiting with exponential backoff."""
@@ -75,14 +96,6 @@ class GroqTranslator:
         logger.warning(f"Rate limited, waiting {delay} seconds before retry")
         time.sleep(delay)
 
-    def _respect_rate_limit(self) -> None:
-        """Ensure minimum time between requests."""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        if time_since_last_request < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last_request)
-        self.last_request_time = time.time()
-        
     def detect_language(self, text: str) -> str:
         """Detect the language of the input text."""
         try:
@@ -97,16 +110,22 @@ class GroqTranslator:
             return "en"
 
     def translate_with_context(self, text: str, source_lang: str, target_lang: str) -> Dict:
-        retry_count = 0
-        while retry_count < self.max_retries:
-            try:
-                self._respect_rate_limit()
+        if source_lang == "auto":
+            source_lang = self.detect_language(text)
+            logger.info(f"Detected language: {source_lang}")
 
-                if source_lang == "auto":
-                    source_lang = self.detect_language(text)
-                    logger.info(f"Detected language: {source_lang}")
+        cache_key = TranslationCache.make_key(text, source_lang, target_lang, TRANSLATION_PROMPT_VERSION)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Translation cache hit for {source_lang}->{target_lang}")
+                return cached
 
-                prompt = f"""You are an expert language tutor providing comprehensive translation assistance.
+        # Identical concurrent requests share a single upstream call
+        return self.inflight.do(cache_key, self._translate_uncached, text, source_lang, target_lang, cache_key)
+
+    def _build_prompt(self, text: str, source_lang: str, target_lang: str) -> str:
+        return f"""You are an expert language tutor providing comprehensive translation assistance.
                 Please translate the following text and provide detailed learning context.
                 
                 Text to translate: "{text}"
@@ -171,17 +190,85 @@ class GroqTranslator:
                     "related_topics": ["<related grammar topic 1>", "<related grammar topic 2>"]
                 }}"""
 
-                response = requests.post(
+    def _build_payload(self, text: str, source_lang: str, target_lang: str) -> Dict:
+        return {
+            "model": "llama-3.3-70b-versatile",
+            "messages": [{"role": "user", "content": self._build_prompt(text, source_lang, target_lang)}],
+            "temperature": 0.3,
+            "max_tokens": 2000,
+            "response_format": { "type": "json_object" }
+        }
+
+    def _fallback_translation(self, text: str) -> Dict:
+        """Response used when the model output cannot be parsed."""
+        return {
+            "translation": text,  # Return original text as fallback
+            "literal": "Translation parsing failed",
+            "cultural_context": "Not available",
+            "grammar": "Not available",
+            "examples": [],
+            "idioms": [],
+            "conversation": "I apologize, but I couldn't process the translation properly."
+        }
+
+    def _parse_translation(self, result: Dict) -> Optional[Dict]:
+        """Extract the translation JSON from a completion; None if it does not parse."""
+        if 'choices' not in result or not result['choices']:
+            raise Exception("Invalid API response format")
+            
+        content = result['choices'][0]['message']['content']
+        logger.debug(f"Raw API response content: {content}")
+        
+        # Clean up the content string if needed
+        content = content.strip()
+        if not content.startswith('{'):
+            content = content[content.find('{'):]
+        if not content.endswith('}'):
+            content = content[:content.rfind('}')+1]
+        
+        try:
+            translation_data = json.loads(content)
+        except json.JSONDecodeError as e:
+            logger.error(f"JSON Parse Error: {str(e)}, Content: {content}")
+            return None
+        
+        # Validate required fields
+        required_fields = ["translation", "literal", "cultural_context", "grammar", "examples", "idioms", "conversation"]
+        for field in required_fields:
+            if field not in translation_data:
+                translation_data[field] = "Not provided" if field not in ["examples", "idioms"] else []
+
+        # Add default values for new fields if missing
+        additional_fields = [
+            "practice_tips", "pronunciation", "vocabulary",
+            "learning_level", "related_topics"
+        ]
+        
+        for field in additional_fields:
+            if field not in translation_data:
+                if field in ["practice_tips", "related_topics"]:
+                    translation_data[field] = []
+                elif field == "pronunciation":
+                    translation_data[field] = {
+                        "ipa": "Not provided",
+                        "tips": [],
+                        "common_challenges": "Not provided"
+                    }
+                elif field == "vocabulary":
+                    translation_data[field] = []
+                else:
+                    translation_data[field] = "Not provided"
+
+        return translation_data
+
+    def _translate_uncached(self, text: str, source_lang: str, target_lang: str, cache_key: Optional[str] = None) -> Dict:
+        retry_count = 0
+        while retry_count < self.max_retries:
+            try:
+                response = self.http.post(
                     self.base_url,
                     headers=self.headers,
-                    json={
-                        "model": "llama-3.3-70b-versatile",
-                        "messages": [{"role": "user", "content": prompt}],
-                        "temperature": 0.3,
-                        "max_tokens": 2000,
-                        "response_format": { "type": "json_object" }
-                    },
-                    timeout=30
+                    json=self._build_payload(text, source_lang, target_lang)
                 )
                 
                 if response.status_code == 429:  # Too Many Requests
@@ -190,62 +277,13 @@ class GroqTranslator:
                     continue
                 
                 response.raise_for_status()
-                result = response.json()
-                
-                if 'choices' not in result or not result['choices']:
-                    raise Exception("Invalid API response format")
-                    
-                content = result['choices'][0]['message']['content']
-                logger.debug(f"Raw API response content: {content}")
-                
-                # Clean up the content string if needed
-                content = content.strip()
-                if not content.startswith('{'):
-                    content = content[content.find('{'):]
-                if not content.endswith('}'):
-                    content = content[:content.rfind('}')+1]
-                
-                try:
-                    translation_data = json.loads(content)
-                except json.JSONDecodeError as e:
-                    logger.error(f"JSON Parse Error: {str(e)}, Content: {content}")
+                translation_data = self._parse_translation(response.json())
+                if translation_data is None:
                     # Provide a fallback response if parsing fails
-                    return {
-                        "translation": text,  # Return original text as fallback
-                        "literal": "Translation parsing failed",
-                        "cultural_context": "Not available",
-                        "grammar": "Not available",
-                        "examples": [],
-                        "idioms": [],
-                        "conversation": "I apologize, but I couldn't process the translation properly."
-                    }
-                
-                # Validate required fields
-                required_fields = ["translation", "literal", "cultural_context", "grammar", "examples", "idioms", "conversation"]
-                for field in required_fields:
-                    if field not in translation_data:
-                        translation_data[field] = "Not provided" if field not in ["examples", "idioms"] else []
+                    return self._fallback_translation(text)
 
-                # Add default values for new fields if missing
-                additional_fields = [
-                    "practice_tips", "pronunciation", "vocabulary",
-                    "learning_level", "related_topics"
-                ]
-                
-                for field in additional_fields:
-                    if field not in translation_data:
-                        if field in ["practice_tips", "related_topics"]:
-                            translation_data[field] = []
-                        elif field == "pronunciation":
-                            translation_data[field] = {
-                                "ipa": "Not provided",
-                                "tips": [],
-                                "common_challenges": "Not provided"
-                            }
-                        elif field == "vocabulary":
-                            translation_data[field] = []
-                        else:
-                            translation_data[field] = "Not provided"
+                if self.cache is not None and cache_key is not None:
+                    self.cache.set(cache_key, translation_data)
 
                 return translation_data
 
@@ -262,13 +300,15 @@ class GroqTranslator:
 
         raise Exception("Translation failed after maximum retries")
 
-    def translate_voice(self, audio_data: bytes, source_lang: str, target_lang: str) -> Dict:
+    def translate_voice(self, audio_data: Audio, source_lang: str, target_lang: str,
+                        audio_mode: str = AUDIO_INLINE, audio_type: str = "audio/wav",
+                        backend: Optional[str] = None) -> Dict:
         """Translate voice input to voice output with proper error handling."""
         try:
-            speech_service = SpeechService(self.api_key)
+            speech_service = self.speech_service or SpeechService(self.api_key, http_client=self.http)
             
             # First transcribe the audio
-            transcription = speech_service.transcribe_audio(audio_data, source_lang)
+            transcription = speech_service.transcribe_audio(audio_data, source_lang, backend=backend)
             if not transcription or 'text' not in transcription:
                 raise ValueError("Failed to transcribe audio")
 
@@ -279,21 +319,47 @@ class GroqTranslator:
                 target_lang
             )
 
-            # Ensure valid base64 encoding for audio response
-            try:
-                import base64
-                audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-            except Exception as e:
-                logger.error(f"Audio encoding error: {str(e)}")
-                audio_base64 = ""
-
-            return {
-                'translation': translation['translation'],
-                'translationDetails': translation,
-                'audio': audio_base64,
-                'original_text': transcription['text']
-            }
+            return self._build_voice_result(audio_data, transcription, translation, audio_mode, audio_type)
 
         except Exception as e:
             logger.error(f"Voice translation error: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    def _build_voice_result(self, audio_data: Audio, transcription: Dict, translation: Dict,
+                            audio_mode: str = AUDIO_INLINE, audio_type: str = "audio/wav") -> Dict:
+        result = {
+            'translation': translation['translation'],
+            'translationDetails': translation,
+            'original_text': transcription['text']
+        }
+        if audio_mode == AUDIO_NONE:
+            return result
+        if audio_mode == AUDIO_URL and self.audio_store is None:
+            logger.warning("No audio store configured, omitting audio from voice result")
+            return result
+
+        try:
+            stream = as_stream(audio_data)
+            stream.seek(0)
+            audio_bytes = stream.read()
+        except Exception as e:
+            logger.error(f"Audio read error: {str(e)}")
+            audio_bytes = b""
+
+        if audio_mode == AUDIO_URL:
+            blob_id = self.audio_store.put(audio_bytes, audio_type)
+            if blob_id is None:
+                # Too large or the store is unavailable: a URL that never resolves helps nobody
+                logger.warning("Could not store voice audio, omitting audioUrl")
+                return result
+            result['audioUrl'] = self.audio_store.url(blob_id)
+            result['audioExpiresIn'] = self.audio_store.ttl
+            return result
+
+        # Ensure valid base64 encoding for audio response
+        try:
+            result['audio'] = base64.b64encode(audio_bytes).decode('utf-8')
+        except Exception as e:
+            logger.error(f"Audio encoding error: {str(e)}")
+            result['audio'] = ""
+        return result
\ No newline at end of file
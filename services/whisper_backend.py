@@ -0,0 +1,164 @@
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from .audio_preprocess import TARGET_RATE, split_on_pauses
+
+logger = logging.getLogger(__name__)
+
+# Whisper encodes fixed 30 s windows; shorter clips are padded into one and can share a forward pass
+WINDOW_SECONDS = 30
+WINDOW_SAMPLES = WINDOW_SECONDS * TARGET_RATE
+
+class _Job(NamedTuple):
+    samples: np.ndarray
+    language: Optional[str]
+    task: str
+    future: Future
+
+class LocalWhisperBackend:
+    """openai-whisper running in this process, shared by every request.
+
+    The model is loaded on first use. Recordings longer than one 30 s window
+    are split at pauses, so every queued clip fits a single window and the
+    worker never spends minutes on one request. Clips queued within
+    ``batch_window`` seconds of each other with the same language and task go
+    through the encoder and decoder as one batch. At most ``max_queue`` clips
+    wait at a time; beyond that, new requests are refused.
+    """
+
+    def __init__(self, model_name: str = 'base', device: str = 'cpu',
+                 max_batch: int = 8, batch_window: float = 0.05,
+                 max_queue: int = 64, timeout: float = 120):
+        self.model_name = model_name
+        self.device = device
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._model = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def _load_model(self):
+        if self._model is None:
+            import whisper
+            logger.info(f"Loading local Whisper model {self.model_name} on {self.device}")
+            self._model = whisper.load_model(self.model_name, device=self.device)
+        return self._model
+
+    def _enqueue(self, clips: List[np.ndarray], language: Optional[str], task: str) -> List[Future]:
+        """Queue all of ``clips`` or, if they do not fit, none of them."""
+        jobs = [_Job(clip, language, task, Future()) for clip in clips]
+        with self._lock:
+            if self._queue.qsize() + len(jobs) > self.max_queue:
+                raise RuntimeError("Local Whisper queue is full")
+            for job in jobs:
+                self._queue.put_nowait(job)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="local-whisper", daemon=True)
+                self._worker.start()
+        return [job.future for job in jobs]
+
+    def transcribe(self, samples: np.ndarray, language: Optional[str] = None,
+                   task: str = 'transcribe', timeout: Optional[float] = None) -> Dict:
+        """Transcribe 16 kHz mono float32 samples into ``text``, ``language`` and ``segments``.
+
+        Raises ``TimeoutError`` if the result is not ready within ``timeout``
+        seconds (``self.timeout`` by default); clips not yet decoded are dropped.
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        ranges = [(0, len(samples))]
+        if len(samples) > WINDOW_SAMPLES:
+            ranges = split_on_pauses(samples, TARGET_RATE, WINDOW_SECONDS)
+        futures = self._enqueue([samples[start:end] for start, end in ranges], language, task)
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        try:
+            results = [future.result(timeout=max(0.0, deadline - time.monotonic())) for future in futures]
+        except FutureTimeout:
+            raise TimeoutError("Local Whisper transcription timed out") from None
+        finally:
+            # No-op for finished clips; the worker skips cancelled ones
+            for future in futures:
+                future.cancel()
+
+        segments = []
+        for (start, _), result in zip(ranges, results):
+            offset = start / TARGET_RATE
+            segments.extend(dict(s, start=s['start'] + offset, end=s['end'] + offset) for s in result['segments'])
+        return {
+            'text': ' '.join(s['text'] for s in segments),
+            'language': results[0]['language'],
+            'segments': segments,
+        }
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._process(batch)
+
+    def _process(self, batch: List[_Job]) -> None:
+        batch = [job for job in batch if job.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            model = self._load_model()
+        except Exception as e:
+            logger.error(f"Failed to load local Whisper model: {str(e)}")
+            for job in batch:
+                job.future.set_exception(e)
+            return
+
+        groups = defaultdict(list)
+        for job in batch:
+            groups[(job.language, job.task)].append(job)
+        for (language, task), jobs in groups.items():
+            self._run_batch(model, jobs, language, task)
+
+    def _run_batch(self, model, jobs: List[_Job], language: Optional[str], task: str) -> None:
+        try:
+            import torch
+            import whisper
+            mels = torch.stack([
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(job.samples), n_mels=model.dims.n_mels)
+                for job in jobs
+            ]).to(model.device)
+            options = whisper.DecodingOptions(language=language, task=task, fp16=False, without_timestamps=True)
+            with torch.no_grad():
+                results = whisper.decode(model, mels, options)
+            for job, result in zip(jobs, results):
+                text = result.text.strip()
+                # Decoded without timestamps, so each clip is a single segment
+                segments = [{'start': 0.0, 'end': len(job.samples) / TARGET_RATE, 'text': text}] if text else []
+                job.future.set_result({'text': text, 'language': result.language, 'segments': segments})
+        except Exception as e:
+            logger.error(f"Local Whisper batch of {len(jobs)} failed: {str(e)}")
+            for job in jobs:
+                job.future.set_exception(e)
+
+_backends: Dict[tuple, LocalWhisperBackend] = {}
+_backends_lock = threading.Lock()
+
+def get_local_whisper(model_name: str = 'base', device: str = 'cpu', **kwargs) -> LocalWhisperBackend:
+    """Return the process-wide backend for ``model_name`` on ``device``, so the model is loaded once."""
+    with _backends_lock:
+        backend = _backends.get((model_name, device))
+        if backend is None:
+            backend = _backends[(model_name, device)] = LocalWhisperBackend(model_name, device, **kwargs)
+        return backend
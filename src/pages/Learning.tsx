@@ -1,4 +1,4 @@
-import { useState } from "react";
+import { useRef, useState } from "react";
 import { motion } from "framer-motion";
 import { Play, Loader, GraduationCap, Volume2 } from "lucide-react";
 import { speakText, LANGUAGE_TO_SPEECH_CODE } from "../utils/speech";
@@ -9,6 +9,14 @@ import { FloatingParticles } from "../components/ui/FloatingParticles";
 
 const API_URL = import.meta.env.VITE_API_URL || "http://localhost:5000";
 
+// Per-caption timing as returned by /api/youtube/captions; offsets index into text
+type CaptionTiming = {
+  text: string;
+  starts: number[];
+  durations: number[];
+  offsets: number[];
+};
+
 export function Learning() {
   const [selectedLanguage, setSelectedLanguage] = useState<string>("Spanish");
   const [currentLesson, setCurrentLesson] = useState<Lesson | null>(null);
@@ -20,8 +28,9 @@ export function Learning() {
   const [captions, setCaptions] = useState<string>("");
   const [summary, setSummary] = useState<string>("");
   const [courseTimestamps, setCourseTimestamps] = useState<
-    Array<{ time: string; topic: string }>
+    Array<{ time: string; topic: string; seconds?: number }>
   >([]);
+  const captionTiming = useRef<CaptionTiming | null>(null);
   const [courseSummary, setCourseSummary] = useState<{
     mainPoints: string[];
     keyVocabulary: Array<{ word: string; meaning: string }>;
@@ -93,6 +102,7 @@ export function Learning() {
   const fetchCaptions = async (videoId: string): Promise<string> => {
     try {
       setIsLoading(true);
+      captionTiming.current = null;
       const response = await fetch(
         `${API_URL}/api/youtube/captions?videoId=${videoId}&language=${selectedLanguage.toLowerCase()}`
       );
@@ -115,6 +125,9 @@ export function Learning() {
         selectedLanguage.toUpperCase();
       const originalText = data.captions.original || "";
       const translatedText = data.captions.translated || "";
+      if (data.timing) {
+        captionTiming.current = { ...data.timing, text: originalText };
+      }
 
       // Return single language version
       return `${translatedLang}:\n${translatedText || originalText}`;
@@ -152,16 +165,13 @@ export function Learning() {
     }
   };
 
-  const generateCourseSummary = async (captions: string) => {
+  const generateCourseSummary = async (captions: string, videoId?: string) => {
     try {
       setError("");
       setIsLoading(true);
 
-      // Clean and prepare captions
-      const cleanedCaptions = captions
-        .replace(/\n{3,}/g, "\n\n")
-        .trim()
-        .substring(0, 8000);
+      // Clean and prepare captions; long transcripts are chunked server-side
+      const cleanedCaptions = captions.replace(/\n{3,}/g, "\n\n").trim();
 
       const response = await fetch(`${API_URL}/api/learning/course-summary`, {
         method: "POST",
@@ -171,6 +181,8 @@ export function Learning() {
         body: JSON.stringify({
           captions: cleanedCaptions,
           language: selectedLanguage.toLowerCase(),
+          timing: captionTiming.current,
+          videoId,
         }),
       });
 
@@ -358,7 +370,7 @@ export function Learning() {
               const captions = await fetchCaptions(videoId);
               if (!captions.includes("Captions not available")) {
                 setCaptions(captions);
-                await generateCourseSummary(captions);
+                await generateCourseSummary(captions, videoId);
               }
             }}
             className="px-4 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700 transition-colors"
@@ -383,7 +395,7 @@ export function Learning() {
             </div>
             {!isLoading && !courseSummary && (
               <button
-                onClick={() => generateCourseSummary(captions)}
+                onClick={() => generateCourseSummary(captions, videoId)}
                 className="px-4 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700 transition-colors"
               >
                 Generate Course Summary
@@ -120,6 +120,8 @@ function VoiceTranslation() {
       formData.append("audio", audioBlob, "recording.wav");
       formData.append("sourceLang", sourceLang);
       formData.append("targetLang", targetLang);
+      // The response would only echo the recording back; play it from here instead
+      formData.append("audioMode", "none");
 
       const response = await fetch(`${API_URL}/api/translate/voice`, {
         method: "POST",
@@ -129,35 +131,17 @@ function VoiceTranslation() {
       const data = await response.json();
       if (!response.ok) throw new Error(data.error || "Translation failed");
 
-      // Handle the audio data safely
-      if (data.audio && typeof data.audio === "string") {
-        try {
-          // Remove potential data URL prefix if present
-          const base64Data = data.audio.replace(
-            /^data:audio\/(mp3|wav);base64,/,
-            ""
-          );
-
-          // Decode base64 to binary
-          const binaryString = window.atob(base64Data);
-          const audioArray = new Uint8Array(binaryString.length);
-
-          for (let i = 0; i < binaryString.length; i++) {
-            audioArray[i] = binaryString.charCodeAt(i);
-          }
-
-          // Create audio buffer
-          const buffer = await audioContext.decodeAudioData(audioArray.buffer);
-          setAudioBuffer(buffer);
-
-          // Store audio URL for backup playback method
-          setTranslatedAudio(`data:audio/mp3;base64,${base64Data}`);
-        } catch (audioError) {
-          console.error("Audio processing error:", audioError);
-          throw new Error("Failed to process audio data");
-        }
-      } else {
-        throw new Error("Invalid audio data received");
+      try {
+        const buffer = await audioContext.decodeAudioData(
+          await audioBlob.arrayBuffer()
+        );
+        setAudioBuffer(buffer);
+
+        // Store audio URL for backup playback method
+        setTranslatedAudio(URL.createObjectURL(audioBlob));
+      } catch (audioError) {
+        console.error("Audio processing error:", audioError);
+        throw new Error("Failed to process audio data");
       }
 
       // Set translation details if available
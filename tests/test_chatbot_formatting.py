@@ -0,0 +1,30 @@
+"""Streamed formatting puts headings where format_markdown does."""
+import pytest
+
+from services.chatbot_service import SECTION_HEADINGS, StreamingFormatter, format_markdown
+
+def stream(text: str, chunk_size: int) -> str:
+    formatter = StreamingFormatter()
+    out = ''.join(formatter.feed(text[i:i + chunk_size]) for i in range(0, len(text), chunk_size))
+    return out + formatter.flush()
+
+def squash(text: str) -> str:
+    # The final formatter also adds blank lines after each section; compare everything else
+    return ''.join(text.split())
+
+@pytest.mark.parametrize('reply', [
+    'Example: foo',
+    'Example:foo',
+    'Here is one.\nExample: hola (hello)\nTip:practice daily',
+    'Example:\nTip:listen more',
+    'Example:\nhola',
+    'Grammar:ser vs estar Example:soy\n- Vocabulary: casa\nPractice:',
+    '  - uno\n- dos\nTranslation:',
+])
+@pytest.mark.parametrize('chunk_size', [1, 3, 1000])
+def test_stream_matches_format_markdown(reply, chunk_size):
+    assert squash(stream(reply, chunk_size)) == squash(format_markdown(reply))
+
+def test_marker_followed_by_space_is_left_alone():
+    assert stream('Example: foo', 2) == 'Example: foo'
+    assert stream('Example:foo', 2) == f"{SECTION_HEADINGS['Example']}\nfoo"
@@ -0,0 +1,30 @@
+"""Rate-limited POSTs wait at most the read timeout."""
+import time
+
+import pytest
+
+from services.http_client import GroqHttpClient
+from services.rate_limiter import RateLimitExceeded, TokenBucketRateLimiter
+
+URL = 'https://api.invalid/openai/v1/chat/completions'
+
+@pytest.fixture
+def client():
+    limiter = TokenBucketRateLimiter(requests_per_minute=1, state_path=None)
+    limiter.acquire()
+    client = GroqHttpClient(rate_limiter=limiter, timeouts={'/chat/completions': 0.5})
+    yield client
+    client.close()
+
+def test_exhausted_quota_answers_429_without_blocking(client):
+    start = time.monotonic()
+    response = client.post(URL, json={'messages': [{'role': 'user', 'content': 'hola'}]})
+
+    assert time.monotonic() - start < 0.5
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+    assert response.json()['error']['type'] == 'rate_limit_exceeded'
+
+def test_fail_fast_still_raises(client):
+    with pytest.raises(RateLimitExceeded):
+        client.post(URL, rate_limit_wait=False)
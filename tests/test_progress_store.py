@@ -0,0 +1,43 @@
+"""Progress store: completions counted once and the disabled fallback."""
+import pytest
+
+from services.progress_store import ProgressStore
+
+@pytest.fixture
+def store(tmp_path):
+    store = ProgressStore(str(tmp_path / 'progress.sqlite3'), flush_interval=60)
+    yield store
+    store.close()
+
+def test_repeated_completion_awards_points_once(store):
+    store.record_completion('u1', 'es', 'greetings', points=10)
+    store.record_completion('u1', 'es', 'greetings', points=10)
+    store.flush()
+
+    summary = store.summary('u1')
+    assert summary['points'] == 10
+    assert summary['lessons_completed'] == 1
+    assert summary['best_day'] == 1
+    # Both clicks stay in the log
+    assert len(store.history('u1')) == 2
+
+def test_points_events_still_add_up(store):
+    store.record_completion('u1', 'es', 'greetings', points=10)
+    store.record_points('u1', 5)
+    store.record_points('u1', 5)
+    store.flush()
+
+    assert store.summary('u1')['points'] == 20
+
+def test_unwritable_path_disables_store(tmp_path):
+    blocker = tmp_path / 'not-a-dir'
+    blocker.write_text('')
+    store = ProgressStore(str(blocker / 'progress.sqlite3'))
+
+    store.record_completion('u1', 'es', 'greetings', points=10)
+    assert store.flush() == 0
+    assert store.summary('u1')['points'] == 0
+    assert store.completed_lessons('u1') == []
+    assert store.history('u1') == []
+    assert not any(achievement['completed'] for achievement in store.achievements('u1'))
+    store.close()
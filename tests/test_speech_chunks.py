@@ -0,0 +1,148 @@
+"""Chunked transcription: pause-aligned splitting, stitching and per-chunk retries."""
+import io
+import time
+
+import numpy as np
+import pytest
+import requests
+
+from services.audio_preprocess import FRAME_SECONDS, TARGET_RATE, PreparedAudio, split_on_pauses
+from services.speech_service import SpeechService, is_retryable, stitch_transcripts
+
+def synthetic_recording(seconds: float, seed: int = 0):
+    """Noise bursts of 3-8 s ("phrases") separated by 0.4 s silences, and the pause intervals in samples."""
+    rng = np.random.default_rng(seed)
+    total = int(seconds * TARGET_RATE)
+    samples = np.zeros(total, dtype=np.float32)
+    pauses = []
+    cursor = 0
+    while cursor < total:
+        phrase = int(rng.uniform(3, 8) * TARGET_RATE)
+        samples[cursor:cursor + phrase] = rng.normal(0, 0.1, min(phrase, total - cursor))
+        cursor += phrase
+        pause = int(0.4 * TARGET_RATE)
+        pauses.append((cursor, min(cursor + pause, total)))
+        cursor += pause
+    return samples, pauses
+
+def chunk(offset: float, duration: float) -> PreparedAudio:
+    return PreparedAudio(io.BytesIO(), 'audio.flac', 'audio/flac', duration, offset)
+
+def http_error(status: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} error", response=response)
+
+def test_split_nine_minute_recording_at_pauses():
+    samples, pauses = synthetic_recording(9 * 60)
+    ranges = split_on_pauses(samples, TARGET_RATE, max_seconds=60)
+
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(samples)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+    frame = int(TARGET_RATE * FRAME_SECONDS)
+    for start, end in ranges:
+        assert end - start <= 60 * TARGET_RATE + frame
+    for start, end in ranges[:-1]:
+        assert end - start >= 30 * TARGET_RATE
+    # Every cut falls inside one of the silences between phrases
+    for _, cut in ranges[:-1]:
+        assert any(pause_start <= cut <= pause_end for pause_start, pause_end in pauses)
+    assert len(ranges) >= 9
+
+def test_split_short_recording_is_one_range():
+    samples, _ = synthetic_recording(45)
+    assert split_on_pauses(samples, TARGET_RATE, max_seconds=60) == [(0, len(samples))]
+
+def test_stitch_offsets_segments_and_joins_text():
+    chunks = [chunk(0.5, 58.0), chunk(58.5, 40.0)]
+    results = [
+        {'text': 'hola', 'language': 'es', 'segments': [{'start': 0.0, 'end': 1.5, 'text': ' hola'}]},
+        {'text': 'adios', 'segments': [{'start': 2.0, 'end': 3.0, 'text': 'adios '}]},
+    ]
+    stitched = stitch_transcripts(chunks, results)
+
+    assert stitched['text'] == 'hola adios'
+    assert stitched['language'] == 'es'
+    assert [(s['start'], s['end']) for s in stitched['segments']] == [(0.5, 2.0), (60.5, 61.5)]
+
+def test_stitch_text_only_results_span_their_chunk():
+    stitched = stitch_transcripts([chunk(1.0, 30.0), chunk(31.0, 20.0)], [{'text': ' one '}, {'text': ''}])
+
+    assert stitched == {'text': 'one', 'segments': [{'start': 1.0, 'end': 31.0, 'text': 'one'}]}
+
+@pytest.mark.parametrize('status, retryable', [
+    (None, True), (429, True), (500, True), (503, True),
+    (400, False), (401, False), (404, False), (413, False),
+])
+def test_is_retryable(status, retryable):
+    assert is_retryable(status) is retryable
+
+@pytest.fixture
+def service():
+    return SpeechService('test-key', http_client=object(), retry_delay=0, chunk_retries=2)
+
+def test_retries_503_then_succeeds(service, monkeypatch):
+    outcomes = [http_error(503), {'text': 'ok'}]
+    calls = []
+
+    def post_file(endpoint, prepared, fields):
+        calls.append(endpoint)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(service, '_post_file', post_file)
+    assert service._post_with_retries('transcriptions', chunk(0, 1), {}) == {'text': 'ok'}
+    assert len(calls) == 2
+
+def test_gives_up_on_429_after_configured_retries(service, monkeypatch):
+    calls = []
+
+    def post_file(endpoint, prepared, fields):
+        calls.append(endpoint)
+        raise http_error(429)
+
+    monkeypatch.setattr(service, '_post_file', post_file)
+    with pytest.raises(requests.HTTPError):
+        service._post_with_retries('transcriptions', chunk(0, 1), {})
+    assert len(calls) == service.chunk_retries + 1
+
+def test_does_not_retry_400(service, monkeypatch):
+    calls = []
+
+    def post_file(endpoint, prepared, fields):
+        calls.append(endpoint)
+        raise http_error(400)
+
+    monkeypatch.setattr(service, '_post_file', post_file)
+    with pytest.raises(requests.HTTPError):
+        service._post_with_retries('transcriptions', chunk(0, 1), {})
+    assert len(calls) == 1
+
+def test_single_chunk_is_normalized_like_several(service, monkeypatch):
+    monkeypatch.setattr(service, '_prepare', lambda audio: [chunk(1.5, 2.0)])
+    monkeypatch.setattr(service, '_post_with_retries', lambda endpoint, prepared, fields: {'text': 'hi'})
+
+    result = service._post_audio('transcriptions', b'', {})
+    assert result == {'text': 'hi', 'segments': [{'start': 1.5, 'end': 3.5, 'text': 'hi'}]}
+
+def test_failed_chunk_drops_unsent_chunks(monkeypatch):
+    service = SpeechService('test-key', http_client=object(), max_workers=1)
+    chunks = [chunk(i * 60.0, 60.0) for i in range(6)]
+    sent = []
+
+    def post(endpoint, prepared, fields):
+        sent.append(prepared.offset)
+        if prepared.offset == 0:
+            raise http_error(400)
+        time.sleep(0.05)
+        return {'text': 'x'}
+
+    monkeypatch.setattr(service, '_prepare', lambda audio: chunks)
+    monkeypatch.setattr(service, '_post_with_retries', post)
+    with pytest.raises(requests.HTTPError):
+        service._post_audio('transcriptions', b'', {})
+    time.sleep(0.2)
+    assert len(sent) < len(chunks)